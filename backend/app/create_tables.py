@@ -1,13 +1,14 @@
 import sys
 import os
-
 # 현재 스크립트의 디렉토리를 시스템 경로에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
 from database import engine
 from models.model import Base
-
+from migrations import upgrade_schema
 # 테이블 생성
 print("Creating database tables...")
 Base.metadata.create_all(bind=engine)
+# 기존 테이블에 유니크 인덱스/칼럼 타입 변경 적용 (이미 적용된 단계는 건너뜀)
+print("Upgrading existing tables...")
+print(upgrade_schema(engine))
 print("Tables created successfully!")
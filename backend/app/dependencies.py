@@ -1,5 +1,37 @@
-from fastapi import Query
+from fastapi import Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import Literal
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import SessionLocal, AsyncSessionLocal, DB_ASYNC
 from backend.app.utils.validators import validate_date, validate_positive_number
+from backend.app.utils.responses import ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE, NDJSON_MEDIA_TYPE
+
+# 데이터베이스 세션 의존성 주입 (동기)
+def get_db():
+        db = SessionLocal()
+        try:
+                yield db
+        finally:
+                db.close()
+
+# 조회 API용 세션 의존성 주입 (DB_ASYNC가 켜져 있으면 AsyncSession, 아니면 동기 Session)
+async def get_db_session():
+        if DB_ASYNC:
+                async with AsyncSessionLocal() as db:
+                        yield db
+        else:
+                db = SessionLocal()
+                try:
+                        yield db
+                finally:
+                        await run_in_threadpool(db.close)
+
+# 동기 ORM 코드를 세션 종류에 맞게 실행 (AsyncSession은 run_sync, 동기 Session은 스레드 풀)
+async def run_db(db: Session | AsyncSession, fn):
+        if isinstance(db, AsyncSession):
+                return await db.run_sync(fn)
+        return await run_in_threadpool(fn, db)
 
 def get_valid_keyword(
         keyword: str = Query(..., min_length=1, max_length=100, title="검색 키워드")
@@ -15,3 +47,25 @@ def get_valid_revenue(
         revenue: int = Query(...)
         ) -> int:
         return validate_positive_number(revenue)
+
+# 응답 형식 결정 (?format= 파라미터 우선, 없으면 Accept 헤더로 협상)
+def get_response_format(
+        request: Request,
+        response_format: Literal["json", "ndjson", "arrow", "parquet"] = Query(None, alias="format")
+        ) -> str:
+        if response_format:
+                return response_format
+        accept = request.headers.get("accept", "")
+        if ARROW_STREAM_MEDIA_TYPE in accept:
+                return "arrow"
+        if PARQUET_MEDIA_TYPE in accept:
+                return "parquet"
+        if NDJSON_MEDIA_TYPE in accept:
+                return "ndjson"
+        return "json"
+
+# 조건부 조회 요청의 If-None-Match 헤더 (이전 응답의 ETag)
+def get_if_none_match(
+        if_none_match: str = Header(None)
+        ) -> str:
+        return if_none_match
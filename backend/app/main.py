@@ -1,14 +1,69 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from backend.app.routes.marketing import router as marketing_router
 from backend.app.routes.sales import router as sales_router
 from backend.app.routes.analytics import router as analytics_router
+from backend.app.routes.dashboard import router as dashboard_router
+from backend.app.routes.watchlist import router as watchlist_router
+from backend.app.services.jobs import crawl_jobs
+from backend.app.services.cache import get_cache
+from backend.app.services.keyword_index import build_keyword_index
+from backend.app.services.scheduler import flush_keyword_views
+from backend.app.services.response_store import get_response_store
+from backend.app.services.metrics import MetricsMiddleware, instrument_engine, render_metrics
+from backend.app.utils.compression import CompressionMiddleware
+from backend.app.utils.responses import ORJSONResponse
+from backend.app.database import engine, async_engine
 
-app = FastAPI()
+# 기본 JSON 응답도 orjson으로 직렬화
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# 응답 본문 gzip/brotli 압축 (지표 미들웨어 안쪽에 두어 압축 시간도 요청 처리 시간에 포함)
+app.add_middleware(CompressionMiddleware)
+
+# 요청/SQL 지표 수집 (METRICS_ENABLED=false면 미들웨어와 이벤트 훅 모두 생략)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
 
 app.include_router(marketing_router)
 app.include_router(sales_router)
 app.include_router(analytics_router)
+app.include_router(dashboard_router)
+app.include_router(watchlist_router)
 
 @app.get("/ping")
 def ping():
     return {"message": "Server is running!"}
+
+# 조회 결과 캐시 적중/미스 통계
+@app.get("/cache/stats")
+def cache_stats():
+    return get_cache().stats()
+
+# DataLab 원본 응답 저장소 적중/미스, 용량 통계 (저장소가 꺼져 있으면 enabled=false)
+@app.get("/datalab/store/stats")
+def datalab_store_stats():
+    store = get_response_store()
+    return store.stats() if store is not None else {"enabled": False}
+
+# Prometheus 텍스트 형식 지표 (요청 지연 시간, SQL 실행 시간, DataLab 호출, 캐시 통계)
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# 서버 시작 시 키워드 자동완성 색인 생성
+@app.on_event("startup")
+def startup_keyword_index():
+    build_keyword_index()
+
+# 서버 종료 시 대기 중인 크롤링 작업 정리
+@app.on_event("shutdown")
+def shutdown_crawl_jobs():
+    crawl_jobs.shutdown()
+
+# 서버 종료 시 아직 반영하지 않은 대시보드 조회 수 저장
+@app.on_event("shutdown")
+def shutdown_keyword_views():
+    flush_keyword_views()
@@ -0,0 +1,66 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+# create_all은 이미 있는 테이블을 바꾸지 않으므로, 이전 버전으로 만든 DB에 필요한 변경을 여기서 적용
+# 모든 단계는 이미 적용된 경우 아무것도 하지 않으므로 create_tables.py를 실행할 때마다 호출해도 됨
+
+# upsert(ON CONFLICT)에 필요한 유니크 인덱스 (테이블, 인덱스 이름, 칼럼)
+UNIQUE_INDEXES = [
+    ("marketing_data", "ux_marketing_data_keyword_date", ["keyword", "date"]),
+    ("sales_data", "sales_data_date_key", ["date"]),
+]
+
+# 정수에서 실수로 바뀐 칼럼 (DataLab ratio 소수점 유지, PostgreSQL만 변경 필요)
+FLOAT_COLUMNS = [
+    ("marketing_data", "search_volume"),
+    ("marketing_rollup", "total_volume"),
+]
+
+# 같은 칼럼 조합의 유니크 제약 또는 유니크 인덱스가 이미 있는지 확인 (이름은 DB마다 다를 수 있으므로 칼럼으로 비교)
+def _has_unique(inspector, table: str, columns: list[str]) -> bool:
+    constraints = inspector.get_unique_constraints(table)
+    indexes = [index for index in inspector.get_indexes(table) if index["unique"]]
+    return any(list(item["column_names"]) == columns for item in constraints + indexes)
+
+# 유니크 인덱스를 만들기 전에 중복 행 정리 (같은 키에서 가장 나중에 저장된 행(id 최대)만 남김)
+def _dedupe(conn, table: str, columns: list[str]) -> int:
+    group_by = ", ".join(columns)
+    result = conn.execute(text(
+        f"DELETE FROM {table} WHERE id NOT IN (SELECT MAX(id) FROM {table} GROUP BY {group_by})"
+    ))
+    return result.rowcount
+
+def upgrade_schema(engine: Engine) -> dict:
+    report = {"deduplicated": {}, "created_indexes": [], "altered_columns": []}
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table, name, columns in UNIQUE_INDEXES:
+            if table not in tables or _has_unique(inspector, table, columns):
+                continue
+            report["deduplicated"][table] = _dedupe(conn, table, columns)
+            conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+            report["created_indexes"].append(name)
+
+        # SQLite는 INTEGER 칼럼에도 실수를 그대로 저장하므로 PostgreSQL에서만 칼럼 타입 변경
+        if engine.dialect.name == "postgresql":
+            for table, column in FLOAT_COLUMNS:
+                if table not in tables:
+                    continue
+                current = next(item["type"] for item in inspector.get_columns(table) if item["name"] == column)
+                if current.python_type is int:
+                    conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE double precision"))
+                    report["altered_columns"].append(f"{table}.{column}")
+
+    # 풀에 남은 연결이 변경 전 스키마를 계속 사용하지 않도록 정리 (SQLite는 캐시된 스키마로 ON CONFLICT 대상을 확인함)
+    if report["created_indexes"] or report["altered_columns"]:
+        engine.dispose()
+    return report
+
+if __name__ == "__main__":
+    from backend.app.database import engine
+
+    print("Upgrading database schema...")
+    print(upgrade_schema(engine))
+    print("Schema upgraded successfully!")
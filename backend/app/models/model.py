@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, Date, DateTime, Index
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -9,11 +9,139 @@ class MarketingData(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     keyword = Column(String, nullable=False)
     date = Column(Date, nullable=False)
-    search_volume = Column(Integer, nullable=False)
+    search_volume = Column(Float, nullable=False) # DataLab ratio (소수점 포함 상대값)
+
+    # 키워드별 날짜 중복 방지 및 (keyword, date) 조회용 복합 인덱스
+    __table_args__ = (
+        Index("ux_marketing_data_keyword_date", "keyword", "date", unique=True),
+    )
+
+# 키워드별로 크롤링이 끝난 연속 구간 (covered_through가 증분 크롤링의 high-water mark)
+class CrawlState(Base):
+    __tablename__ = "crawl_state"
+
+    keyword = Column(String, primary_key=True)
+    covered_from = Column(Date, nullable=False)
+    covered_through = Column(Date, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
 
 class SalesData(Base):
     __tablename__ = "sales_data"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    date = Column(Date, nullable=False)
+    date = Column(Date, nullable=False, unique=True)
     revenue = Column(Integer, nullable=False)
+
+# 키워드별 일/주/월 단위 검색량 집계 (period_start: 해당 일, 주의 월요일, 월의 1일)
+class MarketingRollup(Base):
+    __tablename__ = "marketing_rollup"
+
+    keyword = Column(String, primary_key=True)
+    period = Column(String, primary_key=True) # day, week, month
+    period_start = Column(Date, primary_key=True)
+    total_volume = Column(Float, nullable=False)
+    row_count = Column(Integer, nullable=False)
+
+# 일 단위 매출 집계
+class SalesDailyRollup(Base):
+    __tablename__ = "sales_daily_rollup"
+
+    date = Column(Date, primary_key=True)
+    total_revenue = Column(BigInteger, nullable=False)
+    row_count = Column(Integer, nullable=False)
+
+# 시계열별 이상치 탐지 상태 (series: marketing | sales, 매출은 keyword가 빈 문자열)
+# 마지막으로 반영한 날짜까지의 EWMA 평균/분산과 최근 window 값(JSON 배열)을 보관해 새 점마다 O(1)로 갱신
+class AnomalyState(Base):
+    __tablename__ = "anomaly_state"
+
+    series = Column(String, primary_key=True)
+    keyword = Column(String, primary_key=True)
+    last_date = Column(Date, nullable=False)
+    point_count = Column(Integer, nullable=False)
+    ewma_mean = Column(Float, nullable=False)
+    ewma_var = Column(Float, nullable=False)
+    window = Column(Text, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+# 이상치로 판정된 점 (expected: 직전까지의 EWMA 평균, median: 직전 window의 중앙값)
+class Anomaly(Base):
+    __tablename__ = "anomaly"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    series = Column(String, nullable=False)
+    keyword = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    value = Column(Float, nullable=False)
+    expected = Column(Float, nullable=False)
+    zscore = Column(Float, nullable=False)
+    median = Column(Float, nullable=False)
+    mad_score = Column(Float)
+    detected_at = Column(DateTime, nullable=False)
+
+    # 시계열별 날짜 중복 방지, since 조회용 날짜 인덱스
+    __table_args__ = (
+        Index("ux_anomaly_series_keyword_date", "series", "keyword", "date", unique=True),
+        Index("ix_anomaly_date", "date"),
+    )
+
+# 정기 수집 대상 키워드 (interval_hours마다 스케줄러가 다시 수집, priority가 높을수록 먼저 수집하고 쿼터 예비분도 사용)
+class WatchlistKeyword(Base):
+    __tablename__ = "watchlist"
+
+    keyword = Column(String, primary_key=True)
+    interval_hours = Column(Float, nullable=False)
+    priority = Column(Integer, nullable=False)
+    lookback_days = Column(Integer, nullable=False) # 아직 수집한 적 없는 키워드를 처음 가져올 기간
+    next_due_at = Column(DateTime, nullable=False)
+    last_refreshed_at = Column(DateTime)
+    last_status = Column(String) # succeeded / failed
+    last_error = Column(Text)
+    created_at = Column(DateTime, nullable=False)
+
+    # 스케줄러가 수집할 때가 된 키워드를 찾는 인덱스
+    __table_args__ = (
+        Index("ix_watchlist_next_due_at", "next_due_at"),
+    )
+
+# 키워드별 일일 대시보드 조회 수 (스케줄러 우선순위 계산용)
+class KeywordView(Base):
+    __tablename__ = "keyword_view"
+
+    keyword = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    views = Column(Integer, nullable=False)
+
+# 날짜별 DataLab 실제 호출 수 (API 서버, 크롤러, 스케줄러 프로세스가 함께 사용하는 일일 쿼터 집계)
+class DatalabQuota(Base):
+    __tablename__ = "datalab_quota"
+
+    date = Column(Date, primary_key=True)
+    used = Column(Integer, nullable=False)
+
+# 조회 결과 캐시의 무효화 버전 (범위별 카운터, 여러 워커와 크롤러/스케줄러 프로세스가 같은 값을 봄)
+class CacheVersion(Base):
+    __tablename__ = "cache_version"
+
+    scope = Column(String, primary_key=True) # 예: marketing:스타벅스:2024-01, sales:*
+    version = Column(BigInteger, nullable=False)
+
+# 스케줄러 실행 기록 (lag_seconds: 수집한 키워드가 예정 시각보다 늦어진 최대 시간)
+class SchedulerRun(Base):
+    __tablename__ = "scheduler_run"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime)
+    status = Column(String, nullable=False) # running -> succeeded / failed
+    due_keywords = Column(Integer, nullable=False)
+    refreshed_keywords = Column(Integer, nullable=False)
+    deferred_keywords = Column(Integer, nullable=False) # 쿼터가 부족해 다음 실행으로 미룬 키워드 수
+    requests = Column(Integer, nullable=False)
+    rows_written = Column(Integer, nullable=False)
+    lag_seconds = Column(Float)
+    error = Column(Text)
+
+    __table_args__ = (
+        Index("ix_scheduler_run_started_at", "started_at"),
+    )
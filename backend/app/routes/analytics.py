@@ -1,78 +1,315 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-import pandas as pd
-from backend.app.database import SessionLocal
-from backend.app.models.model import MarketingData, SalesData
-from backend.app.dependencies import get_valid_keyword
+from datetime import date, timedelta
+from typing import Literal
+import polars as pl
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.models.model import MarketingData, SalesData, Anomaly
+from backend.app.dependencies import get_valid_keyword, get_response_format, get_if_none_match, get_db, get_db_session, run_db
+from backend.app.services.cache import cached, data_etag, data_versions, marketing_scopes, sales_scopes
+from backend.app.services.correlation import lagged_correlations
+from backend.app.services.anomalies import backfill_anomalies
+from backend.app.services.clock import get_clock
+from backend.app.services.parquet_store import export_parquet_store, read_manifest, scan_marketing, scan_sales, engine_scopes
+from backend.app.utils.responses import columnar_response, json_response, etag_matches, not_modified_response
 
 router = APIRouter(prefix="/analytics", tags=["Data Analytics"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# 상관 분석 한 번에 비교할 수 있는 최대 키워드 수와 최대 기간 (일)
+MAX_CORRELATION_KEYWORDS = 1000
+MAX_CORRELATION_DAYS = 3660
 
-# 특정 기간의 검색량 및 매출 변화율 비교 API
+# 집계 단위별 Polars truncate 간격
+PERIOD_EVERY = {"week": "1w", "month": "1mo"}
+
+# 직전 행 대비 변화율(%) 계산식 (직전 값이 0이거나 어느 한쪽이 null이면 null)
+def change_rate_expr(column: str) -> pl.Expr:
+    previous = pl.col(column).shift(1)
+    return (
+        pl.when(previous.is_null() | (previous == 0) | pl.col(column).is_null())
+        .then(None)
+        .otherwise(((pl.col(column) - previous) / previous * 100).round(2))
+    )
+
+# date, search_volume, revenue 칼럼의 DataFrame을 기간 단위로 집계한 뒤 변화율을 한 번에 계산
+def compute_change_rates(df: pl.DataFrame, period: str = "day") -> pl.DataFrame:
+    if period != "day":
+        df = (
+            df.group_by(pl.col("date").dt.truncate(PERIOD_EVERY[period]))
+            .agg(
+                # 값이 하나도 없는 기간은 0이 아니라 null로 유지
+                pl.when(pl.col(column).count() > 0).then(pl.col(column).sum()).alias(column)
+                for column in ("search_volume", "revenue")
+            )
+            .sort("date")
+        )
+
+    return df.with_columns(
+        change_rate_expr("search_volume").alias("search_volume_change_rate"),
+        change_rate_expr("revenue").alias("revenue_change_rate"),
+    )
+
+# 검색량과 매출을 JOIN으로 조회해 날짜별 변화율 DataFrame을 만듦 (데이터가 없으면 빈 DataFrame)
+# engine=parquet이면 DB 대신 Parquet 스냅샷을 같은 LEFT JOIN으로 읽음
+def _load_comparison(db: Session, keyword: str, start_date: date, end_date: date, period: str, engine: str = "db") -> pl.DataFrame:
+    schema = {"date": pl.Date, "search_volume": pl.Float64, "revenue": pl.Float64}
+    if engine == "parquet":
+        df = (
+            scan_marketing([keyword], start_date, end_date)
+            .join(scan_sales(start_date, end_date), on="date", how="left")
+            .select(pl.col(name).cast(dtype) for name, dtype in schema.items())
+            .sort("date")
+            .collect()
+        )
+    else:
+        # JOIN으로 조회 쿼리 한 번 실행 (ORM 객체 대신 칼럼 튜플로 조회)
+        records = db.execute(
+            select(MarketingData.date, MarketingData.search_volume, SalesData.revenue)
+            .outerjoin(SalesData, MarketingData.date == SalesData.date)  # 날짜 기준 LEFT JOIN
+            .where(
+                MarketingData.keyword == keyword,
+                MarketingData.date.between(start_date, end_date),
+            )
+            .order_by(MarketingData.date)
+        ).all()
+        df = pl.DataFrame(records, schema=schema, orient="row")
+
+    return (
+        compute_change_rates(df, period)
+        .select(
+            pl.lit(keyword).alias("keyword"),
+            "date",
+            "search_volume_change_rate",
+            "revenue_change_rate",
+        )
+    )
+
+# 특정 기간의 검색량 및 매출 변화율 비교 API (format=json|ndjson|arrow|parquet)
 @router.get("/marketing-sales")
-def compare_marketing_and_sales(
-    start_date: str,
-    end_date: str,
+async def compare_marketing_and_sales(
+    start_date: date,
+    end_date: date,
+    period: Literal["day", "week", "month"] = "day",
+    engine: Literal["db", "parquet"] = "db",
     keyword: str = Depends(get_valid_keyword),
-    db: Session = Depends(get_db),
+    response_format: str = Depends(get_response_format),
+    if_none_match: str = Depends(get_if_none_match),
+    db: Session | AsyncSession = Depends(get_db_session),
 ):
-    
-    # JOIN으로 조회 쿼리 한 번 실행
-    query = (
-        db.query(MarketingData.date, MarketingData.search_volume, SalesData.revenue)
-        .outerjoin(SalesData, MarketingData.date == SalesData.date)  # 날짜 기준 LEFT JOIN
-        .filter(
-            MarketingData.keyword == keyword,
-            MarketingData.date.between(start_date, end_date),
-        )
-        .order_by(MarketingData.date)
-    )
+    def load(session: Session):
+        df = _load_comparison(session, keyword, start_date, end_date, period, engine)
+
+        # 칼럼 기반 형식은 변화율 DataFrame을 그대로 Arrow 테이블로 반환 (데이터가 없으면 빈 테이블)
+        if response_format != "json":
+            return df.to_arrow()
 
-    records = query.all()
+        # 해당 기간 데이터가 없는 경우 알림 메시지 반환
+        if df.is_empty():
+            return {
+                "message": "데이터 부족으로 분석이 어렵습니다.",
+                "missing_data": [f"{start_date}부터 {end_date}까지 {keyword}의 데이터 없음"],
+                "data": [],
+            }
 
-    # 해당 기간 데이터가 없는 경우 알림 메시지 반환
-    if not records:
         return {
-            "message": "데이터 부족으로 분석이 어렵습니다.",
-            "missing_data": [f"{start_date}부터 {end_date}까지 {keyword}의 데이터 없음"],
-            "data": [],
+            "message": "데이터 조회 성공",
+            "missing_data": [],
+            "data": df.to_dicts()
         }
 
-    # 변화율을 루프에서 계산
-    result = []
-    prev_search_volume = None
-    prev_revenue = None
+    # 같은 조건의 결과는 해당 키워드/기간의 검색량 또는 매출(Parquet은 스냅샷 버전)이 바뀌기 전까지 캐시에서 반환
+    scopes, version = engine_scopes(engine, marketing_scopes(keyword, start_date, end_date) + sales_scopes(start_date, end_date))
+    params = {
+        "keyword": keyword, "start_date": start_date, "end_date": end_date, "period": period,
+        "columnar": response_format != "json", "engine": engine, "store_version": version,
+    }
+
+    # 데이터(또는 스냅샷) 버전이 그대로면 조회 없이 304 반환
+    versions = await run_db(db, lambda session: data_versions(session, scopes))
+    etag = data_etag("analytics/marketing-sales", {**params, "format": response_format}, versions)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    result = await run_db(db, lambda session: cached("analytics/marketing-sales", params, versions, lambda: load(session)))
+    if response_format != "json":
+        return columnar_response(result, response_format, etag)
+    return json_response(result, etag)
+
+# NaN을 null로 바꾸고 소수 넷째 자리로 반올림
+def _round_or_none(value: float):
+    return None if np.isnan(value) else round(float(value), 4)
 
-    for record in records:
-        date, search_volume, revenue = record
-        search_volume_change = None
-        revenue_change = None
+# 요청 키워드 전체의 검색량과 매출을 각각 한 번씩 조회해 키워드 x 날짜 행렬과 매출 벡터를 만듦
+def _load_correlation_matrix(db: Session, keywords: list[str], start_date: date, end_date: date, engine: str = "db") -> tuple[np.ndarray, np.ndarray]:
+    days = (end_date - start_date).days + 1
+    index = {keyword: i for i, keyword in enumerate(keywords)}
+
+    marketing_schema = {"keyword": pl.String, "date": pl.Date, "search_volume": pl.Float64}
+    sales_schema = {"date": pl.Date, "revenue": pl.Float64}
+    if engine == "parquet":
+        marketing, sales = pl.collect_all([
+            scan_marketing(keywords, start_date, end_date).cast(marketing_schema),
+            scan_sales(start_date, end_date).cast(sales_schema),
+        ])
+    else:
+        marketing = pl.DataFrame(
+            db.execute(
+                select(MarketingData.keyword, MarketingData.date, MarketingData.search_volume).where(
+                    MarketingData.keyword.in_(keywords),
+                    MarketingData.date.between(start_date, end_date),
+                )
+            ).all(),
+            schema=marketing_schema,
+            orient="row",
+        )
+        sales = pl.DataFrame(
+            db.execute(select(SalesData.date, SalesData.revenue).where(SalesData.date.between(start_date, end_date))).all(),
+            schema=sales_schema,
+            orient="row",
+        )
+
+    # 값이 없는 날짜는 NaN으로 남겨 두고 상관계수 계산 시 제외
+    x = np.full((len(keywords), days), np.nan)
+    rows = marketing["keyword"].replace_strict(index, return_dtype=pl.Int64).to_numpy()
+    columns = (marketing["date"] - start_date).dt.total_days().to_numpy()
+    x[rows, columns] = marketing["search_volume"].to_numpy()
+
+    y = np.full(days, np.nan)
+    y[(sales["date"] - start_date).dt.total_days().to_numpy()] = sales["revenue"].to_numpy()
+    return x, y
+
+# 여러 키워드의 검색량과 lag일 후 매출의 상관계수를 시차 0..max_lag 전체에 대해 계산하고
+# 상관이 가장 강한(절댓값 기준) 시차를 찾아 상위 top_k개 키워드를 반환
+def _build_correlation(db: Session, keywords: list[str], start_date: date, end_date: date, max_lag: int, method: str, top_k: int, engine: str = "db") -> dict:
+    x, y = _load_correlation_matrix(db, keywords, start_date, end_date, engine)
+    pearson, spearman, overlap = lagged_correlations(x, y, max_lag)
+    score = pearson if method == "pearson" else spearman
+
+    # 모든 시차가 NaN인 키워드는 분석 대상에서 제외
+    valid = ~np.isnan(score).all(axis=1)
+    best_lag = np.where(valid, np.nanargmax(np.where(np.isnan(score), -1.0, np.abs(score)), axis=1), -1)
+    best_score = np.where(valid, np.abs(score[np.arange(len(keywords)), best_lag]), -1.0)
+    ranking = [i for i in np.argsort(-best_score, kind="stable") if valid[i]][:top_k]
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "method": method,
+        "max_lag": max_lag,
+        "results": [
+            {
+                "keyword": keywords[i],
+                "best_lag": int(best_lag[i]),
+                "correlation": _round_or_none(score[i, best_lag[i]]),
+                "pearson": _round_or_none(pearson[i, best_lag[i]]),
+                "spearman": _round_or_none(spearman[i, best_lag[i]]),
+                "overlap_days": int(overlap[i, best_lag[i]]),
+                "by_lag": [_round_or_none(value) for value in score[i]],
+            }
+            for i in ranking
+        ],
+        "insufficient_data": [keyword for keyword, ok in zip(keywords, valid) if not ok],
+    }
+
+# 여러 키워드의 검색량과 매출의 시차 상관 분석 API (매출을 가장 잘 앞서 보여주는 키워드 찾기)
+@router.get("/correlation")
+async def get_keyword_correlation(
+    start_date: date,
+    end_date: date,
+    keywords: list[str] = Query(..., min_length=1, title="분석 키워드 (여러 번 지정하거나 쉼표로 구분)"),
+    max_lag: int = Query(14, ge=0, le=90),
+    method: Literal["pearson", "spearman"] = "pearson",
+    top_k: int = Query(10, ge=1, le=MAX_CORRELATION_KEYWORDS),
+    engine: Literal["db", "parquet"] = "db",
+    if_none_match: str = Depends(get_if_none_match),
+    db: Session | AsyncSession = Depends(get_db_session),
+):
+    names = list(dict.fromkeys(name.strip() for value in keywords for name in value.split(",") if name.strip()))
+    if not names or len(names) > MAX_CORRELATION_KEYWORDS:
+        raise HTTPException(status_code=400, detail=f"키워드 개수 오류: 1개 이상 {MAX_CORRELATION_KEYWORDS}개 이하로 지정해야 합니다.")
+    if start_date > end_date or (end_date - start_date).days >= MAX_CORRELATION_DAYS:
+        raise HTTPException(status_code=400, detail=f"조회 기간 오류: {start_date} ~ {end_date}, 최대 {MAX_CORRELATION_DAYS}일까지 조회할 수 있습니다.")
+
+    # 같은 조건의 결과는 요청 키워드의 검색량 또는 매출(Parquet은 스냅샷 버전)이 바뀌기 전까지 캐시에서 반환
+    scopes, version = engine_scopes(
+        engine,
+        [scope for name in names for scope in marketing_scopes(name, start_date, end_date)] + sales_scopes(start_date, end_date),
+    )
+    params = {
+        "keywords": ",".join(sorted(names)), "start_date": start_date, "end_date": end_date,
+        "max_lag": max_lag, "method": method, "top_k": top_k, "engine": engine, "store_version": version,
+    }
+
+    # 요청 키워드/매출(또는 스냅샷) 버전이 그대로면 상관 행렬을 다시 계산하지 않고 304 반환
+    versions = await run_db(db, lambda session: data_versions(session, scopes))
+    etag = data_etag("analytics/correlation", params, versions)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    result = await run_db(db, lambda session: cached(
+        "analytics/correlation", params, versions,
+        lambda: _build_correlation(session, names, start_date, end_date, max_lag, method, top_k, engine),
+    ))
+    return json_response(result, etag)
+
+# since 이후 날짜에 탐지된 이상치 목록 (모든 키워드와 매출을 한 번에, 최근 날짜/큰 점수 순)
+# 탐지는 저장 시점에 시계열별 상태로 이미 끝나 있으므로 anomaly 테이블만 날짜 인덱스로 조회
+@router.get("/anomalies")
+async def get_anomalies(
+    since: date = None,
+    series: Literal["all", "marketing", "sales"] = "all",
+    keyword: list[str] = Query(None, title="키워드 필터 (여러 개 지정 가능)"),
+    limit: int = Query(500, ge=1, le=10_000),
+    db: Session | AsyncSession = Depends(get_db_session),
+):
+    since = since or get_clock().today() - timedelta(days=7)
+    query = select(Anomaly).where(Anomaly.date >= since)
+    if series != "all":
+        query = query.where(Anomaly.series == series)
+    if keyword:
+        query = query.where(Anomaly.keyword.in_(keyword))
+    query = query.order_by(Anomaly.date.desc(), func.abs(Anomaly.zscore).desc()).limit(limit)
 
-        if prev_search_volume is not None and search_volume is not None:
-            search_volume_change = round(((search_volume - prev_search_volume) / prev_search_volume * 100), 2)
+    def load(session: Session):
+        return [
+            {
+                "series": anomaly.series,
+                "keyword": anomaly.keyword or None,
+                "date": anomaly.date,
+                "value": anomaly.value,
+                "expected": round(anomaly.expected, 4),
+                "median": anomaly.median,
+                "zscore": round(anomaly.zscore, 4),
+                "mad_score": round(anomaly.mad_score, 4) if anomaly.mad_score is not None else None,
+                "direction": "spike" if anomaly.zscore > 0 else "drop",
+                "detected_at": anomaly.detected_at,
+            }
+            for anomaly in session.execute(query).scalars()
+        ]
 
-        if prev_revenue is not None and revenue is not None:
-            revenue_change = round(((revenue - prev_revenue) / prev_revenue * 100), 2)
+    anomalies = await run_db(db, load)
+    return json_response({"since": since, "count": len(anomalies), "anomalies": anomalies})
 
-        result.append({
-            "keyword": keyword,
-            "date": date,
-            "search_volume_change_rate": search_volume_change,
-            "revenue_change_rate": revenue_change,
-        })
+# 전체 이력으로 이상치 탐지 상태와 이상치 목록을 다시 계산 (최초 도입 또는 임계값 변경 후)
+@router.post("/anomalies/backfill")
+def backfill_analytics_anomalies(db: Session = Depends(get_db)):
+    return backfill_anomalies(db)
 
-        prev_search_volume = search_volume
-        prev_revenue = revenue
+# 원본 테이블을 월별 Parquet 스냅샷으로 내보내기 (바뀐 월만 다시 씀, full=true면 전체 다시 쓰기)
+@router.post("/store/export")
+def export_analytics_store(full: bool = False, db: Session = Depends(get_db)):
+    return export_parquet_store(db, full=full)
 
+# Parquet 스냅샷 상태 (버전, 내보낸 시각, 테이블별 월 목록)
+@router.get("/store")
+def get_analytics_store():
+    manifest = read_manifest()
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Parquet 저장소가 없습니다. 먼저 POST /analytics/store/export로 내보내기를 실행해주세요.")
     return {
-        "message": "데이터 조회 성공",
-        "missing_data": [],
-        "data": result
+        "version": manifest["version"],
+        "exported_at": manifest["exported_at"],
+        "tables": {table: sorted(months) for table, months in manifest["tables"].items()},
     }
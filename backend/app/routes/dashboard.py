@@ -0,0 +1,115 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy import select, func, cast, and_, literal, literal_column, null, union_all, Date, DateTime
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+import polars as pl
+from backend.app.models.model import MarketingData, SalesData
+from backend.app.dependencies import get_valid_keyword, get_response_format, get_if_none_match, get_db_session, run_db
+from backend.app.services.cache import cached, data_etag, data_versions, marketing_scopes, sales_scopes
+from backend.app.routes.analytics import compute_change_rates
+from backend.app.services.scheduler import record_keyword_view
+from backend.app.utils.responses import json_response, columnar_response, etag_matches, not_modified_response
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+# 한 번에 조회할 수 있는 최대 기간 (일)
+MAX_DASHBOARD_DAYS = 3660
+
+SERIES_SCHEMA = {"date": pl.Date, "search_volume": pl.Float64, "revenue": pl.Int64}
+
+# PostgreSQL: generate_series로 만든 날짜 축에 검색량과 매출을 LEFT JOIN (한 번의 조회로 빈 날짜까지 채움)
+def _load_series_postgres(db: Session, keyword: str, start_date: date, end_date: date) -> pl.DataFrame:
+    days = func.generate_series(
+        cast(literal(start_date), DateTime), cast(literal(end_date), DateTime), literal_column("interval '1 day'")
+    ).table_valued("day").render_derived(name="days")
+    day = cast(days.c.day, Date)
+
+    rows = db.execute(
+        select(day.label("date"), MarketingData.search_volume, SalesData.revenue)
+        .select_from(days)
+        .outerjoin(MarketingData, and_(MarketingData.date == day, MarketingData.keyword == keyword))
+        .outerjoin(SalesData, SalesData.date == day)
+        .order_by(day)
+    ).all()
+    return pl.DataFrame(rows, schema=SERIES_SCHEMA, orient="row")
+
+# 그 외 DB(SQLite 등): 두 테이블을 UNION ALL로 한 번에 조회하고 날짜 축 채우기는 Polars에서 처리
+def _load_series_fallback(db: Session, keyword: str, start_date: date, end_date: date) -> pl.DataFrame:
+    rows = db.execute(union_all(
+        select(MarketingData.date, MarketingData.search_volume, null().label("revenue")).where(
+            MarketingData.keyword == keyword,
+            MarketingData.date.between(start_date, end_date),
+        ),
+        select(SalesData.date, null().label("search_volume"), SalesData.revenue).where(
+            SalesData.date.between(start_date, end_date),
+        ),
+    )).all()
+
+    values = (
+        pl.DataFrame(rows, schema=SERIES_SCHEMA, orient="row")
+        .group_by("date")
+        .agg(pl.col("search_volume").max(), pl.col("revenue").max())
+    )
+    return (
+        pl.DataFrame({"date": pl.date_range(start_date, end_date, "1d", eager=True)})
+        .join(values, on="date", how="left")
+        .sort("date")
+    )
+
+# 날짜가 모두 채워진 시계열에 변화율을 붙임
+def _build_series(db: Session, keyword: str, start_date: date, end_date: date) -> pl.DataFrame:
+    load_series = _load_series_postgres if db.get_bind().dialect.name == "postgresql" else _load_series_fallback
+    series = load_series(db, keyword, start_date, end_date)
+
+    # 변화율은 /analytics/marketing-sales와 같이 검색량이 있는 날짜끼리 직전 행과 비교
+    rates = compute_change_rates(series.filter(pl.col("search_volume").is_not_null())).select(
+        "date", "search_volume_change_rate", "revenue_change_rate"
+    )
+    return series.join(rates, on="date", how="left").sort("date")
+
+# 시계열에 누락 날짜 목록을 붙여 대시보드 JSON 응답을 만듦
+def _build_bundle(db: Session, keyword: str, start_date: date, end_date: date) -> dict:
+    series = _build_series(db, keyword, start_date, end_date)
+    return {
+        "keyword": keyword,
+        "start_date": start_date,
+        "end_date": end_date,
+        "series": series.to_dict(as_series=False),
+        "missing_marketing_dates": series.filter(pl.col("search_volume").is_null())["date"].to_list(),
+        "missing_sales_dates": series.filter(pl.col("revenue").is_null())["date"].to_list(),
+    }
+
+# 대시보드 한 화면에 필요한 검색량, 매출, 변화율, 누락 날짜를 한 번에 조회하는 API
+# format=arrow|parquet|ndjson이면 시계열 표만 칼럼 형식으로 반환 (누락 날짜는 값이 비어 있는 행)
+@router.get("")
+async def get_dashboard_bundle(
+    start_date: date,
+    end_date: date,
+    background_tasks: BackgroundTasks,
+    keyword: str = Depends(get_valid_keyword),
+    response_format: str = Depends(get_response_format),
+    if_none_match: str = Depends(get_if_none_match),
+    db: Session | AsyncSession = Depends(get_db_session),
+):
+    if start_date > end_date or (end_date - start_date).days >= MAX_DASHBOARD_DAYS:
+        raise HTTPException(status_code=400, detail=f"조회 기간 오류: {start_date} ~ {end_date}, 최대 {MAX_DASHBOARD_DAYS}일까지 조회할 수 있습니다.")
+
+    # 관심 키워드 수집 우선순위용 조회 수 기록 (304 응답도 조회로 집계, 응답을 보낸 뒤 실행)
+    background_tasks.add_task(record_keyword_view, keyword)
+
+    params = {"keyword": keyword, "start_date": start_date, "end_date": end_date, "columnar": response_format != "json"}
+    scopes = marketing_scopes(keyword, start_date, end_date) + sales_scopes(start_date, end_date)
+    versions = await run_db(db, lambda session: data_versions(session, scopes))
+
+    # 해당 키워드/기간의 검색량과 매출 버전이 그대로면 조회 없이 304 반환 (형식마다 본문이 다르므로 ETag에 형식 포함)
+    etag = data_etag("dashboard", {**params, "format": response_format}, versions)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    # 같은 조건의 결과는 해당 키워드/기간의 검색량 또는 매출이 바뀌기 전까지 캐시에서 반환
+    if response_format != "json":
+        result = await run_db(db, lambda session: cached("dashboard", params, versions, lambda: _build_series(session, keyword, start_date, end_date).to_arrow()))
+        return columnar_response(result, response_format, etag)
+    result = await run_db(db, lambda session: cached("dashboard", params, versions, lambda: _build_bundle(session, keyword, start_date, end_date)))
+    return json_response(result, etag)
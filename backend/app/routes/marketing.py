@@ -1,85 +1,268 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from backend.app.database import SessionLocal, engine
-from backend.app.models.model import MarketingData
-from backend.app.dependencies import get_valid_keyword
-from backend.app.services.crawler import save_search_volume
-from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, case
+from backend.app.models.model import MarketingData, MarketingRollup
+from backend.app.dependencies import get_valid_keyword, get_response_format, get_if_none_match, get_db_session, run_db
+from backend.app.services.jobs import crawl_jobs
+from backend.app.services.rollups import period_start, period_end, shift_period
+from backend.app.services.cache import cached, data_etag, data_versions, marketing_scopes
+from backend.app.services.parquet_store import scan_marketing, engine_scopes
+from backend.app.services.keyword_index import keyword_index
+from backend.app.services.clock import get_clock
+from backend.app.utils.responses import (
+    rows_to_table, columnar_response, ndjson_response, json_response, etag_matches, not_modified_response,
+)
+from backend.app.utils.pagination import encode_cursor, decode_cursor
+from backend.app.utils.downsample import date_bucket, downsample_rows, validate_reduction
+from datetime import date
 from pydantic import BaseModel
+from typing import Literal
+import pyarrow as pa
+import polars as pl
 
 router = APIRouter(prefix="/marketing", tags=["Marketing Data"])
 
-# 데이터베이스 세션 의존성 주입
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# 검색량 조회 결과의 Arrow 스키마
+MARKETING_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("keyword", pa.string()),
+    ("date", pa.date32()),
+    ("search_volume", pa.float64()),
+])
 
-# 특정 키워드의 검색량 데이터 조회 API (기간 설정 가능)
+# 주/월 단위 집계 조회 결과의 Arrow 스키마 (days: 기간 안에 데이터가 있는 날짜 수)
+MARKETING_BUCKET_SCHEMA = pa.schema([
+    ("keyword", pa.string()),
+    ("date", pa.date32()),
+    ("search_volume", pa.float64()),
+    ("days", pa.int64()),
+])
+
+# 특정 키워드의 검색량 데이터 조회 API (기간 설정 가능, format=json|ndjson|arrow|parquet)
+# limit을 지정하면 (keyword, date) 기준 keyset 페이지와 next_cursor를 반환
+# bucket=week|month는 DB에서 기간별 합계로 집계하고, max_points는 LTTB로 차트에 필요한 점 수만 남김
 @router.get("/search-volume")
-def get_marketing_data(
-    start_date: str = None,
-    end_date: str = None,
+async def get_marketing_data(
+    start_date: date = None,
+    end_date: date = None,
+    limit: int = Query(None, ge=1, le=10_000),
+    cursor: str = None,
+    bucket: Literal["day", "week", "month"] = "day",
+    max_points: int = Query(None, ge=3, le=10_000),
     keyword: str = Depends(get_valid_keyword),
-    db: Session = Depends(get_db)
+    response_format: str = Depends(get_response_format),
+    if_none_match: str = Depends(get_if_none_match),
+    db: Session | AsyncSession = Depends(get_db_session)
 ):
+    validate_reduction(bucket, max_points, limit, cursor, response_format)
 
-    query = db.query(MarketingData).filter(MarketingData.keyword == keyword)
-
+    if bucket == "day":
+        query = (
+            select(MarketingData.id, MarketingData.keyword, MarketingData.date, MarketingData.search_volume)
+            .where(MarketingData.keyword == keyword)
+            .order_by(MarketingData.date)
+        )
+    else:
+        period = date_bucket(bucket, MarketingData.date)
+        query = (
+            select(
+                MarketingData.keyword,
+                period.label("date"),
+                func.sum(MarketingData.search_volume).label("search_volume"),
+                func.count().label("days"),
+            )
+            .where(MarketingData.keyword == keyword)
+            .group_by(MarketingData.keyword, period)
+            .order_by(period)
+        )
     if start_date and end_date:
-        query = query.filter(MarketingData.date.between(start_date, end_date))
+        query = query.where(MarketingData.date.between(start_date, end_date))
+
+    # 커서가 있으면 마지막으로 받은 날짜 이후부터 조회
+    if cursor:
+        after = decode_cursor(cursor, {"keyword": str, "date": date.fromisoformat})
+        if after["keyword"] != keyword:
+            raise HTTPException(status_code=400, detail=f"커서 값 오류: 다른 키워드({after['keyword']})의 커서입니다.")
+        query = query.where(MarketingData.date > after["date"])
+
+    # NDJSON은 캐시 없이 서버 측 커서로 스트리밍
+    if response_format == "ndjson":
+        return ndjson_response(query)
+
+    paginate = limit is not None and response_format == "json"
+    if paginate:
+        query = query.limit(limit + 1)
+
+    def load(session: Session):
+        rows = downsample_rows(session.execute(query).all(), max_points, "search_volume")
+
+        # 칼럼 기반 형식은 조회 결과에서 바로 Arrow 테이블을 만듦
+        if response_format != "json":
+            return rows_to_table(rows, MARKETING_SCHEMA if bucket == "day" else MARKETING_BUCKET_SCHEMA)
+        if not paginate:
+            return [row._asdict() for row in rows]
+
+        page = rows[:limit]
+        return {
+            "data": [row._asdict() for row in page],
+            "next_cursor": encode_cursor({"keyword": keyword, "date": page[-1].date}) if len(rows) > limit else None,
+        }
+
+    params = {
+        "keyword": keyword, "start_date": start_date, "end_date": end_date,
+        "limit": limit if paginate else None, "cursor": cursor, "columnar": response_format != "json",
+        "bucket": bucket, "max_points": max_points,
+    }
+    versions = await run_db(db, lambda session: data_versions(session, marketing_scopes(keyword, start_date, end_date)))
+
+    # 해당 키워드/기간의 데이터 버전이 그대로면 조회 없이 304 반환 (형식마다 본문이 다르므로 ETag에 형식 포함)
+    etag = data_etag("marketing/search-volume", {**params, "format": response_format}, versions)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    # 같은 조건의 결과는 해당 키워드/기간의 데이터가 바뀌기 전까지 캐시에서 반환
+    result = await run_db(db, lambda session: cached("marketing/search-volume", params, versions, lambda: load(session)))
+    if response_format != "json":
+        return columnar_response(result, response_format, etag)
+    return json_response(result, etag)
+
+# 저장된 키워드 자동완성 API (한글 음절/초성 접두어, 예: ?prefix=ㅅㅌ 또는 ?prefix=스타)
+# 메모리 색인에서 키워드별 행 수, 첫/마지막 날짜, 마지막 검색량을 함께 반환 (원본 테이블 조회 없음)
+@router.get("/keywords")
+async def get_keywords(
+    prefix: str = Query("", max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session | AsyncSession = Depends(get_db_session)
+):
+    # 서버 시작 이벤트 없이 실행된 경우(TestClient 등) 첫 조회 때 색인 생성
+    # 다른 프로세스가 저장한 키워드를 반영하도록 TTL이 지나면 다시 생성
+    if keyword_index.is_stale():
+        await run_db(db, keyword_index.build)
 
-    data = query.all()
-    if not data:
-        return [] # 빈 리스트 반환
-    return data
+    results, total = keyword_index.search(prefix, limit)
+    return json_response({"prefix": prefix, "total": total, "results": results})
 
 # JSON Body 스키마 정의 (크롤링 API용)
 class CrawlRequest(BaseModel):
     keyword: str
     start_date: str
     end_date: str
+    on_conflict: Literal["skip", "overwrite"] = "skip" # 이미 저장된 날짜 처리 방식
+    mode: Literal["incremental", "history"] = "incremental" # history: 과거 이력을 겹치는 구간으로 병렬 수집 (항상 덮어쓰기)
 
-# 특정 키워드의 검색량 데이터 크롤링 API
-@router.post("/search-volume")
+# 특정 키워드의 검색량 데이터 크롤링 API (작업 큐에 등록하고 작업 ID를 바로 반환)
+@router.post("/search-volume", status_code=202)
 def crawl_marketing_data(request: CrawlRequest):
-    save_search_volume(request.keyword, request.start_date, request.end_date)
-    return {"message": f"✅ {request.keyword} 검색량 데이터 크롤링 완료!"}
+    job, created = crawl_jobs.submit(request.keyword, request.start_date, request.end_date, request.on_conflict, request.mode)
+    return {
+        "message": f"✅ {request.keyword} 검색량 데이터 크롤링 작업이 등록되었습니다." if created
+            else f"⏳ {request.keyword} 검색량 데이터 크롤링이 이미 진행 중입니다.",
+        "job_id": job.id,
+        "status": job.status,
+    }
+
+# 크롤링 작업 상태 조회 API (진행 단계, 저장된 행 수, 오류)
+@router.get("/jobs/{job_id}")
+def get_crawl_job(job_id: str):
+    job = crawl_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"크롤링 작업을 찾을 수 없습니다: {job_id}")
+    return job.to_dict()
 
-# 특정 키워드의 검색량 증가율 분석 API (최근 7일 vs 이전 7일)
+# 여러 키워드의 검색량 증가율 분석 API (최근 N 기간 vs 이전 N 기간 또는 전년 동기)
+# 원본 테이블 대신 기간별 집계 테이블(marketing_rollup)의 몇 개 행만 읽음 (engine=parquet이면 Parquet 스냅샷에서 계산)
 @router.get("/search-volulme-trend")
-def get_search_trend(
-    keyword: str = Depends(get_valid_keyword), 
-    db: Session = Depends(get_db)
+async def get_search_trend(
+    keyword: list[str] = Query(..., min_length=1, title="검색 키워드 (여러 개 지정 가능)"),
+    unit: Literal["day", "week", "month"] = "day",
+    periods: int = Query(7, ge=1, le=366),
+    compare: Literal["previous", "year"] = "previous",
+    engine: Literal["db", "parquet"] = "db",
+    if_none_match: str = Depends(get_if_none_match),
+    db: Session | AsyncSession = Depends(get_db_session)
 ):
-    today = datetime.today()
-    last_week = today - timedelta(days=7)
-    two_weeks_ago = today - timedelta(days=14)
-
-    # 최근 7일 검색량 합산
-    current_volume = db.query(func.sum(MarketingData.search_volume)).filter(
-        MarketingData.keyword == keyword,
-        MarketingData.date >= last_week.strftime("%Y-%m-%d")
-    ).scalar() or 0
-
-    # 이전 7일 검색량 합산
-    previous_volume = db.query(func.sum(MarketingData.search_volume)).filter(
-        MarketingData.keyword == keyword,
-        (MarketingData.date >= two_weeks_ago.strftime("%Y-%m-%d")) & (MarketingData.date < last_week.strftime("%Y-%m-%d"))
-    ).scalar() or 0
-
-    # 증가율 계산
-    if previous_volume == 0:
-        change_rate = "N/A"
+    # 현재 구간: 오늘이 속한 기간을 포함한 최근 N개 기간
+    current_end = period_start(get_clock().today(), unit)
+    current_start = shift_period(current_end, unit, -(periods - 1))
+
+    # 비교 구간: 바로 앞 N개 기간 또는 1년 전 같은 기간
+    if compare == "year":
+        year_shift = {"day": 365, "week": 52, "month": 12}[unit]
+        previous_start = shift_period(current_start, unit, -year_shift)
+        previous_end = shift_period(current_end, unit, -year_shift)
     else:
-        change_rate = ((current_volume - previous_volume) / previous_volume * 100)
+        previous_start = shift_period(current_start, unit, -periods)
+        previous_end = shift_period(current_start, unit, -1)
 
-    return {
-        "keyword": keyword,
-        "search_volume": current_volume,
-        "last_week_search_volume": previous_volume,
-        "change_rate": f"{change_rate:.2f}%" if change_rate != "N/A" else "데이터가 부족합니다. 데이터가 쌓이면 정상적으로 분석됩니다."
-    }
+    # 요청 키워드의 검색량(또는 스냅샷) 버전과 기준 구간이 그대로면 조회 없이 304 반환
+    scopes, version = engine_scopes(engine, [scope for name in keyword for scope in marketing_scopes(name)])
+    versions = await run_db(db, lambda session: data_versions(session, scopes))
+    etag = data_etag(
+        "marketing/search-volume-trend",
+        {
+            "keyword": ",".join(keyword), "unit": unit, "periods": periods, "compare": compare,
+            "current_start": current_start, "engine": engine, "store_version": version,
+        },
+        versions,
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    if engine == "parquet":
+        # Parquet 스냅샷에서 두 구간의 일별 검색량만 읽어 키워드별 합계 계산
+        windows = [("current", current_start, period_end(current_end, unit)), ("previous", previous_start, period_end(previous_end, unit))]
+        totals = (await (
+            pl.concat([
+                scan_marketing(keyword, start, end).select("keyword", pl.lit(label).alias("window"), "search_volume")
+                for label, start, end in windows
+            ])
+            .group_by("keyword")
+            .agg(
+                pl.col("search_volume").filter(pl.col("window") == "current").sum(),
+                pl.col("search_volume").filter(pl.col("window") == "previous").sum().alias("previous_volume"),
+            )
+            .collect_async()
+        )).rows()
+    else:
+        in_current = MarketingRollup.period_start.between(current_start, current_end)
+        in_previous = MarketingRollup.period_start.between(previous_start, previous_end)
+
+        totals_query = (
+            select(
+                MarketingRollup.keyword,
+                func.sum(case((in_current, MarketingRollup.total_volume), else_=0)),
+                func.sum(case((in_previous, MarketingRollup.total_volume), else_=0)),
+            )
+            .where(
+                MarketingRollup.keyword.in_(keyword),
+                MarketingRollup.period == unit,
+                in_current | in_previous,
+            )
+            .group_by(MarketingRollup.keyword)
+        )
+        totals = await run_db(db, lambda session: session.execute(totals_query).all())
+    volumes = {row[0]: (row[1] or 0, row[2] or 0) for row in totals}
+
+    result = []
+    for name in keyword:
+        current_volume, previous_volume = volumes.get(name, (0, 0))
+
+        # 증가율 계산
+        if previous_volume == 0:
+            change_rate = "데이터가 부족합니다. 데이터가 쌓이면 정상적으로 분석됩니다."
+        else:
+            change_rate = f"{(current_volume - previous_volume) / previous_volume * 100:.2f}%"
+
+        result.append({
+            "keyword": name,
+            "current_period": [current_start, period_end(current_end, unit)],
+            "previous_period": [previous_start, period_end(previous_end, unit)],
+            "search_volume": current_volume,
+            "previous_search_volume": previous_volume,
+            "last_week_search_volume": previous_volume, # 기존 단일 키워드 응답과의 호환용 (previous_search_volume과 같은 값)
+            "change_rate": change_rate,
+        })
+
+    # 키워드 하나만 요청한 경우 기존처럼 단일 객체로 반환
+    return json_response(result[0] if len(result) == 1 else result, etag)
@@ -1,48 +1,137 @@
-from fastapi import APIRouter, Depends, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 import polars as pl
+import pyarrow as pa
+from datetime import date, datetime
+from typing import Literal
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
-from backend.app.database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.app.models.model import SalesData
-from backend.app.utils.validators import validate_date, validate_positive_number, validate_csv_data, validate_no_duplicate_date_in_db
+from backend.app.utils.validators import (
+    validate_date, validate_positive_number, validate_csv_data, validate_no_duplicate_date_in_db,
+    check_csv_batches, parsed_date_expr, parsed_revenue_expr,
+)
+from backend.app.services.sales_loader import bulk_load_sales_csv, iter_csv_chunks, DEFAULT_CHUNK_SIZE
+from backend.app.services.rollups import refresh_sales_rollups
+from backend.app.services.anomalies import track_sales_anomalies
+from backend.app.services.cache import cached, data_etag, data_versions, sales_scopes, invalidate_sales
+from backend.app.dependencies import get_response_format, get_if_none_match, get_db, get_db_session, run_db
+from backend.app.utils.responses import (
+    rows_to_table, columnar_response, ndjson_response, json_response, etag_matches, not_modified_response,
+)
+from backend.app.utils.pagination import encode_cursor, decode_cursor
+from backend.app.utils.downsample import date_bucket, downsample_rows, validate_reduction
 
 router = APIRouter(prefix="/sales", tags=["Sales Data"])
 
-# 데이터베이스 세션 의존성 주입
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# 매출 조회 결과의 Arrow 스키마
+SALES_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("date", pa.date32()),
+    ("revenue", pa.int64()),
+])
+
+# 주/월 단위 집계 조회 결과의 Arrow 스키마 (days: 기간 안에 데이터가 있는 날짜 수)
+SALES_BUCKET_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("revenue", pa.int64()),
+    ("days", pa.int64()),
+])
 
-# 모든 매출 데이터 조회 (기간 설정 가능)
+# 모든 매출 데이터 조회 (기간 설정 가능, format=json|ndjson|arrow|parquet)
+# limit을 지정하면 date 기준 keyset 페이지와 next_cursor를 반환
+# bucket=week|month는 DB에서 기간별 합계로 집계하고, max_points는 LTTB로 차트에 필요한 점 수만 남김
 @router.get("/")
-def get_sales_data(
-    start_date: str = Depends(validate_date),
-    end_date: str = Depends(validate_date),
-    db: Session = Depends(get_db)
+async def get_sales_data(
+    start_date: date = None,
+    end_date: date = None,
+    limit: int = Query(None, ge=1, le=10_000),
+    cursor: str = None,
+    bucket: Literal["day", "week", "month"] = "day",
+    max_points: int = Query(None, ge=3, le=10_000),
+    response_format: str = Depends(get_response_format),
+    if_none_match: str = Depends(get_if_none_match),
+    db: Session | AsyncSession = Depends(get_db_session)
 ):
-    query = db.query(SalesData)
+    validate_reduction(bucket, max_points, limit, cursor, response_format)
+
+    if bucket == "day":
+        query = select(SalesData.id, SalesData.date, SalesData.revenue).order_by(SalesData.date)
+    else:
+        period = date_bucket(bucket, SalesData.date)
+        query = (
+            select(period.label("date"), func.sum(SalesData.revenue).label("revenue"), func.count().label("days"))
+            .group_by(period)
+            .order_by(period)
+        )
     if start_date and end_date:
-        query = query.filter(SalesData.date.between(start_date, end_date))
-    
-    data = query.all()
-    if not data:
-        return [] # 빈 리스트 반환
-    return data
+        query = query.where(SalesData.date.between(start_date, end_date))
+
+    # 커서가 있으면 마지막으로 받은 날짜 이후부터 조회
+    if cursor:
+        after = decode_cursor(cursor, {"date": date.fromisoformat})
+        query = query.where(SalesData.date > after["date"])
+
+    # NDJSON은 캐시 없이 서버 측 커서로 스트리밍
+    if response_format == "ndjson":
+        return ndjson_response(query)
+
+    paginate = limit is not None and response_format == "json"
+    if paginate:
+        query = query.limit(limit + 1)
+
+    def load(session: Session):
+        rows = downsample_rows(session.execute(query).all(), max_points, "revenue")
+
+        # 칼럼 기반 형식은 조회 결과에서 바로 Arrow 테이블을 만듦
+        if response_format != "json":
+            return rows_to_table(rows, SALES_SCHEMA if bucket == "day" else SALES_BUCKET_SCHEMA)
+        if not paginate:
+            return [row._asdict() for row in rows]
+
+        page = rows[:limit]
+        return {
+            "data": [row._asdict() for row in page],
+            "next_cursor": encode_cursor({"date": page[-1].date}) if len(rows) > limit else None,
+        }
+
+    params = {
+        "start_date": start_date, "end_date": end_date,
+        "limit": limit if paginate else None, "cursor": cursor, "columnar": response_format != "json",
+        "bucket": bucket, "max_points": max_points,
+    }
+    versions = await run_db(db, lambda session: data_versions(session, sales_scopes(start_date, end_date)))
+
+    # 해당 기간의 매출 데이터 버전이 그대로면 조회 없이 304 반환 (형식마다 본문이 다르므로 ETag에 형식 포함)
+    etag = data_etag("sales", {**params, "format": response_format}, versions)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    # 같은 기간의 결과는 매출 데이터가 바뀌기 전까지 캐시에서 반환
+    result = await run_db(db, lambda session: cached("sales", params, versions, lambda: load(session)))
+    if response_format != "json":
+        return columnar_response(result, response_format, etag)
+    return json_response(result, etag)
 
 # 새로운 매출 데이터 추가 (단일 데이터)
 @router.post("/")
 def add_sales_data(
-    date: str = Depends(validate_date), 
-    revenue: int = Depends(validate_positive_number), 
+    date: str = Query(..., title="매출 날짜 (YYYY-MM-DD)"),
+    revenue: int = Query(..., title="매출액"),
     db: Session = Depends(get_db)
 ):
+    validate_date(date)
+    validate_positive_number(revenue)
     validate_no_duplicate_date_in_db(db, date)
 
-    new_data = SalesData(date=date, revenue=revenue)
+    saved_date = datetime.strptime(date, "%Y-%m-%d").date()
+    new_data = SalesData(date=saved_date, revenue=revenue)
     db.add(new_data)
+    db.flush()
+    refresh_sales_rollups(db, [saved_date])
+    track_sales_anomalies(db, [saved_date])
     db.commit()
+    invalidate_sales([saved_date])
     db.refresh(new_data)
     return {"message": "단일 매출 데이터가 성공적으로 저장되었습니다.", "data": new_data}
 
@@ -50,25 +139,36 @@ def add_sales_data(
 @router.post("/files")
 def upload_sales_data(
     file: UploadFile = File(...), 
+    bulk: bool = False,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1_000, le=1_000_000),
     db: Session = Depends(get_db)
 ):
+    # 대용량 파일은 청크 단위 스트리밍 저장 (잘못된 행은 거부 행으로 집계)
+    if bulk:
+        try:
+            report = bulk_load_sales_csv(db, file.file, chunk_size)
+        except Exception as e:
+            return {"error": str(e)}
+        return {
+            "message": f"✅ {report['inserted']}개의 매출 데이터가 성공적으로 저장되었습니다.",
+            **report
+        }
+
     try:
-        # CSV 파일을 Polars DataFrame으로 읽고 검증 함수 호출
-        df = pl.read_csv(file.file)
+        # CSV 파일을 문자열 칼럼으로 읽고 모든 검증 규칙을 한 번의 칼럼 연산으로 평가
+        df = pl.read_csv(file.file, infer_schema=False)
         validate_csv_data(df)
 
-        # DB에서 날짜 데이터를 객체 리스트로 반환해 set으로 저장
-        existing_dates = {row.date.strftime("%Y-%m-%d") for row in db.query(SalesData.date).all()}
+        # 파일 날짜 범위에 해당하는 DB 날짜만 조회
+        rows = df.select(parsed_date_expr().alias("date"), parsed_revenue_expr().alias("revenue"))
+        existing_dates = pl.Series("date", db.execute(
+            select(SalesData.date).where(SalesData.date.between(rows["date"].min(), rows["date"].max()))
+        ).scalars().all(), dtype=pl.Date)
 
-        new_records = []
-        skipped_dates = []
-
-        # 날짜가 중복이면 데이터를 저장하지 않음
-        for row in df.iter_rows(named=True):
-            if row["date"] in existing_dates:
-                skipped_dates.append(row["date"]) # 알림을 위한 중복 날짜 기록
-                continue
-            new_records.append(SalesData(date=row["date"], revenue=row["revenue"]))
+        # DB에 이미 있는 날짜는 저장하지 않고 알림을 위해 기록
+        is_existing = pl.col("date").is_in(existing_dates)
+        skipped_dates = [day.isoformat() for day in rows.filter(is_existing)["date"]]
+        new_records = rows.filter(~is_existing).to_dicts()
 
         # 모든 날짜가 중복이면 메시지 반환
         if not new_records:
@@ -77,15 +177,39 @@ def upload_sales_data(
                 "skipped_dates": skipped_dates
             }
 
-        # 객체 리스트를 DB에 저장
-        db.add_all(new_records)
+        # 새 날짜만 한 번의 executemany로 저장하고 일 단위 매출 집계 갱신
+        db.execute(insert(SalesData), new_records)
+        saved_dates = [record["date"] for record in new_records]
+        refresh_sales_rollups(db, saved_dates)
+        track_sales_anomalies(db, saved_dates)
         db.commit()
+        invalidate_sales(saved_dates)
 
         # 저장 내역에 대한 메시지 반환
         return {
             "message": f"✅ {len(new_records)}개의 매출 데이터가 성공적으로 저장되었습니다.",
             "skipped_dates": f"{skipped_dates}"
         }
+    except HTTPException as e:
+        # 검증 실패 시 규칙별 위반 행 보고서를 함께 반환
+        if isinstance(e.detail, dict):
+            return {"error": f"{e.status_code}: {e.detail['message']}", "validation": e.detail}
+        return {"error": str(e)}
     except Exception as e:
         return {"error": str(e)}
-    
\ No newline at end of file
+
+# CSV 파일을 저장하지 않고 검증만 수행 (청크 단위로 읽어 규칙별 위반 행 번호와 DB에 이미 있는 날짜를 보고)
+@router.post("/files/validate")
+def validate_sales_file(
+    file: UploadFile = File(...),
+    check_db: bool = True,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1_000, le=1_000_000),
+    db: Session = Depends(get_db)
+):
+    # 청크마다 해당 날짜 범위의 DB 날짜만 조회 (매출 테이블 전체를 읽지 않음)
+    def lookup_existing_dates(start: date, end: date) -> pl.Series:
+        return pl.Series("date", db.execute(
+            select(SalesData.date).where(SalesData.date.between(start, end))
+        ).scalars().all(), dtype=pl.Date)
+
+    return check_csv_batches(iter_csv_chunks(file.file, chunk_size), lookup_existing_dates if check_db else None)
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
+from backend.app.dependencies import get_db
+from backend.app.services.scheduler import (
+    add_watchlist_keyword, remove_watchlist_keyword, watchlist_status,
+    WATCHLIST_INTERVAL_HOURS, WATCHLIST_LOOKBACK_DAYS,
+)
+
+router = APIRouter(prefix="/watchlist", tags=["Watchlist"])
+
+# JSON Body 스키마 정의 (관심 키워드 등록용)
+class WatchlistRequest(BaseModel):
+    keyword: str = Field(..., min_length=1, max_length=100)
+    interval_hours: float = Field(WATCHLIST_INTERVAL_HOURS, gt=0) # 수집 주기 (시간)
+    priority: int = 0 # 높을수록 먼저 수집
+    lookback_days: int = Field(WATCHLIST_LOOKBACK_DAYS, ge=1, le=3650) # 처음 수집할 기간 (일)
+
+# 관심 키워드 등록/수정 API (스케줄러가 주기마다 수집)
+@router.post("")
+def add_watchlist(request: WatchlistRequest, db: Session = Depends(get_db)):
+    entry = add_watchlist_keyword(db, request.keyword, request.interval_hours, request.priority, request.lookback_days)
+    return {
+        "message": f"✅ {entry.keyword} 키워드가 정기 수집 대상에 등록되었습니다.",
+        "keyword": entry.keyword,
+        "next_due_at": entry.next_due_at,
+    }
+
+# 관심 키워드 삭제 API (이미 수집한 검색량 데이터는 유지)
+@router.delete("/{keyword}")
+def delete_watchlist(keyword: str, db: Session = Depends(get_db)):
+    if not remove_watchlist_keyword(db, keyword):
+        raise HTTPException(status_code=404, detail=f"정기 수집 대상이 아닌 키워드입니다: {keyword}")
+    return {"message": f"🗑️ {keyword} 키워드를 정기 수집 대상에서 삭제했습니다."}
+
+# 스케줄러 실행 기록, 오늘 DataLab 쿼터, 키워드별 최신 수집 상태와 지연 시간 조회 API
+@router.get("/status")
+def get_watchlist_status(runs: int = Query(20, ge=1, le=500), db: Session = Depends(get_db)):
+    return watchlist_status(db, runs)
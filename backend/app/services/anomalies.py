@@ -0,0 +1,248 @@
+import json
+import os
+import warnings
+from datetime import date, datetime
+import numpy as np
+import polars as pl
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+from backend.app.database import SessionLocal
+from backend.app.models.model import MarketingData, SalesData, AnomalyState, Anomaly
+from backend.app.services.clock import get_clock
+
+# .env 파일 로드
+load_dotenv()
+
+# EWMA 기간(span)과 중앙값/MAD를 계산할 최근 값 개수
+ANOMALY_EWMA_SPAN = int(os.getenv("ANOMALY_EWMA_SPAN", "28"))
+ANOMALY_WINDOW = int(os.getenv("ANOMALY_WINDOW", "28"))
+# 이 개수만큼 이전 값이 쌓인 뒤부터 판정
+ANOMALY_MIN_HISTORY = int(os.getenv("ANOMALY_MIN_HISTORY", "14"))
+# EWMA z-score와 MAD 기반 robust z-score가 모두 임계값 이상이면 이상치
+ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "3.0"))
+ANOMALY_MAD_THRESHOLD = float(os.getenv("ANOMALY_MAD_THRESHOLD", "3.5"))
+# EWMA 표준편차 하한 (절대값, 평균 대비 비율 중 큰 값)
+# 평평한 구간(예: 0이 이어진 뒤)은 분산이 0이 되어 z-score가 무한대가 되므로, 하한을 두어 그 뒤의 급변도 판정
+ANOMALY_MIN_STD = float(os.getenv("ANOMALY_MIN_STD", "0.5"))
+ANOMALY_MIN_STD_RATIO = float(os.getenv("ANOMALY_MIN_STD_RATIO", "0.01"))
+
+ALPHA = 2 / (ANOMALY_EWMA_SPAN + 1)
+# 정규분포에서 MAD를 표준편차 단위로 바꾸는 계수
+MAD_SCALE = 1.4826
+
+# 전체 재계산 시 한 번에 처리할 키워드 수 (window 행렬 메모리 상한)
+BACKFILL_BATCH_KEYWORDS = 50
+
+SERIES = ("marketing", "sales")
+SALES_KEY = ""
+
+# 시계열별 (키, 날짜, 값) 조회 쿼리 (매출은 키가 빈 문자열인 시계열 하나)
+def _points_query(series: str, keys: list[str] = None, after: date = None):
+    if series == "sales":
+        query = select(literal(SALES_KEY).label("key"), SalesData.date, SalesData.revenue.label("value")).order_by(SalesData.date)
+        return query.where(SalesData.date > after) if after else query
+
+    query = (
+        select(MarketingData.keyword.label("key"), MarketingData.date, MarketingData.search_volume.label("value"))
+        .order_by(MarketingData.keyword, MarketingData.date)
+    )
+    if keys is not None:
+        query = query.where(MarketingData.keyword.in_(keys))
+    return query.where(MarketingData.date > after) if after else query
+
+# 하한을 적용한 EWMA 표준편차 (numpy 배열과 스칼라 모두 처리, 분산이 NaN인 첫 점은 NaN 유지)
+def _ewma_std(mean, var):
+    floor = np.maximum(ANOMALY_MIN_STD, ANOMALY_MIN_STD_RATIO * np.abs(mean))
+    return np.sqrt(np.maximum(var, floor ** 2))
+
+def _is_flagged(history: int, zscore: float, mad_score: float) -> bool:
+    return (
+        history >= ANOMALY_MIN_HISTORY
+        and np.isfinite(zscore) and abs(zscore) >= ANOMALY_Z_THRESHOLD
+        and not np.isnan(mad_score) and abs(mad_score) >= ANOMALY_MAD_THRESHOLD
+    )
+
+def _anomaly_row(series: str, key: str, day: date, value: float, expected: float, zscore: float, median: float, mad_score: float, detected_at: datetime) -> dict:
+    return {
+        "series": series, "keyword": key, "date": day, "value": float(value), "expected": float(expected),
+        "zscore": float(zscore), "median": float(median),
+        # MAD가 0인 평평한 구간에서 벗어난 점은 무한대이므로 null로 저장
+        "mad_score": float(mad_score) if np.isfinite(mad_score) else None,
+        "detected_at": detected_at,
+    }
+
+# 정렬된 (key, date, value) DataFrame 전체를 한 번에 계산
+# 각 점은 같은 시계열의 직전 점까지의 EWMA 평균/분산, 직전 ANOMALY_WINDOW개 값의 중앙값/MAD와 비교
+# 반환값: (이상치 행 목록, 시계열별 마지막 상태 행 목록)
+def score_frame(series: str, df: pl.DataFrame, detected_at: datetime) -> tuple[list[dict], list[dict]]:
+    if df.is_empty():
+        return [], []
+
+    df = df.with_columns(pl.col("value").cast(pl.Float64)).with_columns(
+        pl.col("value").ewm_mean(alpha=ALPHA, adjust=False).over("key").alias("mean"),
+        pl.col("value").ewm_var(alpha=ALPHA, adjust=False, bias=True).over("key").alias("var"),
+        pl.int_range(pl.len()).over("key").alias("history"),
+    ).with_columns(
+        pl.col("mean").shift(1).over("key").alias("previous_mean"),
+        pl.col("var").shift(1).over("key").alias("previous_var"),
+    )
+
+    # 직전 window 행렬: i번째 행은 i-W ~ i-1 행의 값 (다른 시계열 값은 NaN으로 가림)
+    values = df["value"].to_numpy()
+    keys = df["key"].rank("dense").to_numpy()
+    offsets = np.arange(len(values))[:, None] - np.arange(ANOMALY_WINDOW, 0, -1)[None, :]
+    clipped = np.clip(offsets, 0, None)
+    windows = np.where((offsets >= 0) & (keys[clipped] == keys[:, None]), values[clipped], np.nan)
+
+    # 앞쪽 행처럼 window가 모두 NaN이면 중앙값도 NaN (경고 생략)
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(windows, axis=1)
+        mad = np.nanmedian(np.abs(windows - median[:, None]), axis=1)
+        previous_mean = df["previous_mean"].to_numpy()
+        zscore = (values - previous_mean) / _ewma_std(previous_mean, df["previous_var"].to_numpy())
+        mad_score = (values - median) / (MAD_SCALE * mad)
+
+    history = df["history"].to_numpy()
+    flagged = (
+        (history >= ANOMALY_MIN_HISTORY)
+        & np.isfinite(zscore) & (np.abs(zscore) >= ANOMALY_Z_THRESHOLD)
+        & ~np.isnan(mad_score) & (np.abs(mad_score) >= ANOMALY_MAD_THRESHOLD)
+    )
+
+    anomalies = [
+        _anomaly_row(series, *row, detected_at)
+        for row in df.with_columns(zscore=zscore, median=median, mad_score=mad_score)
+        .filter(flagged)
+        .select("key", "date", "value", "previous_mean", "zscore", "median", "mad_score")
+        .iter_rows()
+    ]
+
+    states = [
+        {
+            "series": series, "keyword": key, "last_date": last_date, "point_count": count,
+            "ewma_mean": mean, "ewma_var": var, "window": json.dumps(window), "updated_at": detected_at,
+        }
+        for key, last_date, count, mean, var, window in df.group_by("key", maintain_order=True).agg(
+            pl.col("date").last(), pl.len(), pl.col("mean").last(), pl.col("var").last(), pl.col("value").tail(ANOMALY_WINDOW),
+        ).iter_rows()
+    ]
+    return anomalies, states
+
+# 지정한 시계열 전체를 원본 테이블에서 다시 계산해 상태와 이상치를 교체
+def _recompute(db: Session, series: str, keys: list[str]):
+    detected_at = get_clock().now()
+    for start in range(0, len(keys), BACKFILL_BATCH_KEYWORDS):
+        batch = keys[start:start + BACKFILL_BATCH_KEYWORDS]
+        df = pl.DataFrame(
+            db.execute(_points_query(series, batch)).all(),
+            schema={"key": pl.String, "date": pl.Date, "value": pl.Float64},
+            orient="row",
+        )
+        anomalies, states = score_frame(series, df, detected_at)
+
+        db.execute(delete(Anomaly).where(Anomaly.series == series, Anomaly.keyword.in_(batch)))
+        db.execute(delete(AnomalyState).where(AnomalyState.series == series, AnomalyState.keyword.in_(batch)))
+        if anomalies:
+            db.execute(insert(Anomaly), anomalies)
+        if states:
+            db.execute(insert(AnomalyState), states)
+
+# 저장된 상태에 새 값 하나를 반영하기 전 점수를 계산하고 상태를 갱신 (window 크기가 고정이므로 점마다 상수 시간)
+def observe_point(state: AnomalyState, day: date, value: float) -> tuple[float, float, float]:
+    window = np.array(json.loads(state.window), dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        median = float(np.median(window)) if window.size else np.nan
+        mad = float(np.median(np.abs(window - median))) if window.size else np.nan
+        zscore = (value - state.ewma_mean) / _ewma_std(state.ewma_mean, state.ewma_var)
+        mad_score = np.float64(value - median) / (MAD_SCALE * mad)
+
+    # EWMA 평균/분산 갱신 (Polars ewm_mean/ewm_var(adjust=False, bias=True)와 같은 점화식)
+    diff = value - state.ewma_mean
+    increment = ALPHA * diff
+    state.ewma_mean += increment
+    state.ewma_var = (1 - ALPHA) * (state.ewma_var + diff * increment)
+    state.window = json.dumps((list(window) + [value])[-ANOMALY_WINDOW:])
+    state.point_count += 1
+    state.last_date = day
+    return zscore, median, mad_score
+
+# 변경된 시계열 반영 (touched: 키별 변경된 가장 이른 날짜)
+# 상태가 없거나 이미 반영한 날짜 이전 값이 바뀐 시계열은 전체를 다시 계산하고,
+# 나머지는 마지막 반영 날짜 이후의 새 점만 저장된 상태에 차례로 반영
+def _track(db: Session, series: str, touched: dict[str, date]):
+    if not touched:
+        return
+
+    states = {
+        state.keyword: state
+        for state in db.execute(
+            select(AnomalyState).where(AnomalyState.series == series, AnomalyState.keyword.in_(list(touched)))
+        ).scalars()
+    }
+    recompute = sorted(key for key, first in touched.items() if key not in states or first <= states[key].last_date)
+    incremental = {key: states[key] for key in touched if key not in recompute}
+    # 다시 계산할 시계열의 기존 상태 객체는 세션에서 떼어내고 새 행으로 교체
+    for key in recompute:
+        if key in states:
+            db.expunge(states[key])
+    _recompute(db, series, recompute)
+    if not incremental:
+        return
+
+    detected_at = get_clock().now()
+    after = min(state.last_date for state in incremental.values())
+    anomalies = []
+    for key, day, value in db.execute(_points_query(series, list(incremental), after)):
+        state = incremental[key]
+        if day <= state.last_date:
+            continue
+        history = state.point_count
+        expected = state.ewma_mean
+        zscore, median, mad_score = observe_point(state, day, float(value))
+        if _is_flagged(history, zscore, mad_score):
+            anomalies.append(_anomaly_row(series, key, day, value, expected, zscore, median, mad_score, detected_at))
+
+    for state in incremental.values():
+        state.updated_at = detected_at
+    if anomalies:
+        db.execute(insert(Anomaly), anomalies)
+
+# 크롤러 저장 후 같은 트랜잭션에서 호출
+def track_marketing_anomalies(db: Session, rows: list[dict]):
+    touched: dict[str, date] = {}
+    for row in rows:
+        touched[row["keyword"]] = min(touched.get(row["keyword"], row["date"]), row["date"])
+    _track(db, "marketing", touched)
+
+# 매출 저장 후 같은 트랜잭션에서 호출
+def track_sales_anomalies(db: Session, dates: list[date]):
+    if dates:
+        _track(db, "sales", {SALES_KEY: min(dates)})
+
+# 전체 이력으로 모든 시계열의 상태와 이상치를 다시 계산 (최초 도입, 임계값 변경 시)
+def backfill_anomalies(db: Session) -> dict:
+    keywords = db.execute(select(MarketingData.keyword).distinct().order_by(MarketingData.keyword)).scalars().all()
+    db.execute(delete(Anomaly))
+    db.execute(delete(AnomalyState))
+    _recompute(db, "marketing", keywords)
+    _recompute(db, "sales", [SALES_KEY])
+    db.commit()
+
+    return {
+        "keywords": len(keywords),
+        "anomalies": {
+            series: db.execute(select(func.count()).select_from(Anomaly).where(Anomaly.series == series)).scalar_one()
+            for series in SERIES
+        },
+    }
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print("Backfilling anomalies...")
+        print(json.dumps(backfill_anomalies(db), ensure_ascii=False))
+        print("Anomalies backfilled successfully!")
+    finally:
+        db.close()
@@ -0,0 +1,181 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from backend.app.database import SessionLocal
+from backend.app.models.model import CacheVersion
+from backend.app.utils.upsert import increment_rows
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+
+_MISSING = object()
+
+# 조회 결과 캐시 인터페이스 (공유 저장소 구현으로 교체 가능)
+# 무효화용 버전 카운터는 캐시가 아니라 cache_version 테이블에 두므로, 결과 캐시가 프로세스별이어도
+# 다른 워커나 크롤러/스케줄러 프로세스가 올린 버전을 모든 워커가 바로 봄 (재시작해도 버전이 이어짐)
+class CacheBackend:
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+# 프로세스 내 LRU + TTL 캐시 (항목 수와 직렬화 크기 합계로 메모리 상한 제한)
+class InMemoryCache(CacheBackend):
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES, ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, int, object]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return _MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: str, value):
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+_cache: CacheBackend = InMemoryCache()
+
+def get_cache() -> CacheBackend:
+    return _cache
+
+def set_cache(backend: CacheBackend):
+    global _cache
+    _cache = backend
+
+# 날짜 구간이 걸치는 월 목록 (YYYY-MM)
+def _months(start: date, end: date) -> list[str]:
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+# 조회 구간의 무효화 범위: 기간이 있으면 걸치는 월별 버전, 없으면 전체 버전(*)
+def _read_scopes(prefix: str, start: date = None, end: date = None) -> list[str]:
+    if start is None or end is None or start > end:
+        return [f"{prefix}:*"]
+    return [f"{prefix}:{month}" for month in _months(start, end)]
+
+# 쓰기 시 변경된 날짜가 속한 월별 버전과 전체 버전(*)을 함께 올림
+def _write_scopes(prefix: str, dates) -> list[str]:
+    months = {f"{day.year:04d}-{day.month:02d}" for day in dates}
+    return [f"{prefix}:*"] + [f"{prefix}:{month}" for month in sorted(months)]
+
+def marketing_scopes(keyword: str, start: date = None, end: date = None) -> list[str]:
+    return _read_scopes(f"marketing:{keyword}", start, end)
+
+def sales_scopes(start: date = None, end: date = None) -> list[str]:
+    return _read_scopes("sales", start, end)
+
+# 크롤러 저장 후 호출: 키워드별로 변경된 날짜의 버전 증가
+def invalidate_marketing(rows: list[dict]):
+    touched: dict[str, set[date]] = {}
+    for row in rows:
+        touched.setdefault(row["keyword"], set()).add(row["date"])
+    bump_versions([
+        scope
+        for keyword, dates in touched.items()
+        for scope in _write_scopes(f"marketing:{keyword}", dates)
+    ])
+
+# 매출 저장 후 호출: 변경된 날짜의 버전 증가
+def invalidate_sales(dates):
+    dates = list(dates)
+    if dates:
+        bump_versions(_write_scopes("sales", dates))
+
+# 조회 범위별 현재 버전 [(범위, 버전), ...] (요청마다 한 번, 요청 세션으로 읽어 ETag와 캐시 키에 함께 사용)
+# 라우트에서는 run_db로 호출하므로 DB_ASYNC면 비동기 드라이버로 조회
+def data_versions(db: Session, scopes: list[str]) -> list[tuple[str, int]]:
+    if not scopes:
+        return []
+    versions = dict(db.execute(
+        select(CacheVersion.scope, CacheVersion.version).where(CacheVersion.scope.in_(scopes))
+    ).all())
+    return [(scope, versions.get(scope, 0)) for scope in scopes]
+
+# 범위별로 1씩 증가 (여러 프로세스가 동시에 올려도 누락 없음, 저장 트랜잭션을 커밋한 뒤 별도 세션으로 반영)
+def bump_versions(scopes: list[str]):
+    db: Session = SessionLocal()
+    try:
+        increment_rows(db, CacheVersion, [{"scope": scope, "version": 1} for scope in sorted(set(scopes))], ["scope"], "version")
+        db.commit()
+    finally:
+        db.close()
+
+# 엔드포인트와 정규화된 파라미터, 관련 데이터 버전으로 만든 캐시 키
+def cache_key(endpoint: str, params: dict, versions: list[tuple[str, int]]) -> str:
+    normalized = "&".join(f"{name}={params[name]}" for name in sorted(params))
+    version_tag = hashlib.sha1(repr(list(versions)).encode()).hexdigest()
+    return f"{endpoint}?{normalized}#{version_tag}"
+
+# 캐시 키와 같은 입력으로 만든 강한 ETag (데이터 버전이 그대로면 조회하지 않고도 같은 값)
+def data_etag(endpoint: str, params: dict, versions: list[tuple[str, int]]) -> str:
+    return '"' + hashlib.sha1(cache_key(endpoint, params, versions).encode()).hexdigest() + '"'
+
+# 캐시 키로 조회하고 캐시에 없을 때만 loader 실행
+def cached(endpoint: str, params: dict, versions: list[tuple[str, int]], loader):
+    cache = get_cache()
+    key = cache_key(endpoint, params, versions)
+
+    value = cache.get(key)
+    if value is _MISSING:
+        value = loader()
+        cache.set(key, value)
+    return value
@@ -0,0 +1,36 @@
+import time
+from datetime import date, datetime, timedelta
+
+# 현재 시각과 대기를 제공하는 시계 (스케줄러, 쿼터 집계, 크롤링 기준일이 모두 이 시계를 사용)
+class SystemClock:
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def today(self) -> date:
+        return self.now().date()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+# 테스트용 시계 (sleep은 실제로 기다리지 않고 시각만 앞으로 옮김)
+class FakeClock(SystemClock):
+    def __init__(self, start: datetime):
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance(self, seconds: float = 0, **kwargs):
+        self._now += timedelta(seconds=seconds, **kwargs)
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+_clock: SystemClock = SystemClock()
+
+def get_clock() -> SystemClock:
+    return _clock
+
+def set_clock(clock: SystemClock):
+    global _clock
+    _clock = clock
@@ -0,0 +1,50 @@
+import numpy as np
+import polars as pl
+
+# 상관계수를 계산하기 위한 최소 겹치는 날짜 수
+MIN_OVERLAP = 3
+
+# 행렬의 각 행을 평균 순위로 변환 (NaN은 순위 계산에서 제외하고 NaN으로 유지)
+def rank_rows(matrix: np.ndarray) -> np.ndarray:
+    if matrix.size == 0:
+        return matrix
+    ranked = pl.from_numpy(matrix.T).select(pl.all().fill_nan(None).rank("average").cast(pl.Float64))
+    return ranked.to_numpy().T
+
+# 키워드 x 날짜 행렬(x)의 각 행과 y의 피어슨 상관계수를 한 번에 계산
+# 각 행마다 둘 다 값이 있는 날짜만 사용하며, 겹치는 날짜가 min_overlap 미만이거나 분산이 0이면 NaN
+def pearson_rows(x: np.ndarray, y: np.ndarray, min_overlap: int = MIN_OVERLAP) -> tuple[np.ndarray, np.ndarray]:
+    mask = ~np.isnan(x) & ~np.isnan(y)
+    n = mask.sum(axis=1)
+    xm = np.where(mask, x, 0.0)
+    ym = np.where(mask, y, 0.0)
+
+    sx, sy = xm.sum(axis=1), ym.sum(axis=1)
+    sxx, syy, sxy = (xm * xm).sum(axis=1), (ym * ym).sum(axis=1), (xm * ym).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    r[(n < min_overlap) | ~np.isfinite(r)] = np.nan
+    return np.clip(r, -1.0, 1.0), n
+
+# 시차별 상관계수 계산: lag일 후의 매출(y[t + lag])과 당일 검색량(x[:, t])을 비교
+# 반환값은 (pearson, spearman, overlap) 각각 키워드 x (max_lag + 1) 행렬
+def lagged_correlations(x: np.ndarray, y: np.ndarray, max_lag: int, min_overlap: int = MIN_OVERLAP):
+    keywords, days = x.shape
+    shape = (keywords, max_lag + 1)
+    pearson, spearman = np.full(shape, np.nan), np.full(shape, np.nan)
+    overlap = np.zeros(shape, dtype=np.int64)
+
+    for lag in range(min(max_lag, days - 1) + 1):
+        xl = x[:, :days - lag]
+        yl = np.broadcast_to(y[lag:], xl.shape)
+        pearson[:, lag], overlap[:, lag] = pearson_rows(xl, yl, min_overlap)
+
+        # 스피어만: 키워드마다 겹치는 날짜만 남긴 뒤 양쪽을 순위로 바꿔 피어슨 계산
+        mask = ~np.isnan(xl) & ~np.isnan(yl)
+        spearman[:, lag], _ = pearson_rows(
+            rank_rows(np.where(mask, xl, np.nan)),
+            rank_rows(np.where(mask, yl, np.nan)),
+            min_overlap,
+        )
+
+    return pearson, spearman, overlap
@@ -1,8 +1,24 @@
 import requests
 import json
+import time
+import math
+from datetime import date, timedelta
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from backend.app.database import SessionLocal
-from backend.app.models.model import MarketingData
+from backend.app.models.model import MarketingData, CrawlState
+from backend.app.services.datalab_client import (
+    crawl_keywords, crawl_keywords_history, stitch_windows, DATALAB_URL, HISTORY_WINDOW_DAYS, HISTORY_OVERLAP_DAYS,
+)
+from backend.app.services.rollups import refresh_marketing_rollups
+from backend.app.services.cache import invalidate_marketing
+from backend.app.services.keyword_index import refresh_keyword_index
+from backend.app.services.anomalies import track_marketing_anomalies
+from backend.app.services.metrics import observe_datalab
+from backend.app.services.clock import get_clock
+from backend.app.services.quota import reserve_datalab_request
+from backend.app.services.response_store import lookup_response, save_response
+from backend.app.utils.upsert import upsert_rows
 from dotenv import load_dotenv
 import os
 
@@ -13,9 +29,12 @@ load_dotenv()
 CLIENT_ID = os.getenv("CLIENT_ID")
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
 
+# 새로 받은 값을 저장된 값의 척도에 맞추기 위해 수집 구간 앞뒤로 함께 요청할 일수
+DATALAB_ANCHOR_DAYS = int(os.getenv("DATALAB_ANCHOR_DAYS", "28"))
+
 # 네이버 데이터랩 API 요청
 def get_search_volume(keyword: str, start_date: str, end_date: str):
-    url = "https://openapi.naver.com/v1/datalab/search"
+    url = DATALAB_URL
 
     headers = {
         "X-Naver-Client-Id": CLIENT_ID,
@@ -30,31 +49,256 @@ def get_search_volume(keyword: str, start_date: str, end_date: str):
         "keywordGroups": [{"groupName": keyword, "keywords": [keyword]}]
     }
 
-    response = requests.post(url, headers=headers, data=json.dumps(body))
-    
+    # 저장된 원본 응답이 있으면 API를 호출하지 않음
+    stored = lookup_response(body)
+    if stored is not None:
+        return stored
+
+    # 요청 시간과 결과 상태를 지표로 기록 (연결 오류도 실패로 집계)
+    reserve_datalab_request()
+    started = time.perf_counter()
+    try:
+        response = requests.post(url, headers=headers, data=json.dumps(body))
+    except requests.RequestException:
+        observe_datalab("sync", None, time.perf_counter() - started)
+        raise
+    observe_datalab("sync", response.status_code, time.perf_counter() - started)
+
     if response.status_code == 200:
-        return response.json()
+        data = response.json()
+        save_response(body, data)
+        return data
     else:
         print(f"Error {response.status_code}: {response.text}")
         return None
 
-# 데이터베이스 저장 함수
-def save_search_volume(keyword: str, start_date: str, end_date: str):
+# 검색량 행 목록을 upsert로 저장하고 반영된 행 수를 반환 (skip: 기존 값 유지, overwrite: 새 값으로 덮어쓰기)
+def upsert_search_volume(db: Session, rows: list[dict], on_conflict: str = "skip") -> int:
+    # 같은 (keyword, date)가 한 문장에 두 번 들어가지 않도록 마지막 값만 유지
+    unique_rows = list({(row["keyword"], row["date"]): row for row in rows}.values())
+    update_columns = ["search_volume"] if on_conflict == "overwrite" else None
+    written = upsert_rows(db, MarketingData, unique_rows, ["keyword", "date"], update_columns)
+
+    # 기간별 집계 테이블과 이상치 탐지 상태도 같은 트랜잭션에서 갱신
+    refresh_marketing_rollups(db, unique_rows)
+    track_marketing_anomalies(db, unique_rows)
+    return written
+
+# 당일 데이터는 집계가 끝나지 않았으므로 어제까지만 크롤링 대상으로 봄
+def _last_complete_day() -> date:
+    return get_clock().today() - timedelta(days=1)
+
+# 수집 구간 앞뒤로 이미 저장됐을 날짜까지 넓힌 요청 구간 (어제 이후는 요청하지 않음)
+def anchored_range(start: date, end: date, anchor_days: int = DATALAB_ANCHOR_DAYS) -> tuple[date, date]:
+    return start - timedelta(days=anchor_days), min(end + timedelta(days=anchor_days), _last_complete_day())
+
+# DataLab은 요청마다 요청 구간의 최댓값을 100으로 정규화하므로 받은 ratio를 그대로 저장하면 기존 값과 척도가 달라짐
+# 키워드마다 저장된 값을 첫 구간, 새로 받은 값을 다음 구간으로 stitch_windows에 넘겨 겹친 날짜로 척도를 맞추고
+# ranges[키워드] 구간의 행 중 새로 생기거나 값이 바뀐 행만 저장할 행 목록으로 반환
+# (skip이면 이미 저장된 날짜는 제외, overwrite면 그 구간 안의 기존 값은 척도 기준에서 빼고 같은 값으로 다시 받은 날짜만 제외)
+# 겹친 저장 값이 없으면(처음 수집하는 키워드 등) 받은 값을 그대로 사용
+def rescale_to_stored(db: Session, series: dict[str, list[dict]], ranges: dict[str, tuple[date, date]], on_conflict: str = "skip") -> list[dict]:
+    periods = [period["period"] for values in series.values() for period in values]
+    if not periods:
+        return []
+
+    stored: dict[str, dict[str, float]] = {}
+    existing: dict[tuple[str, date], float] = {}
+    for keyword, day, volume in db.execute(
+        select(MarketingData.keyword, MarketingData.date, MarketingData.search_volume).where(
+            MarketingData.keyword.in_(list(series)),
+            MarketingData.date.between(date.fromisoformat(min(periods)), date.fromisoformat(max(periods))),
+        )
+    ):
+        start, end = ranges[keyword]
+        if start <= day <= end:
+            existing[(keyword, day)] = volume
+            if on_conflict == "overwrite":
+                continue
+        stored.setdefault(keyword, {})[day.isoformat()] = volume
+
+    # 이미 저장된 값과 같은 행은 다시 저장하지 않음 (집계/이상치 갱신과 캐시 무효화 대상에서도 빠짐)
+    # DataLab ratio는 소수점 5자리까지라 척도를 맞춘 뒤 남는 그 이하의 차이는 같은 값으로 봄
+    def is_changed(keyword: str, day: date, volume: float) -> bool:
+        if (keyword, day) not in existing:
+            return True
+        return on_conflict == "overwrite" and not math.isclose(existing[(keyword, day)], volume, rel_tol=1e-6)
+
+    rows = []
+    for keyword, values in series.items():
+        start, end = ranges[keyword]
+        stitched = stitch_windows(
+            [{keyword: stored.get(keyword, {})}, {keyword: {period["period"]: period["ratio"] for period in values}}],
+            normalize=False,
+        )
+        for period in stitched[keyword]:
+            day = date.fromisoformat(period["period"])
+            if start <= day <= end and is_changed(keyword, day, period["ratio"]):
+                rows.append({"keyword": keyword, "date": day, "search_volume": period["ratio"]})
+    return rows
+
+# 요청 기간 중 아직 수집하지 않은 연속 구간 목록 계산
+# (크롤링 완료 구간은 건너뛰고, 나머지는 저장된 날짜를 한 번의 범위 쿼리로 조회)
+def find_missing_ranges(db: Session, keyword: str, start: date, end: date) -> list[tuple[date, date]]:
+    end = min(end, _last_complete_day())
+    if start > end:
+        return []
+
+    state = db.get(CrawlState, keyword)
+    existing_dates = set(db.execute(
+        select(MarketingData.date).where(
+            MarketingData.keyword == keyword,
+            MarketingData.date.between(start, end),
+        )
+    ).scalars())
+
+    def is_missing(day: date) -> bool:
+        covered = state is not None and state.covered_from <= day <= state.covered_through
+        return not covered and day not in existing_dates
+
+    # 누락된 날짜를 하루씩 훑으며 연속 구간으로 묶음 (DB 조회 없이 메모리에서만 처리)
+    missing_ranges = []
+    day = start
+    while day <= end:
+        if is_missing(day):
+            if missing_ranges and missing_ranges[-1][1] == day - timedelta(days=1):
+                missing_ranges[-1] = (missing_ranges[-1][0], day)
+            else:
+                missing_ranges.append((day, day))
+        day += timedelta(days=1)
+
+    return missing_ranges
+
+# 크롤링 완료 구간 갱신 (기존 구간과 겹치거나 맞닿으면 합치고, 떨어져 있으면 더 최신 구간을 유지)
+def _update_crawl_state(db: Session, keyword: str, start: date, end: date):
+    end = min(end, _last_complete_day())
+    if start > end:
+        return
+
+    state = db.get(CrawlState, keyword)
+    if state is None:
+        db.add(CrawlState(keyword=keyword, covered_from=start, covered_through=end, updated_at=get_clock().now()))
+        return
+
+    if start <= state.covered_through + timedelta(days=1) and end >= state.covered_from - timedelta(days=1):
+        state.covered_from = min(state.covered_from, start)
+        state.covered_through = max(state.covered_through, end)
+    elif end > state.covered_through:
+        state.covered_from, state.covered_through = start, end
+    state.updated_at = get_clock().now()
+
+# 데이터베이스 저장 함수 (누락된 구간만 DataLab에서 가져와 저장)
+# 구간마다 앞뒤로 저장된 날짜를 함께 요청해 그 값에 척도를 맞춘 뒤 누락 구간만 저장
+def save_search_volume(keyword: str, start_date: str, end_date: str, on_conflict: str = "skip", on_progress=None) -> int:
+    # 진행 단계 알림 (작업 큐에서 상태 조회용)
+    notify = on_progress or (lambda stage: None)
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+
     db: Session = SessionLocal()
-    data = get_search_volume(keyword, start_date, end_date)
-
-    if data:
-        for result in data["results"]:
-            for period in result["data"]:
-                date = period["period"]
-                search_volume = period["ratio"]
-                
-                # 중복 저장 방지 (기존 데이터 확인)
-                existing = db.query(MarketingData).filter_by(keyword=keyword, date=date).first()
-                if not existing:
-                    new_entry = MarketingData(keyword=keyword, date=date, search_volume=search_volume)
-                    db.add(new_entry)
-        
+    try:
+        # overwrite는 기존 값을 갱신하는 용도이므로 요청 기간 전체를 다시 가져옴
+        if on_conflict == "overwrite":
+            fetch_ranges = [(start, min(end, _last_complete_day()))] if start <= _last_complete_day() else []
+        else:
+            fetch_ranges = find_missing_ranges(db, keyword, start, end)
+
+        rows = []
+        for range_start, range_end in fetch_ranges:
+            notify(f"fetching {range_start} ~ {range_end}")
+            request_start, request_end = anchored_range(range_start, range_end)
+            data = get_search_volume(keyword, request_start.isoformat(), request_end.isoformat())
+            if data is None:
+                raise RuntimeError(f"{keyword} 검색량 데이터 요청 실패 ({range_start} ~ {range_end})")
+            rows.extend(rescale_to_stored(
+                db,
+                {keyword: [period for result in data["results"] for period in result["data"]]},
+                {keyword: (range_start, range_end)},
+                on_conflict,
+            ))
+
+        notify("saving")
+        # 중복 저장 방지는 (keyword, date) 유니크 인덱스에 맡기고 한 번에 저장
+        written = upsert_search_volume(db, rows, on_conflict)
+        _update_crawl_state(db, keyword, start, end)
         db.commit()
-        print(f"✅ {keyword} 검색량 데이터 저장 완료!")
-    db.close()
+        invalidate_marketing(rows)
+        refresh_keyword_index(db, rows)
+    finally:
+        db.close()
+
+    print(f"✅ {keyword} 검색량 데이터 저장 완료! ({len(fetch_ranges)}개 구간, {written}건)")
+    return written
+
+# 마지막으로 크롤링한 날짜(high-water mark) 다음 날부터 어제까지만 가져오는 일일 갱신
+def refresh_search_volume(keyword: str, default_start_date: str, on_progress=None) -> int:
+    db: Session = SessionLocal()
+    try:
+        state = db.get(CrawlState, keyword)
+        start = state.covered_through + timedelta(days=1) if state else date.fromisoformat(default_start_date)
+    finally:
+        db.close()
+
+    return save_search_volume(keyword, start.isoformat(), _last_complete_day().isoformat(), on_progress=on_progress)
+
+# 묶음 요청 중 실패한 키워드가 있으면 성공한 묶음을 저장한 뒤 오류로 알림
+def _raise_failed_batches(errors: dict[str, str]):
+    if errors:
+        first_error = next(iter(errors.values()))
+        raise RuntimeError(f"{len(errors)}개 키워드 검색량 데이터 요청 실패 ({', '.join(sorted(errors))}): {first_error}")
+
+# 여러 키워드를 묶음 요청으로 동시에 크롤링하고 한 번의 upsert로 저장 (앞뒤로 저장된 날짜를 함께 요청해 척도를 맞춤)
+def save_search_volumes(keywords: list[str], start_date: str, end_date: str, on_conflict: str = "skip", **client_options) -> int:
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    request_start, request_end = anchored_range(start, end)
+    series, errors = crawl_keywords(keywords, request_start.isoformat(), max(request_end, end).isoformat(), **client_options)
+
+    db: Session = SessionLocal()
+    try:
+        rows = rescale_to_stored(db, series, {keyword: (start, end) for keyword in series}, on_conflict)
+        written = upsert_search_volume(db, rows, on_conflict)
+        db.commit()
+        invalidate_marketing(rows)
+        refresh_keyword_index(db, rows)
+    finally:
+        db.close()
+
+    print(f"✅ {len(series)}개 키워드 검색량 데이터 저장 완료! ({written}건)")
+    _raise_failed_batches(errors)
+    return written
+
+# 과거 이력 일괄 수집: 긴 기간을 겹치는 구간으로 나눠 동시에 요청하고, 겹친 날짜로 구간 간 척도를 맞춘 값을 저장
+# 요청 기간 앞뒤로 저장된 날짜를 함께 받아 그 값에 척도를 맞춘 뒤 요청 기간의 기존 값은 덮어씀
+def save_search_volume_history(
+    keywords: list[str],
+    start_date: str,
+    end_date: str,
+    window_days: int = HISTORY_WINDOW_DAYS,
+    overlap_days: int = HISTORY_OVERLAP_DAYS,
+    on_progress=None,
+    **client_options,
+) -> int:
+    notify = on_progress or (lambda stage: None)
+    start, end = date.fromisoformat(start_date), min(date.fromisoformat(end_date), _last_complete_day())
+    if start > end:
+        return 0
+
+    notify(f"fetching {start} ~ {end}")
+    request_start, request_end = anchored_range(start, end)
+    series, errors = crawl_keywords_history(keywords, request_start.isoformat(), request_end.isoformat(), window_days, overlap_days, **client_options)
+
+    notify("saving")
+    db: Session = SessionLocal()
+    try:
+        rows = rescale_to_stored(db, series, {keyword: (start, end) for keyword in series}, "overwrite")
+        written = upsert_search_volume(db, rows, "overwrite")
+        for keyword in series:
+            _update_crawl_state(db, keyword, start, end)
+        db.commit()
+        invalidate_marketing(rows)
+        refresh_keyword_index(db, rows)
+    finally:
+        db.close()
+
+    print(f"✅ {len(series)}개 키워드 과거 검색량 데이터 저장 완료! ({written}건)")
+    _raise_failed_batches(errors)
+    return written
@@ -0,0 +1,268 @@
+import asyncio
+import os
+import time
+from datetime import date, timedelta
+import httpx
+from dotenv import load_dotenv
+from backend.app.services.metrics import observe_datalab
+from backend.app.services.quota import DATALAB_DAILY_QUOTA, reserve_datalab_request
+from backend.app.services.response_store import get_response_store, lookup_response, save_response, request_key
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+# .env 파일 로드
+load_dotenv()
+
+# 로컬 가짜 DataLab 서버로 테스트할 수 있도록 URL을 환경 변수로 분리
+DATALAB_URL = os.getenv("DATALAB_URL", "https://openapi.naver.com/v1/datalab/search")
+DATALAB_MAX_PER_SECOND = float(os.getenv("DATALAB_MAX_PER_SECOND", "5"))
+
+# DataLab 한 번의 요청에 담을 수 있는 최대 keywordGroups 수
+MAX_GROUPS_PER_REQUEST = 5
+
+# 과거 이력 수집 시 한 요청의 구간 길이와 인접 구간과 겹치게 요청할 일수 (겹친 날짜로 구간 간 척도를 맞춤)
+HISTORY_WINDOW_DAYS = int(os.getenv("DATALAB_HISTORY_WINDOW_DAYS", "365"))
+HISTORY_OVERLAP_DAYS = int(os.getenv("DATALAB_HISTORY_OVERLAP_DAYS", "28"))
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 긴 기간을 window_days 길이 구간으로 나누되 인접 구간이 overlap_days만큼 겹치도록 나눔
+def split_windows(start: date, end: date, window_days: int = HISTORY_WINDOW_DAYS, overlap_days: int = HISTORY_OVERLAP_DAYS) -> list[tuple[date, date]]:
+    if not 0 < overlap_days < window_days:
+        raise ValueError(f"겹치는 일수는 1 이상 구간 길이({window_days}) 미만이어야 합니다: {overlap_days}")
+
+    windows = []
+    window_start = start
+    while True:
+        window_end = min(window_start + timedelta(days=window_days - 1), end)
+        windows.append((window_start, window_end))
+        if window_end >= end:
+            return windows
+        window_start += timedelta(days=window_days - overlap_days)
+
+# 구간마다 따로 정규화된 ratio를 하나의 척도로 이어붙임
+# windows: 구간 순서대로 {키워드: {날짜: ratio}} (같은 요청에 묶인 키워드는 같은 척도이므로 함께 맞춤)
+# 각 구간의 배율 = 앞 구간까지 맞춘 값의 겹친 날짜 합계 / 이번 구간 ratio의 겹친 날짜 합계
+# 겹친 날짜의 검색량이 모두 0이라 배율을 정할 수 없으면 앞 구간 배율을 그대로 사용
+# normalize가 참이면 마지막에 전체 최댓값을 100으로 다시 정규화해 DataLab과 같은 0~100 범위로 반환
+# (거짓이면 첫 구간의 척도를 유지하므로, 저장된 값을 첫 구간으로 넘기면 새 값을 저장된 척도에 맞출 수 있음)
+def stitch_windows(windows: list[dict[str, dict[str, float]]], normalize: bool = True) -> dict[str, list[dict]]:
+    stitched: dict[str, dict[str, float]] = {}
+    scale = 1.0
+
+    for window in windows:
+        overlap = [(keyword, period) for keyword, values in window.items() for period in values if period in stitched.get(keyword, {})]
+        previous_total = sum(stitched[keyword][period] for keyword, period in overlap)
+        current_total = sum(window[keyword][period] for keyword, period in overlap)
+        if previous_total > 0 and current_total > 0:
+            scale = previous_total / current_total
+
+        for keyword, values in window.items():
+            series = stitched.setdefault(keyword, {})
+            for period, ratio in values.items():
+                series.setdefault(period, ratio * scale)
+
+    peak = max((value for series in stitched.values() for value in series.values()), default=0)
+    factor = 100 / peak if normalize and peak > 0 else 1.0
+    return {
+        keyword: [{"period": period, "ratio": round(value * factor, 5)} for period, value in sorted(series.items())]
+        for keyword, series in stitched.items()
+    }
+
+# 키워드 묶음 요청 본문 (응답 저장소 키도 이 본문으로 계산)
+def group_body(keywords: list[str], start_date: str, end_date: str, time_unit: str = "date") -> dict:
+    return {
+        "startDate": start_date,
+        "endDate": end_date,
+        "timeUnit": time_unit,
+        "keywordGroups": [{"groupName": keyword, "keywords": [keyword]} for keyword in keywords],
+    }
+
+def _keyword_batches(keywords: list[str]) -> list[list[str]]:
+    return [keywords[i:i + MAX_GROUPS_PER_REQUEST] for i in range(0, len(keywords), MAX_GROUPS_PER_REQUEST)]
+
+class RetryableStatusError(Exception):
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"Error {response.status_code}: {response.text}")
+        self.response = response
+
+# 토큰 버킷 방식 요청 속도 제한 (rate: 초당 충전 토큰 수, capacity: 최대 누적 토큰 수)
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+# 키워드를 묶음 요청으로 보내는 비동기 DataLab 클라이언트 (연결 재사용, 동시성 제한, 재시도)
+class DataLabClient:
+    def __init__(
+        self,
+        base_url: str = DATALAB_URL,
+        client_id: str = None,
+        client_secret: str = None,
+        max_concurrency: int = 4,
+        daily_quota: int = DATALAB_DAILY_QUOTA,
+        max_per_second: float = DATALAB_MAX_PER_SECOND,
+        max_attempts: int = 5,
+        timeout: float = 10.0,
+        transport: httpx.AsyncBaseTransport = None,
+    ):
+        self.base_url = base_url
+        self.headers = {
+            "X-Naver-Client-Id": client_id or os.getenv("CLIENT_ID", ""),
+            "X-Naver-Client-Secret": client_secret or os.getenv("CLIENT_SECRET", ""),
+            "Content-Type": "application/json",
+        }
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.transport = transport
+
+        # 일일 쿼터는 클라이언트마다 따로 세지 않고 datalab_quota 테이블의 오늘 사용량으로 확인
+        self.daily_quota = daily_quota
+        self.rate_limit = TokenBucket(rate=max_per_second, capacity=max(1.0, max_per_second))
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: httpx.AsyncClient = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            transport=self.transport,
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+        self._client = None
+
+    async def _post(self, body: dict) -> dict:
+        # 저장된 응답이 있으면 쿼터를 쓰지 않고 바로 반환
+        stored = await asyncio.to_thread(lookup_response, body)
+        if stored is not None:
+            return stored
+
+        await self.rate_limit.acquire()
+        await asyncio.to_thread(reserve_datalab_request, 1, self.daily_quota)
+
+        started = time.perf_counter()
+        try:
+            response = await self._client.post(self.base_url, json=body)
+        except httpx.TransportError:
+            observe_datalab("async", None, time.perf_counter() - started)
+            raise
+        observe_datalab("async", response.status_code, time.perf_counter() - started)
+
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise RetryableStatusError(response)
+        response.raise_for_status()
+        data = response.json()
+        await asyncio.to_thread(save_response, body, data)
+        return data
+
+    # 키워드 묶음(최대 5개)을 한 번의 요청으로 조회
+    # DataLab의 ratio는 요청 안의 모든 그룹을 통틀어 최댓값을 100으로 정규화한 상대값
+    async def fetch_group(self, keywords: list[str], start_date: str, end_date: str, time_unit: str = "date") -> dict:
+        body = group_body(keywords, start_date, end_date, time_unit)
+
+        async with self._semaphore:
+            async for attempt in AsyncRetrying(
+                retry=retry_if_exception_type((RetryableStatusError, httpx.TransportError)),
+                wait=wait_exponential_jitter(initial=0.5, max=30),
+                stop=stop_after_attempt(self.max_attempts),
+                reraise=True,
+            ):
+                with attempt:
+                    return await self._post(body)
+
+    # 전체 키워드를 5개씩 묶어 동시에 조회
+    # 반환값: ({키워드: [{"period", "ratio"}, ...]}, {실패한 묶음의 키워드: 오류 메시지}) - 한 묶음이 실패해도 나머지 결과는 유지
+    async def fetch_keywords(self, keywords: list[str], start_date: str, end_date: str, time_unit: str = "date") -> tuple[dict, dict]:
+        batches = _keyword_batches(keywords)
+        responses = await asyncio.gather(
+            *(self.fetch_group(batch, start_date, end_date, time_unit) for batch in batches),
+            return_exceptions=True,
+        )
+
+        series, errors = {}, {}
+        for batch, response in zip(batches, responses):
+            if isinstance(response, Exception):
+                errors.update((keyword, str(response)) for keyword in batch)
+                continue
+            series.update((result["title"], result["data"]) for result in response["results"])
+        return series, errors
+
+    # 긴 기간을 겹치는 구간으로 나눠 모든 (키워드 묶음, 구간) 요청을 동시에 보내고
+    # 묶음별로 구간 사이 척도를 맞춰 이어붙인 {키워드: [{"period", "ratio"}, ...]} 반환
+    async def fetch_history(
+        self,
+        keywords: list[str],
+        start_date: str,
+        end_date: str,
+        window_days: int = HISTORY_WINDOW_DAYS,
+        overlap_days: int = HISTORY_OVERLAP_DAYS,
+        time_unit: str = "date",
+    ) -> tuple[dict, dict]:
+        windows = split_windows(date.fromisoformat(start_date), date.fromisoformat(end_date), window_days, overlap_days)
+        batches = _keyword_batches(keywords)
+        responses = await asyncio.gather(
+            *(
+                self.fetch_group(batch, window_start.isoformat(), window_end.isoformat(), time_unit)
+                for batch in batches
+                for window_start, window_end in windows
+            ),
+            return_exceptions=True,
+        )
+
+        # 구간 중 하나라도 실패한 묶음은 척도를 이어붙일 수 없으므로 묶음 전체를 실패로 처리
+        series, errors, completed = {}, {}, []
+        for index, batch in enumerate(batches):
+            batch_responses = responses[index * len(windows):(index + 1) * len(windows)]
+            failure = next((response for response in batch_responses if isinstance(response, Exception)), None)
+            if failure is not None:
+                errors.update((keyword, str(failure)) for keyword in batch)
+                continue
+            completed.append(batch)
+            series.update(stitch_windows([
+                {result["title"]: {period["period"]: period["ratio"] for period in result["data"]} for result in response["results"]}
+                for response in batch_responses
+            ]))
+
+        # 재생 시 같은 구간끼리 다시 척도를 맞출 수 있도록 이번 수집에서 모든 구간을 받은 묶음의 요청 키 목록을 기록
+        store = get_response_store()
+        if store is not None and completed:
+            await asyncio.to_thread(store.record_run, [
+                [request_key(group_body(batch, window_start.isoformat(), window_end.isoformat(), time_unit)) for window_start, window_end in windows]
+                for batch in completed
+            ])
+        return series, errors
+
+# 동기 코드에서 사용하는 진입점 (반환값: (키워드별 결과, 실패한 키워드별 오류))
+def crawl_keywords(keywords: list[str], start_date: str, end_date: str, **client_options) -> tuple[dict, dict]:
+    async def run():
+        async with DataLabClient(**client_options) as client:
+            return await client.fetch_keywords(keywords, start_date, end_date)
+
+    return asyncio.run(run())
+
+def crawl_keywords_history(keywords: list[str], start_date: str, end_date: str, window_days: int = HISTORY_WINDOW_DAYS, overlap_days: int = HISTORY_OVERLAP_DAYS, **client_options) -> tuple[dict, dict]:
+    async def run():
+        async with DataLabClient(**client_options) as client:
+            return await client.fetch_history(keywords, start_date, end_date, window_days, overlap_days)
+
+    return asyncio.run(run())
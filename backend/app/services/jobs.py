@@ -0,0 +1,92 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from backend.app.services.crawler import save_search_volume, save_search_volume_history
+
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "4"))
+MAX_FINISHED_JOBS = 1000
+
+@dataclass
+class CrawlJob:
+    id: str
+    keyword: str
+    start_date: str
+    end_date: str
+    on_conflict: str
+    mode: str = "incremental" # incremental: 누락 구간만 수집, history: 겹치는 구간 병렬 수집 후 척도 맞춤
+    status: str = "queued" # queued -> running -> succeeded / failed
+    stage: str = None # 실행 중 진행 단계 (fetching, saving)
+    rows_written: int = 0
+    error: str = None
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: datetime = None
+    finished_at: datetime = None
+
+    @property
+    def key(self) -> tuple:
+        return (self.keyword, self.start_date, self.end_date, self.on_conflict, self.mode)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+# 크롤링 요청을 워커 스레드 풀에서 실행하는 작업 큐 (같은 조건의 진행 중 작업은 재사용)
+class CrawlJobQueue:
+    def __init__(self, max_workers: int = CRAWL_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl")
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, CrawlJob] = OrderedDict()
+        self._in_flight: dict[tuple, str] = {}
+
+    # 작업을 등록하고 (작업, 새로 생성 여부)를 반환
+    def submit(self, keyword: str, start_date: str, end_date: str, on_conflict: str = "skip", mode: str = "incremental") -> tuple[CrawlJob, bool]:
+        job = CrawlJob(uuid.uuid4().hex, keyword, start_date, end_date, on_conflict, mode)
+
+        with self._lock:
+            existing_id = self._in_flight.get(job.key)
+            if existing_id:
+                return self._jobs[existing_id], False
+
+            self._jobs[job.id] = job
+            self._in_flight[job.key] = job.id
+            self._evict_finished()
+
+        self._executor.submit(self._run, job)
+        return job, True
+
+    def get(self, job_id: str) -> CrawlJob:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # 완료된 작업은 최근 MAX_FINISHED_JOBS개만 보관
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: CrawlJob):
+        job.status = "running"
+        job.started_at = datetime.now()
+        try:
+            on_progress = lambda stage: setattr(job, "stage", stage)
+            if job.mode == "history":
+                job.rows_written = save_search_volume_history([job.keyword], job.start_date, job.end_date, on_progress=on_progress)
+            else:
+                job.rows_written = save_search_volume(job.keyword, job.start_date, job.end_date, job.on_conflict, on_progress=on_progress)
+            job.status = "succeeded"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.stage = None
+            job.finished_at = datetime.now()
+            with self._lock:
+                self._in_flight.pop(job.key, None)
+
+crawl_jobs = CrawlJobQueue()
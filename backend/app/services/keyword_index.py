@@ -0,0 +1,149 @@
+import bisect
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+from backend.app.database import SessionLocal
+from backend.app.models.model import MarketingData
+
+# .env 파일 로드
+load_dotenv()
+
+# 색인 전체를 DB에서 다시 만드는 주기 (초)
+# 크롤러 갱신은 저장한 프로세스의 색인에만 반영되므로, 다른 워커/스케줄러/재생 스크립트가 저장한 키워드도 이 주기 안에 보이게 함
+KEYWORD_INDEX_TTL_SECONDS = float(os.getenv("KEYWORD_INDEX_TTL_SECONDS", "300"))
+
+# 한글 음절 범위와 초성 목록 (음절 코드 = 0xAC00 + (초성 * 21 + 중성) * 28 + 종성)
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+JUNGSEONG_COUNT, JONGSEONG_COUNT = 21, 28
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+
+def _is_syllable(char: str) -> bool:
+    return HANGUL_BASE <= ord(char) <= HANGUL_LAST
+
+# 한글 음절은 초성 자모로, 나머지 문자는 소문자로 바꾼 문자
+def _initial(char: str) -> str:
+    if _is_syllable(char):
+        return CHOSEONG[(ord(char) - HANGUL_BASE) // (JUNGSEONG_COUNT * JONGSEONG_COUNT)]
+    return char.lower()
+
+# 키워드의 초성 키 (정렬해 두고 bisect로 검색어의 초성 키로 시작하는 후보 구간을 찾음)
+def choseong_key(text: str) -> str:
+    return "".join(_initial(char) for char in text)
+
+# 검색어 문자 하나가 키워드 문자와 맞는지 확인
+# - 초성 자모(ㅅ)는 그 초성으로 시작하는 음절(스, 사, ...)과 일치
+# - 마지막 글자가 받침 없는 음절이면 입력 중인 글자로 보고 초성/중성이 같은 음절(벅 -> 버)과 일치
+def _char_matches(query_char: str, keyword_char: str, is_last: bool) -> bool:
+    if query_char == keyword_char:
+        return True
+    if query_char in CHOSEONG:
+        return _initial(keyword_char) == query_char
+    if is_last and _is_syllable(query_char) and _is_syllable(keyword_char):
+        query_code, keyword_code = ord(query_char) - HANGUL_BASE, ord(keyword_char) - HANGUL_BASE
+        return query_code % JONGSEONG_COUNT == 0 and query_code // JONGSEONG_COUNT == keyword_code // JONGSEONG_COUNT
+    return query_char.lower() == keyword_char.lower()
+
+def matches_prefix(keyword: str, prefix: str) -> bool:
+    if len(prefix) > len(keyword):
+        return False
+    last = len(prefix) - 1
+    return all(_char_matches(char, keyword[i], i == last) for i, char in enumerate(prefix))
+
+# 키워드별 행 수, 첫/마지막 날짜, 마지막 날짜의 검색량을 한 번에 조회
+# ((keyword, date) 유니크 인덱스만으로 집계하고 마지막 날짜 행을 다시 찾음)
+def _keyword_stats_query(keywords: list[str] = None):
+    stats = select(
+        MarketingData.keyword,
+        func.count().label("row_count"),
+        func.min(MarketingData.date).label("first_date"),
+        func.max(MarketingData.date).label("last_date"),
+    ).group_by(MarketingData.keyword)
+    if keywords is not None:
+        stats = stats.where(MarketingData.keyword.in_(keywords))
+    stats = stats.subquery()
+
+    return select(stats, MarketingData.search_volume.label("latest_volume")).join(
+        MarketingData,
+        and_(MarketingData.keyword == stats.c.keyword, MarketingData.date == stats.c.last_date),
+    )
+
+# 저장된 키워드 목록과 통계를 메모리에 두고 초성/음절 접두어로 검색하는 색인
+# 서버 시작 시 한 번 만들고, 이후에는 크롤러가 저장한 키워드만 다시 조회해 갱신
+# (TTL이 지나면 조회 시 전체를 다시 만듦)
+class KeywordIndex:
+    def __init__(self):
+        self._keys: list[tuple[str, str]] = []  # (초성 키, 키워드) 정렬 목록
+        self._stats: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.built = False
+        self.built_at = 0.0
+
+    def _put(self, row):
+        keyword = row.keyword
+        if keyword not in self._stats:
+            bisect.insort(self._keys, (choseong_key(keyword), keyword))
+        self._stats[keyword] = {
+            "keyword": keyword,
+            "row_count": row.row_count,
+            "first_date": row.first_date,
+            "last_date": row.last_date,
+            "latest_volume": row.latest_volume,
+        }
+
+    def build(self, db: Session):
+        rows = db.execute(_keyword_stats_query()).all()
+        with self._lock:
+            self._keys, self._stats = [], {}
+            for row in rows:
+                self._put(row)
+            self.built = True
+            self.built_at = time.monotonic()
+
+    # 아직 만들지 않았거나 TTL이 지나 전체를 다시 만들어야 하는지 확인
+    def is_stale(self, ttl: float = KEYWORD_INDEX_TTL_SECONDS) -> bool:
+        return not self.built or time.monotonic() - self.built_at > ttl
+
+    # 저장 후 호출: 해당 키워드의 통계만 다시 조회해 추가/갱신
+    def refresh(self, db: Session, keywords):
+        keywords = sorted(set(keywords))
+        if not keywords:
+            return
+        rows = db.execute(_keyword_stats_query(keywords)).all()
+        with self._lock:
+            for row in rows:
+                self._put(row)
+
+    # 접두어와 맞는 키워드를 초성 키 순서로 최대 limit개 반환 (total: 전체 일치 수)
+    def search(self, prefix: str, limit: int) -> tuple[list[dict], int]:
+        prefix = prefix.strip()
+        key = choseong_key(prefix)
+        with self._lock:
+            matched = []
+            for i in range(bisect.bisect_left(self._keys, (key,)), len(self._keys)):
+                candidate_key, keyword = self._keys[i]
+                if not candidate_key.startswith(key):
+                    break
+                if matches_prefix(keyword, prefix):
+                    matched.append(self._stats[keyword])
+        return matched[:limit], len(matched)
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+keyword_index = KeywordIndex()
+
+# 서버 시작 시 색인 생성
+def build_keyword_index():
+    db = SessionLocal()
+    try:
+        keyword_index.build(db)
+    finally:
+        db.close()
+
+# 크롤러 저장 후 호출 (색인이 아직 없으면 다음 조회 때 전체를 만듦)
+def refresh_keyword_index(db: Session, rows: list[dict]):
+    if keyword_index.built:
+        keyword_index.refresh(db, (row["keyword"] for row in rows))
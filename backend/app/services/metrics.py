@@ -0,0 +1,187 @@
+import bisect
+import contextvars
+import logging
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.app.services.cache import get_cache
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# 느린 쿼리 로그에 남길 SQL 문 최대 길이 (긴 IN 목록 등은 잘라서 기록)
+SLOW_QUERY_LOG_CHARS = int(os.getenv("SLOW_QUERY_LOG_CHARS", "1000"))
+
+# 지연 시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 요청당 쿼리 수 히스토그램 버킷 (N+1 패턴 확인용)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250)
+
+slow_query_logger = logging.getLogger("backend.app.slow_query")
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+# Prometheus 카운터 (라벨 값 조합별 누적 값)
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+# Prometheus 히스토그램 (라벨 값 조합별 버킷 개수, 합계, 관측 수)
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts[0][index] += 1
+            counts[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (bucket_counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), bucket_counts):
+                    cumulative += count
+                    bucket_labels = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+http_requests = Counter("http_requests_total", "HTTP 요청 수", ("method", "route", "status"))
+http_duration = Histogram("http_request_duration_seconds", "HTTP 요청 처리 시간", ("method", "route"))
+http_queries = Histogram("http_request_db_queries", "HTTP 요청당 실행된 SQL 문 수", ("method", "route"), QUERY_COUNT_BUCKETS)
+db_duration = Histogram("db_query_duration_seconds", "SQL 문 실행 시간", ("operation",))
+db_slow_queries = Counter("db_slow_queries_total", f"SLOW_QUERY_MS({SLOW_QUERY_MS:g}ms) 이상 걸린 SQL 문 수", ("operation",))
+datalab_requests = Counter("datalab_requests_total", "DataLab API 요청 수", ("client", "status"))
+datalab_duration = Histogram("datalab_request_duration_seconds", "DataLab API 요청 시간", ("client",))
+datalab_errors = Counter("datalab_errors_total", "DataLab API 요청 실패 수 (응답 오류 + 연결 오류)", ("client",))
+
+METRICS = [http_requests, http_duration, http_queries, db_duration, db_slow_queries, datalab_requests, datalab_duration, datalab_errors]
+
+# 현재 요청에서 실행된 SQL 문 수 (스레드 풀/greenlet으로 넘어가도 같은 리스트를 공유)
+_request_queries: contextvars.ContextVar[list] = contextvars.ContextVar("request_queries", default=None)
+
+# DataLab 요청 한 건의 결과 기록 (status가 None이면 연결 오류)
+def observe_datalab(client: str, status: int | None, seconds: float):
+    if not METRICS_ENABLED:
+        return
+    datalab_requests.inc(client, str(status) if status is not None else "error")
+    datalab_duration.observe(seconds, client)
+    if status is None or status >= 400:
+        datalab_errors.inc(client)
+
+# 느린 쿼리 로그용 (잘린 SQL 문, 행당 파라미터 수, executemany 행 수)
+# 파라미터 값에는 사용자 데이터가 들어 있고 대량 저장이면 매우 길어지므로 개수만 기록
+def _slow_query_summary(statement: str, parameters, executemany: bool) -> tuple[str, int, int]:
+    text = " ".join(statement.split())
+    if len(text) > SLOW_QUERY_LOG_CHARS:
+        text = text[:SLOW_QUERY_LOG_CHARS] + f"... ({len(text)} chars)"
+    if executemany:
+        rows = len(parameters) if parameters else 0
+        return text, len(parameters[0]) if rows else 0, rows
+    return text, len(parameters) if parameters else 0, 1
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started_at
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+    db_duration.observe(elapsed, operation)
+
+    queries = _request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        db_slow_queries.inc(operation)
+        text, param_count, rows = _slow_query_summary(statement, parameters, executemany)
+        slow_query_logger.warning("slow query (%.1fms): %s | params=%d rows=%d", elapsed * 1000, text, param_count, rows)
+
+# 엔진의 모든 SQL 문 실행 시간과 요청별 쿼리 수를 기록 (비동기 엔진은 sync_engine을 넘김)
+def instrument_engine(engine: Engine):
+    if not METRICS_ENABLED or event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+# 경로 템플릿별 요청 수, 상태 코드, 처리 시간, 요청당 쿼리 수를 기록하는 ASGI 미들웨어
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        queries = [0]
+        token = _request_queries.set(queries)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_queries.reset(token)
+
+            # 경로 파라미터 값 대신 라우트 템플릿으로 집계 (매칭되지 않은 경로는 하나로 묶음)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            http_requests.inc(scope["method"], path, status)
+            http_duration.observe(elapsed, scope["method"], path)
+            http_queries.observe(queries[0], scope["method"], path)
+
+# Prometheus 텍스트 형식으로 전체 지표와 조회 캐시 통계를 출력
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+
+    stats = get_cache().stats()
+    for name in ("hits", "misses", "evictions"):
+        lines += [f"# TYPE cache_{name}_total counter", f"cache_{name}_total {stats[name]}"]
+    for name in ("entries", "bytes"):
+        lines += [f"# TYPE cache_{name} gauge", f"cache_{name} {stats[name]}"]
+    return "\n".join(lines) + "\n"
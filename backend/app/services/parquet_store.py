@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import date, datetime
+import polars as pl
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from backend.app.database import SessionLocal
+from backend.app.models.model import MarketingData, SalesData
+from backend.app.services.rollups import period_end
+from backend.app.utils.downsample import date_bucket
+
+# .env 파일 로드
+load_dotenv()
+
+# 월 단위로 나눈 Parquet 스냅샷을 저장할 디렉터리
+PARQUET_STORE_DIR = os.getenv("PARQUET_STORE_DIR", "data/parquet")
+
+MANIFEST_FILE = "manifest.json"
+
+# 파티션 칼럼 형식 버전 (바뀌면 기존 파티션을 모두 다시 씀, 2: search_volume Float64)
+STORE_FORMAT = 2
+
+# 테이블별 스냅샷 칼럼 (정렬 순서대로 저장해 행 그룹 통계로 keyword/date 필터를 걸러낼 수 있게 함)
+TABLES = {
+    "marketing_data": {
+        "model": MarketingData,
+        "schema": {"keyword": pl.String, "date": pl.Date, "search_volume": pl.Float64},
+        "sort": ["keyword", "date"],
+    },
+    "sales_data": {
+        "model": SalesData,
+        "schema": {"date": pl.Date, "revenue": pl.Int64},
+        "sort": ["date"],
+    },
+}
+
+# 내보내기는 한 번에 하나만 실행
+_export_lock = threading.Lock()
+
+def _month_key(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+def _partition_path(store_dir: str, table: str, month: str) -> str:
+    return os.path.join(store_dir, table, f"month={month}", "part.parquet")
+
+def _fingerprint(df: pl.DataFrame) -> str:
+    return hashlib.sha1(df.write_csv().encode()).hexdigest()
+
+# 원본 테이블을 DB에서 월 단위로 집계한 결과로 월별 지문 계산 (행을 읽어오지 않고 변경된 월을 찾음)
+# 집계 테이블은 쓰기 경로에서 갱신된 기간만 담고 있으므로, 집계를 만들기 전의 데이터도 내보내도록 원본 테이블을 사용
+# 검색량: 키워드별 월 합계와 행 수, 매출: 일별 합계와 행 수
+def month_fingerprints(db: Session) -> dict[str, dict[str, str]]:
+    # 실수 합계는 더하는 순서에 따라 끝자리가 달라질 수 있으므로 반올림해 지문이 흔들리지 않게 함
+    marketing_month = date_bucket("month", MarketingData.date)
+    marketing = pl.DataFrame(
+        db.execute(
+            select(marketing_month, MarketingData.keyword, func.sum(MarketingData.search_volume), func.count())
+            .group_by(marketing_month, MarketingData.keyword)
+        ).all(),
+        schema={"period_start": pl.Date, "keyword": pl.String, "total_volume": pl.Float64, "row_count": pl.Int64},
+        orient="row",
+    ).with_columns(pl.col("total_volume").round(6))
+    sales = pl.DataFrame(
+        db.execute(select(SalesData.date, func.sum(SalesData.revenue), func.count()).group_by(SalesData.date)).all(),
+        schema={"date": pl.Date, "total_revenue": pl.Int64, "row_count": pl.Int64},
+        orient="row",
+    ).with_columns(pl.col("date").dt.truncate("1mo").alias("period_start"))
+
+    return {
+        "marketing_data": {
+            _month_key(month): _fingerprint(group.drop("period_start").sort("keyword"))
+            for (month,), group in marketing.group_by("period_start")
+        },
+        "sales_data": {
+            _month_key(month): _fingerprint(group.drop("period_start").sort("date"))
+            for (month,), group in sales.group_by("period_start")
+        },
+    }
+
+def read_manifest(store_dir: str = PARQUET_STORE_DIR) -> dict:
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+# 임시 파일에 쓴 뒤 교체해 읽는 쪽이 쓰다 만 파일을 보지 않도록 함
+def _write_manifest(store_dir: str, manifest: dict):
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+# 디스크에 실제로 있는 월 파티션 목록 (month=YYYY-MM 디렉터리)
+def _stored_months(store_dir: str, table: str) -> set[str]:
+    table_dir = os.path.join(store_dir, table)
+    if not os.path.isdir(table_dir):
+        return set()
+    return {
+        entry.name.removeprefix("month=")
+        for entry in os.scandir(table_dir)
+        if entry.is_dir() and entry.name.startswith("month=")
+    }
+
+def _write_partition(db: Session, store_dir: str, table: str, month: str) -> int:
+    spec = TABLES[table]
+    model = spec["model"]
+    start = date.fromisoformat(f"{month}-01")
+
+    df = pl.DataFrame(
+        db.execute(
+            select(*(getattr(model, column) for column in spec["schema"]))
+            .where(model.date.between(start, period_end(start, "month")))
+        ).all(),
+        schema=spec["schema"],
+        orient="row",
+    ).sort(spec["sort"])
+
+    path = _partition_path(store_dir, table, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.write_parquet(path + ".tmp", statistics=True)
+    os.replace(path + ".tmp", path)
+    return df.height
+
+# 원본 테이블을 월별 Parquet 파일로 내보냄 (지문이 바뀐 월과 새로 생긴 월만 다시 쓰고, 사라진 월은 삭제)
+def export_parquet_store(db: Session, store_dir: str = PARQUET_STORE_DIR, full: bool = False) -> dict:
+    with _export_lock:
+        # 전체 내보내기여도 이전 버전 번호는 이어서 써야 캐시 키가 예전 스냅샷 값과 겹치지 않음
+        manifest = read_manifest(store_dir) or {"version": 0, "tables": {}}
+        if full or manifest.get("format") != STORE_FORMAT:
+            manifest = {"version": manifest["version"], "tables": {}, "format": STORE_FORMAT}
+        fingerprints = month_fingerprints(db)
+        report = {}
+
+        for table, months in fingerprints.items():
+            previous = manifest["tables"].get(table, {})
+            changed = sorted(month for month, fingerprint in months.items() if previous.get(month) != fingerprint)
+            # 매니페스트에 없더라도 디스크에 남아 있는 월 파티션은 모두 정리 대상
+            removed = sorted((set(previous) | _stored_months(store_dir, table)) - set(months))
+
+            rows = sum(_write_partition(db, store_dir, table, month) for month in changed)
+            for month in removed:
+                shutil.rmtree(os.path.dirname(_partition_path(store_dir, table, month)), ignore_errors=True)
+
+            manifest["tables"][table] = months
+            report[table] = {"written_months": changed, "removed_months": removed, "rows": rows}
+
+        if any(item["written_months"] or item["removed_months"] for item in report.values()):
+            manifest["version"] += 1
+        manifest["exported_at"] = datetime.now().isoformat(timespec="seconds")
+        os.makedirs(store_dir, exist_ok=True)
+        _write_manifest(store_dir, manifest)
+
+    return {"version": manifest["version"], "exported_at": manifest["exported_at"], "tables": report}
+
+# 캐시 키에 넣을 스냅샷 버전 (스냅샷이 없거나 내보낸 월 파티션이 하나도 없으면 engine=parquet 요청을 거부)
+def store_version(store_dir: str = PARQUET_STORE_DIR) -> int:
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        raise HTTPException(status_code=503, detail="Parquet 저장소가 없습니다. 먼저 POST /analytics/store/export로 내보내기를 실행해주세요.")
+    if not any(manifest["tables"].values()):
+        raise HTTPException(status_code=503, detail="Parquet 저장소에 내보낸 데이터가 없습니다. 데이터를 저장한 뒤 다시 내보내기를 실행해주세요.")
+    return manifest["version"]
+
+# 분석 엔진별 캐시 무효화 범위와 스냅샷 버전
+# DB는 데이터 버전(scopes)으로 무효화하고, Parquet은 내보내기 때마다 바뀌는 스냅샷 버전을 캐시 키에 넣음
+def engine_scopes(engine: str, scopes: list[str]) -> tuple[list[str], int]:
+    if engine == "parquet":
+        return [], store_version()
+    return scopes, None
+
+# 월 파티션 디렉터리를 기간으로 먼저 걸러내고, 나머지 조건은 Polars가 Parquet 읽기 단계로 내려보냄
+def scan_table(table: str, start_date: date, end_date: date, store_dir: str = PARQUET_STORE_DIR) -> pl.LazyFrame:
+    schema = TABLES[table]["schema"]
+    table_dir = os.path.join(store_dir, table)
+    if not _stored_months(store_dir, table):
+        return pl.LazyFrame(schema=schema)
+
+    return (
+        pl.scan_parquet(os.path.join(table_dir, "**", "*.parquet"), hive_partitioning=True, hive_schema={"month": pl.String})
+        .filter(pl.col("month").is_between(pl.lit(_month_key(start_date)), pl.lit(_month_key(end_date))))
+        .filter(pl.col("date").is_between(start_date, end_date))
+        .select(list(schema))
+    )
+
+def scan_marketing(keywords: list[str], start_date: date, end_date: date, store_dir: str = PARQUET_STORE_DIR) -> pl.LazyFrame:
+    return scan_table("marketing_data", start_date, end_date, store_dir).filter(pl.col("keyword").is_in(keywords))
+
+def scan_sales(start_date: date, end_date: date, store_dir: str = PARQUET_STORE_DIR) -> pl.LazyFrame:
+    return scan_table("sales_data", start_date, end_date, store_dir)
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print("Exporting Parquet store...")
+        print(json.dumps(export_parquet_store(db), ensure_ascii=False, indent=2))
+        print("Parquet store exported successfully!")
+    finally:
+        db.close()
@@ -0,0 +1,43 @@
+import os
+from datetime import date
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from backend.app.database import SessionLocal
+from backend.app.models.model import DatalabQuota
+from backend.app.services.clock import get_clock
+from backend.app.utils.upsert import increment_rows
+
+# .env 파일 로드
+load_dotenv()
+
+DATALAB_DAILY_QUOTA = int(os.getenv("DATALAB_DAILY_QUOTA", "1000"))
+
+class QuotaExceededError(RuntimeError):
+    pass
+
+# DataLab 실제 호출 전에 오늘 사용량에 count건을 더함 (저장된 응답으로 처리한 요청은 호출하지 않으므로 제외)
+# 프로세스마다 따로 세지 않고 datalab_quota 테이블에 모아 API 서버, 크롤러, 스케줄러가 같은 남은 쿼터를 봄
+# 더하면 limit을 넘는 경우 사용량을 바꾸지 않고 QuotaExceededError (확인과 증가가 한 문장이라 동시에 호출해도 초과하지 않음)
+def reserve_datalab_request(count: int = 1, limit: int = DATALAB_DAILY_QUOTA):
+    today = get_clock().today()
+    if count > limit:
+        raise QuotaExceededError(f"DataLab 일일 쿼터를 초과했습니다 ({today}, 한도 {limit}건)")
+
+    db: Session = SessionLocal()
+    try:
+        reserved = increment_rows(db, DatalabQuota, [{"date": today, "used": count}], ["date"], "used", max_value=limit)
+        db.commit()
+    finally:
+        db.close()
+    if not reserved:
+        raise QuotaExceededError(f"DataLab 일일 쿼터를 초과했습니다 ({today}, 한도 {limit}건)")
+
+def used_quota(db: Session, day: date = None) -> int:
+    used = db.execute(select(DatalabQuota.used).where(DatalabQuota.date == (day or get_clock().today()))).scalar()
+    return used or 0
+
+def quota_status(db: Session, day: date = None, limit: int = DATALAB_DAILY_QUOTA) -> dict:
+    day = day or get_clock().today()
+    used = used_quota(db, day)
+    return {"date": day, "used": used, "limit": limit, "remaining": max(0, limit - used)}
@@ -0,0 +1,110 @@
+import argparse
+from datetime import date
+from sqlalchemy.orm import Session
+from backend.app.database import SessionLocal
+from backend.app.services.crawler import upsert_search_volume
+from backend.app.services.datalab_client import stitch_windows
+from backend.app.services.cache import invalidate_marketing
+from backend.app.services.keyword_index import refresh_keyword_index
+from backend.app.services.response_store import ResponseStore, get_response_store
+
+# 한 번에 upsert할 행 수 (집계/이상치 갱신도 이 단위로 실행)
+REPLAY_BATCH_ROWS = 10000
+
+def _ratios(response: dict) -> dict[str, dict[str, float]]:
+    return {
+        result["title"]: {period["period"]: period["ratio"] for period in result["data"]}
+        for result in response["results"]
+    }
+
+# 저장소의 응답을 (시각, {(키워드, 날짜): 값}) 이벤트 목록으로 변환
+# - 과거 이력 수집에 쓰인 응답은 기록된 구간 순서대로 다시 척도를 맞춘 결과를 수집 완료 시각의 이벤트 하나로 만듦
+#   (구간 중 하나라도 삭제됐으면 척도를 맞출 수 없으므로 해당 수집은 건너뜀)
+# - 나머지 응답은 원본 값을 응답 수집 시각의 이벤트로 만듦
+def _replay_events(store: ResponseStore, keywords: set[str] = None) -> tuple[list[tuple[str, dict]], int]:
+    events = []
+    skipped_runs = 0
+    run_keys = set()
+    for run in store.runs():
+        run_keys.update(key for batch in run["batches"] for key in batch)
+        stitched = {}
+        for batch in run["batches"]:
+            records = [store.load(key) for key in batch]
+            if any(record is None for record in records):
+                skipped_runs += 1
+                stitched = None
+                break
+            stitched.update(stitch_windows([_ratios(record["response"]) for record in records]))
+        if stitched:
+            events.append((run["finished_at"], {
+                (keyword, period["period"]): period["ratio"]
+                for keyword, periods in stitched.items()
+                for period in periods
+            }))
+
+    for record in store.records():
+        if record["key"] in run_keys:
+            continue
+        events.append((record["fetched_at"], {
+            (keyword, period): ratio
+            for keyword, values in _ratios(record["response"]).items()
+            for period, ratio in values.items()
+        }))
+
+    if keywords is not None:
+        events = [
+            (timestamp, {key: value for key, value in values.items() if key[0] in keywords})
+            for timestamp, values in events
+        ]
+    return events, skipped_runs
+
+# 저장된 DataLab 응답만으로 marketing_data를 다시 만듦 (네트워크 요청 없음)
+# 응답마다 ratio의 척도가 다르므로 수집 시각 순서로 키워드마다 앞서 재구성한 값을 첫 구간으로 stitch_windows에 넘겨
+# 척도를 맞추고 새 날짜만 추가함 (크롤러의 rescale_to_stored와 같은 방식), 기존 값은 덮어씀
+def replay_responses(keywords: list[str] = None, store: ResponseStore = None) -> dict:
+    store = store or get_response_store()
+    if store is None:
+        raise RuntimeError("DataLab 응답 저장소가 꺼져 있습니다 (DATALAB_STORE_ENABLED)")
+
+    events, skipped_runs = _replay_events(store, set(keywords) if keywords else None)
+    replayed: dict[str, dict[str, float]] = {}
+    for _, values in sorted(events, key=lambda event: event[0]):
+        by_keyword: dict[str, dict[str, float]] = {}
+        for (keyword, period), value in values.items():
+            by_keyword.setdefault(keyword, {})[period] = value
+        for keyword, series in by_keyword.items():
+            stitched = stitch_windows([{keyword: replayed.get(keyword, {})}, {keyword: series}], normalize=False)
+            replayed[keyword] = {period["period"]: period["ratio"] for period in stitched[keyword]}
+
+    rows = [
+        {"keyword": keyword, "date": date.fromisoformat(period), "search_volume": value}
+        for keyword, series in sorted(replayed.items())
+        for period, value in sorted(series.items())
+    ]
+
+    db: Session = SessionLocal()
+    try:
+        written = 0
+        for start in range(0, len(rows), REPLAY_BATCH_ROWS):
+            written += upsert_search_volume(db, rows[start:start + REPLAY_BATCH_ROWS], "overwrite")
+        db.commit()
+        invalidate_marketing(rows)
+        refresh_keyword_index(db, rows)
+    finally:
+        db.close()
+
+    return {
+        "events": len(events),
+        "skipped_runs": skipped_runs,
+        "keywords": len({row["keyword"] for row in rows}),
+        "rows": written,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장된 DataLab 응답으로 marketing_data 재구성")
+    parser.add_argument("--keyword", action="append", help="재구성할 키워드 (여러 번 지정 가능, 생략 시 전체)")
+    args = parser.parse_args()
+
+    print("Replaying stored DataLab responses...")
+    print(replay_responses(args.keyword))
+    print("Replay completed successfully!")
@@ -0,0 +1,210 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import date, datetime
+from dotenv import load_dotenv
+from backend.app.services.clock import get_clock
+
+# .env 파일 로드
+load_dotenv()
+
+# DataLab 원본 응답 저장소 (요청 본문 해시로 찾는 gzip JSON 파일)
+DATALAB_STORE_ENABLED = os.getenv("DATALAB_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+DATALAB_STORE_DIR = os.getenv("DATALAB_STORE_DIR", "data/datalab")
+DATALAB_STORE_MAX_BYTES = int(os.getenv("DATALAB_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+# 아직 끝나지 않은 날짜(수집 당일 이후)가 포함된 응답의 유효 시간 (지난 날짜만 있는 응답은 바뀌지 않으므로 계속 사용)
+DATALAB_STORE_TTL_SECONDS = float(os.getenv("DATALAB_STORE_TTL_SECONDS", "3600"))
+# true면 저장소에 없는 요청은 네트워크로 보내지 않고 실패 처리 (오프라인 개발용)
+DATALAB_OFFLINE = os.getenv("DATALAB_OFFLINE", "false").lower() in ("1", "true", "yes")
+
+ENTRY_SUFFIX = ".json.gz"
+RUNS_DIR = "runs"
+
+# 용량 초과 시 이 비율까지 줄여 매번 정리하지 않도록 함
+EVICT_TARGET_RATIO = 0.9
+
+class OfflineMissError(RuntimeError):
+    pass
+
+# 요청 본문을 키 순서와 공백에 무관한 JSON으로 바꿔 만든 SHA-256 키
+def request_key(body: dict) -> str:
+    canonical = json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+# 임시 파일에 쓴 뒤 교체해 읽는 쪽이 쓰다 만 파일을 보지 않도록 함
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+# 요청 본문 해시로 저장하는 DataLab 원본 응답 저장소
+# 파일 수정 시각을 마지막 사용 시각으로 써서 용량 상한을 넘으면 오래 쓰지 않은 응답부터 삭제 (LRU)
+class ResponseStore:
+    def __init__(
+        self,
+        store_dir: str = DATALAB_STORE_DIR,
+        max_bytes: int = DATALAB_STORE_MAX_BYTES,
+        ttl_seconds: float = DATALAB_STORE_TTL_SECONDS,
+    ):
+        self.store_dir = store_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._bytes = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.store_dir, key[:2], key + ENTRY_SUFFIX)
+
+    def _entry_files(self) -> list[os.DirEntry]:
+        if not os.path.isdir(self.store_dir):
+            return []
+        return [
+            entry
+            for shard in os.scandir(self.store_dir) if shard.is_dir() and shard.name != RUNS_DIR
+            for entry in os.scandir(shard.path) if entry.name.endswith(ENTRY_SUFFIX)
+        ]
+
+    def _read(self, path: str) -> dict:
+        with gzip.open(path, "rb") as f:
+            return json.loads(f.read())
+
+    # 지난 날짜만 담은 응답은 바뀌지 않으므로 항상 유효, 수집 당일 이후가 포함되면 TTL 동안만 유효
+    # (수집 시각과 현재 시각 모두 공용 시계 기준이라 FakeClock으로 시간을 옮기면 만료도 함께 진행)
+    def _is_fresh(self, record: dict) -> bool:
+        fetched_at = datetime.fromisoformat(record["fetched_at"])
+        if date.fromisoformat(record["request"]["endDate"]) < fetched_at.date():
+            return True
+        return (get_clock().now() - fetched_at).total_seconds() < self.ttl_seconds
+
+    # 저장된 유효한 응답 (없거나 오래됐으면 None)
+    def get(self, body: dict) -> dict:
+        path = self._path(request_key(body))
+        try:
+            record = self._read(path)
+        except (FileNotFoundError, EOFError, OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if not self._is_fresh(record):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # 사용 시각 갱신 (LRU 순서)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return record["response"]
+
+    def put(self, body: dict, response: dict) -> str:
+        key = request_key(body)
+        record = {"key": key, "request": body, "response": response, "fetched_at": get_clock().now().isoformat()}
+        data = gzip.compress(json.dumps(record, ensure_ascii=False).encode(), compresslevel=6)
+
+        path = self._path(key)
+        previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+        _write_atomic(path, data)
+
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(entry.stat().st_size for entry in self._entry_files())
+            else:
+                self._bytes += len(data) - previous_size
+            if self._bytes > self.max_bytes:
+                self._evict()
+        return key
+
+    # 마지막 사용 시각이 오래된 파일부터 삭제해 상한의 EVICT_TARGET_RATIO까지 줄임 (잠금 안에서 호출)
+    def _evict(self):
+        entries = sorted(self._entry_files(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes * EVICT_TARGET_RATIO:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._bytes = total
+
+    # 저장된 모든 응답 레코드 (재생용, 손상된 파일은 건너뜀)
+    def records(self):
+        for entry in self._entry_files():
+            try:
+                yield self._read(entry.path)
+            except (EOFError, OSError, ValueError):
+                continue
+
+    def load(self, key: str) -> dict:
+        try:
+            return self._read(self._path(key))
+        except (FileNotFoundError, EOFError, OSError, ValueError):
+            return None
+
+    # 과거 이력 수집 한 번에 쓴 요청 키 목록 (묶음별 구간 순서, 재생 시 같은 방식으로 척도를 맞추기 위해 기록)
+    def record_run(self, batches: list[list[str]]) -> str:
+        finished_at = get_clock().now().isoformat()
+        run_id = hashlib.sha256(f"{finished_at}:{batches}".encode()).hexdigest()[:16]
+        run = {"id": run_id, "finished_at": finished_at, "batches": batches}
+        _write_atomic(os.path.join(self.store_dir, RUNS_DIR, f"{run_id}.json"), json.dumps(run).encode())
+        return run_id
+
+    def runs(self) -> list[dict]:
+        runs_dir = os.path.join(self.store_dir, RUNS_DIR)
+        if not os.path.isdir(runs_dir):
+            return []
+        runs = []
+        for entry in os.scandir(runs_dir):
+            if entry.name.endswith(".json"):
+                with open(entry.path, encoding="utf-8") as f:
+                    runs.append(json.load(f))
+        return runs
+
+    def stats(self) -> dict:
+        entries = self._entry_files()
+        with self._lock:
+            return {
+                "store_dir": self.store_dir,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(entry.stat().st_size for entry in entries),
+                "max_bytes": self.max_bytes,
+            }
+
+_store: ResponseStore = ResponseStore() if DATALAB_STORE_ENABLED else None
+
+# 저장소가 꺼져 있으면 None
+def get_response_store() -> ResponseStore:
+    return _store
+
+def set_response_store(store: ResponseStore):
+    global _store
+    _store = store
+
+# 저장소에서 찾은 응답 (오프라인 모드에서 없으면 네트워크 요청 대신 오류)
+def lookup_response(body: dict) -> dict:
+    store = get_response_store()
+    response = store.get(body) if store is not None else None
+    if response is None and DATALAB_OFFLINE:
+        raise OfflineMissError(f"오프라인 모드: 저장된 DataLab 응답이 없습니다 ({body['startDate']} ~ {body['endDate']})")
+    return response
+
+def save_response(body: dict, response: dict) -> str:
+    store = get_response_store()
+    return store.put(body, response) if store is not None else None
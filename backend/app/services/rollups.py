@@ -0,0 +1,117 @@
+from datetime import date, timedelta
+import polars as pl
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from backend.app.database import SessionLocal
+from backend.app.models.model import MarketingData, MarketingRollup, SalesData, SalesDailyRollup
+from backend.app.utils.upsert import upsert_rows
+
+PERIODS = ("day", "week", "month")
+
+# 집계 단위별 Polars truncate 간격
+PERIOD_EVERY = {"day": "1d", "week": "1w", "month": "1mo"}
+
+# 날짜가 속한 기간의 시작일 (주: 월요일, 월: 1일)
+def period_start(day: date, period: str) -> date:
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+# 기간 시작일을 count 단위만큼 이동
+def shift_period(start: date, period: str, count: int) -> date:
+    if period == "week":
+        return start + timedelta(weeks=count)
+    if period == "month":
+        months = start.year * 12 + start.month - 1 + count
+        return date(months // 12, months % 12 + 1, 1)
+    return start + timedelta(days=count)
+
+# 기간의 마지막 날
+def period_end(start: date, period: str) -> date:
+    return shift_period(start, period, 1) - timedelta(days=1)
+
+# 저장된 (keyword, date) 행이 속한 일/주/월 기간만 원본 테이블에서 다시 집계해 upsert
+def refresh_marketing_rollups(db: Session, rows: list[dict]):
+    touched: dict[str, set[date]] = {}
+    for row in rows:
+        touched.setdefault(row["keyword"], set()).add(row["date"])
+
+    rollup_rows = []
+    for keyword, days in touched.items():
+        touched_periods = {(period, period_start(day, period)) for day in days for period in PERIODS}
+
+        # 변경된 날짜가 속한 주/월 전체를 포함하도록 조회 구간 확장
+        span_start = min(period_start(min(days), "week"), period_start(min(days), "month"))
+        span_end = max(period_end(period_start(max(days), "week"), "week"), period_end(period_start(max(days), "month"), "month"))
+
+        df = pl.DataFrame(
+            db.execute(
+                select(MarketingData.date, MarketingData.search_volume).where(
+                    MarketingData.keyword == keyword,
+                    MarketingData.date.between(span_start, span_end),
+                )
+            ).all(),
+            schema={"date": pl.Date, "search_volume": pl.Float64},
+            orient="row",
+        )
+
+        for period in PERIODS:
+            aggregated = df.group_by(pl.col("date").dt.truncate(PERIOD_EVERY[period])).agg(
+                pl.col("search_volume").sum().alias("total_volume"),
+                pl.len().alias("row_count"),
+            )
+            rollup_rows.extend(
+                {"keyword": keyword, "period": period, "period_start": start, "total_volume": total, "row_count": count}
+                for start, total, count in aggregated.iter_rows()
+                if (period, start) in touched_periods
+            )
+
+    upsert_rows(db, MarketingRollup, rollup_rows, ["keyword", "period", "period_start"], ["total_volume", "row_count"])
+
+# 변경된 날짜의 일 단위 매출 집계를 원본 테이블에서 다시 계산해 upsert
+def refresh_sales_rollups(db: Session, dates: list[date]):
+    if not dates:
+        return
+
+    touched = set(dates)
+    aggregated = db.execute(
+        select(SalesData.date, func.sum(SalesData.revenue), func.count())
+        .where(SalesData.date.between(min(touched), max(touched)))
+        .group_by(SalesData.date)
+    ).all()
+
+    upsert_rows(
+        db,
+        SalesDailyRollup,
+        [
+            {"date": day, "total_revenue": total, "row_count": count}
+            for day, total, count in aggregated
+            if day in touched
+        ],
+        ["date"],
+        ["total_revenue", "row_count"],
+    )
+
+# 기존 데이터 전체로 집계 테이블을 다시 만듦 (최초 도입 시 또는 복구용)
+def rebuild_rollups(db: Session):
+    db.query(MarketingRollup).delete()
+    db.query(SalesDailyRollup).delete()
+
+    keywords = db.execute(select(MarketingData.keyword).distinct()).scalars().all()
+    for keyword in keywords:
+        days = db.execute(select(MarketingData.date).where(MarketingData.keyword == keyword)).scalars().all()
+        refresh_marketing_rollups(db, [{"keyword": keyword, "date": day} for day in days])
+
+    refresh_sales_rollups(db, db.execute(select(SalesData.date)).scalars().all())
+    db.commit()
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print("Rebuilding rollup tables...")
+        rebuild_rollups(db)
+        print("Rollup tables rebuilt successfully!")
+    finally:
+        db.close()
@@ -0,0 +1,145 @@
+import csv
+import io
+import time
+from itertools import islice
+import polars as pl
+from fastapi import HTTPException
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+from backend.app.models.model import SalesData
+from backend.app.services.rollups import refresh_sales_rollups
+from backend.app.services.anomalies import track_sales_anomalies
+from backend.app.services.cache import invalidate_sales
+from backend.app.utils.validators import (
+    check_csv_frame, merge_csv_reports, parse_csv_columns, csv_rule_exprs, csv_valid_row_expr, CSV_LINE_COLUMN,
+)
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# 업로드 스트림을 chunk_size 행 단위의 DataFrame으로 나눠서 반환
+# 줄 단위가 아니라 csv 모듈로 레코드 단위로 나누므로 따옴표 안의 줄바꿈이 있는 필드도 한 행으로 유지됨
+# 행마다 레코드가 시작하는 CSV 파일의 줄 번호(reader.line_num 기준)를 CSV_LINE_COLUMN 칼럼으로 붙임
+def iter_csv_chunks(stream, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text_stream)
+        header = [name.strip() for name in next(reader, [])]
+        if not {"date", "revenue"}.issubset(header):
+            raise HTTPException(status_code=400, detail="CSV 파일에 'date' 또는 'revenue'가 존재하지 않습니다.")
+
+        while True:
+            consumed, records, lines = 0, [], []
+            line_num = reader.line_num
+            for record in islice(reader, chunk_size):
+                consumed += 1
+                # 빈 줄은 건너뛰고, 칼럼 수가 모자란 행은 null로 채워 검증 단계에서 거부 행으로 처리
+                if record:
+                    records.append(record)
+                    lines.append(line_num + 1)
+                line_num = reader.line_num
+            if not consumed:
+                break
+            if not records:
+                continue
+            too_long = next((record for record in records if len(record) > len(header)), None)
+            if too_long is not None:
+                raise HTTPException(status_code=400, detail=f"CSV 행의 칼럼 수가 헤더보다 많습니다: {too_long}")
+            # 모든 칼럼을 문자열로 읽고, 형변환 실패 행은 거부 행으로 처리
+            yield pl.DataFrame(
+                [record + [None] * (len(header) - len(record)) for record in records],
+                schema={name: pl.String for name in header},
+                orient="row",
+            ).with_columns(pl.Series(CSV_LINE_COLUMN, lines, dtype=pl.Int64))
+    finally:
+        # 래퍼를 정리할 때 업로드 파일 스트림까지 닫히지 않도록 분리
+        text_stream.detach()
+
+# 청크 내 잘못된 행(날짜 형식, 매출 값, 이전 청크를 포함한 중복 날짜)을 CSV 검증 규칙과 같은 식으로 걸러냄
+def clean_chunk(df: pl.DataFrame, seen_dates: pl.Series = None) -> pl.DataFrame:
+    return (
+        parse_csv_columns(df)
+        .filter(csv_valid_row_expr(csv_rule_exprs(seen_dates)))
+        .select("date", "revenue")
+    )
+
+# PostgreSQL: 임시 테이블에 COPY 후 DB에 없는 날짜만 INSERT ... SELECT로 병합 (저장한 날짜 목록 반환)
+def _merge_chunk_postgres(db: Session, chunk: pl.DataFrame) -> list:
+    db.execute(text(
+        "CREATE TEMP TABLE sales_staging (date date, revenue bigint) ON COMMIT DROP"
+    ))
+
+    buffer = io.StringIO()
+    chunk.write_csv(buffer, include_header=False)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert("COPY sales_staging (date, revenue) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+    result = db.execute(text(
+        "INSERT INTO sales_data (date, revenue) "
+        "SELECT s.date, s.revenue FROM sales_staging s "
+        "WHERE NOT EXISTS (SELECT 1 FROM sales_data d WHERE d.date = s.date) "
+        "RETURNING date"
+    ))
+    return result.scalars().all()
+
+# 그 외 DB(SQLite 등): 청크 날짜 범위의 기존 날짜만 조회하고 나머지를 executemany로 저장 (저장한 날짜 목록 반환)
+def _merge_chunk_fallback(db: Session, chunk: pl.DataFrame) -> list:
+    existing_dates = db.execute(
+        select(SalesData.date).where(SalesData.date.between(chunk["date"].min(), chunk["date"].max()))
+    ).scalars().all()
+
+    new_rows = chunk.filter(~pl.col("date").is_in(existing_dates))
+    if new_rows.is_empty():
+        return []
+
+    db.execute(insert(SalesData), new_rows.to_dicts())
+    return new_rows["date"].to_list()
+
+# CSV 스트림을 청크 단위로 읽어 DB에 대량 저장하고 청크별 처리 결과를 반환
+def bulk_load_sales_csv(db: Session, stream, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    merge_chunk = _merge_chunk_postgres if db.get_bind().dialect.name == "postgresql" else _merge_chunk_fallback
+
+    chunks = []
+    reports = []
+    seen_dates = pl.Series("date", [], dtype=pl.Date)
+    started_at = time.perf_counter()
+
+    for index, raw_chunk in enumerate(iter_csv_chunks(stream, chunk_size)):
+        chunk_started_at = time.perf_counter()
+
+        # 거부 행은 규칙별 행 번호(CSV 파일의 실제 줄 번호) 보고서로 남기고, 나머지만 저장
+        reports.append(check_csv_frame(raw_chunk, seen_dates))
+        chunk = clean_chunk(raw_chunk, seen_dates)
+        seen_dates = pl.concat([seen_dates, chunk["date"]])
+        # DB에 이미 있어 건너뛴 날짜는 바뀌지 않았으므로 새로 저장한 날짜만 집계/이상치/캐시에 반영
+        inserted_dates = merge_chunk(db, chunk) if not chunk.is_empty() else []
+        inserted = len(inserted_dates)
+        refresh_sales_rollups(db, inserted_dates)
+        track_sales_anomalies(db, inserted_dates)
+        db.commit()
+        invalidate_sales(inserted_dates)
+
+        elapsed = time.perf_counter() - chunk_started_at
+        chunks.append({
+            "chunk": index,
+            "rows": raw_chunk.height,
+            "inserted": inserted,
+            "skipped": chunk.height - inserted,
+            "rejected": raw_chunk.height - chunk.height,
+            "rows_per_second": round(raw_chunk.height / elapsed, 2) if elapsed > 0 else None,
+        })
+
+    elapsed = time.perf_counter() - started_at
+    total_rows = sum(c["rows"] for c in chunks)
+    return {
+        "rows": total_rows,
+        "inserted": sum(c["inserted"] for c in chunks),
+        "skipped": sum(c["skipped"] for c in chunks),
+        "rejected": sum(c["rejected"] for c in chunks),
+        "rows_per_second": round(total_rows / elapsed, 2) if elapsed > 0 else None,
+        "chunks": chunks,
+        "validation": merge_csv_reports(reports),
+    }
@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from backend.app.database import SessionLocal
+from backend.app.models.model import WatchlistKeyword, KeywordView, CrawlState, SchedulerRun
+from backend.app.services.clock import get_clock
+from backend.app.services.quota import quota_status
+from backend.app.services.datalab_client import DataLabClient, MAX_GROUPS_PER_REQUEST
+from backend.app.services.crawler import upsert_search_volume, rescale_to_stored, anchored_range, _update_crawl_state, _last_complete_day
+from backend.app.services.cache import invalidate_marketing
+from backend.app.services.keyword_index import refresh_keyword_index
+from backend.app.utils.upsert import increment_rows
+
+# .env 파일 로드
+load_dotenv()
+
+# 관심 키워드 기본 수집 주기와 처음 수집할 기간
+WATCHLIST_INTERVAL_HOURS = float(os.getenv("WATCHLIST_INTERVAL_HOURS", "24"))
+WATCHLIST_LOOKBACK_DAYS = int(os.getenv("WATCHLIST_LOOKBACK_DAYS", "30"))
+# 이 priority 이상인 키워드만 남은 쿼터 중 WATCHLIST_QUOTA_RESERVE 요청분을 쓸 수 있음 (낮은 우선순위 키워드가 쿼터를 다 쓰지 않도록)
+WATCHLIST_HIGH_PRIORITY = int(os.getenv("WATCHLIST_HIGH_PRIORITY", "1"))
+WATCHLIST_QUOTA_RESERVE = int(os.getenv("WATCHLIST_QUOTA_RESERVE", "50"))
+# 수집 실패 시 다시 시도할 때까지 기다릴 시간
+WATCHLIST_RETRY_MINUTES = float(os.getenv("WATCHLIST_RETRY_MINUTES", "30"))
+# 인기도로 볼 최근 대시보드 조회 기간
+WATCHLIST_POPULARITY_DAYS = int(os.getenv("WATCHLIST_POPULARITY_DAYS", "7"))
+# 스케줄러가 수집할 키워드를 확인하는 간격
+SCHEDULER_TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", "60"))
+# 대시보드 조회 수를 메모리에 모았다가 DB에 반영하는 간격
+VIEW_FLUSH_SECONDS = float(os.getenv("VIEW_FLUSH_SECONDS", "10"))
+
+_view_counts: Counter = Counter()
+_view_lock = threading.Lock()
+_views_flushed_at: datetime = None
+
+# 대시보드 조회 한 건 기록 (요청마다 DB에 쓰지 않고 VIEW_FLUSH_SECONDS마다 모아서 반영)
+def record_keyword_view(keyword: str):
+    global _views_flushed_at
+    now = get_clock().now()
+    with _view_lock:
+        _view_counts[keyword] += 1
+        if _views_flushed_at is not None and (now - _views_flushed_at).total_seconds() < VIEW_FLUSH_SECONDS:
+            return
+        _views_flushed_at = now
+    flush_keyword_views()
+
+def flush_keyword_views():
+    with _view_lock:
+        counts = dict(_view_counts)
+        _view_counts.clear()
+    if not counts:
+        return
+
+    today = get_clock().today()
+    db: Session = SessionLocal()
+    try:
+        increment_rows(
+            db, KeywordView,
+            [{"keyword": keyword, "date": today, "views": views} for keyword, views in counts.items()],
+            ["keyword", "date"], "views",
+        )
+        db.commit()
+    finally:
+        db.close()
+
+# 관심 키워드 등록 (이미 있으면 주기/우선순위만 변경, 새 키워드는 바로 수집 대상)
+def add_watchlist_keyword(
+    db: Session,
+    keyword: str,
+    interval_hours: float = WATCHLIST_INTERVAL_HOURS,
+    priority: int = 0,
+    lookback_days: int = WATCHLIST_LOOKBACK_DAYS,
+) -> WatchlistKeyword:
+    now = get_clock().now()
+    entry = db.get(WatchlistKeyword, keyword)
+    if entry is None:
+        entry = WatchlistKeyword(keyword=keyword, next_due_at=now, created_at=now)
+        db.add(entry)
+    entry.interval_hours = interval_hours
+    entry.priority = priority
+    entry.lookback_days = lookback_days
+    db.commit()
+    return entry
+
+def remove_watchlist_keyword(db: Session, keyword: str) -> bool:
+    entry = db.get(WatchlistKeyword, keyword)
+    if entry is None:
+        return False
+    db.delete(entry)
+    db.commit()
+    return True
+
+# 키워드별 최근 WATCHLIST_POPULARITY_DAYS일 대시보드 조회 수
+def _recent_views(db: Session, keywords: list[str]) -> dict[str, int]:
+    since = get_clock().today() - timedelta(days=WATCHLIST_POPULARITY_DAYS - 1)
+    return dict(db.execute(
+        select(KeywordView.keyword, func.sum(KeywordView.views))
+        .where(KeywordView.keyword.in_(keywords), KeywordView.date >= since)
+        .group_by(KeywordView.keyword)
+    ).all())
+
+# 같은 priority 안의 순서: 인기도(조회 수의 로그)와 예정 시각보다 늦어진 주기 수의 합이 클수록 먼저 수집
+def priority_score(entry: WatchlistKeyword, views: int, now: datetime) -> float:
+    overdue = max(0.0, (now - entry.next_due_at).total_seconds()) / (entry.interval_hours * 3600)
+    return math.log1p(views) + overdue
+
+# 남은 쿼터 안에서 수집할 키워드 선택 (priority 높은 순, 5개씩 한 요청이므로 요청 수 = ceil(키워드 수 / 5))
+# 반환값: (이번에 수집할 키워드, 쿼터가 부족해 미룬 키워드)
+def plan_refresh(
+    entries: list[WatchlistKeyword],
+    views: dict[str, int],
+    remaining: int,
+    now: datetime,
+    reserve: int = WATCHLIST_QUOTA_RESERVE,
+) -> tuple[list[WatchlistKeyword], list[WatchlistKeyword]]:
+    ordered = sorted(
+        entries,
+        key=lambda entry: (-entry.priority, -priority_score(entry, views.get(entry.keyword, 0), now), entry.keyword),
+    )
+    selected, deferred = [], []
+    for entry in ordered:
+        budget = remaining if entry.priority >= WATCHLIST_HIGH_PRIORITY else remaining - reserve
+        if math.ceil((len(selected) + 1) / MAX_GROUPS_PER_REQUEST) <= budget:
+            selected.append(entry)
+        else:
+            deferred.append(entry)
+    return selected, deferred
+
+# 수집을 시작할 날짜 (수집 완료 구간 다음 날, 처음이면 lookback_days 전부터)
+def _refresh_start(entry: WatchlistKeyword, state: CrawlState, end: date) -> date:
+    if state is not None:
+        return state.covered_through + timedelta(days=1)
+    return end - timedelta(days=entry.lookback_days - 1)
+
+# 다음 수집 예정 시각 (예정 시각 기준으로 더해 매일 같은 시각을 유지하고, 크게 밀렸으면 지금부터 계산)
+def _next_due(entry: WatchlistKeyword, now: datetime) -> datetime:
+    interval = timedelta(hours=entry.interval_hours)
+    next_due_at = entry.next_due_at + interval
+    return next_due_at if next_due_at > now else now + interval
+
+# 묶음별 요청을 동시에 보내고 실패한 묶음은 예외 객체로 반환
+async def _fetch_batches(batches: list[tuple[list[str], date, date]], **client_options) -> list:
+    async with DataLabClient(**client_options) as client:
+        return await asyncio.gather(
+            *(client.fetch_group(keywords, start.isoformat(), end.isoformat()) for keywords, start, end in batches),
+            return_exceptions=True,
+        )
+
+def _run_dict(run: SchedulerRun) -> dict:
+    return {
+        "id": run.id,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+        "status": run.status,
+        "due_keywords": run.due_keywords,
+        "refreshed_keywords": run.refreshed_keywords,
+        "deferred_keywords": run.deferred_keywords,
+        "requests": run.requests,
+        "rows_written": run.rows_written,
+        "lag_seconds": run.lag_seconds,
+        "error": run.error,
+    }
+
+# 수집할 때가 된 관심 키워드를 한 번 수집
+# 이미 어제까지 수집된 키워드는 요청 없이 다음 예정 시각만 갱신하고, 나머지는 시작일이 비슷한 키워드끼리 5개씩 묶어 요청
+# 묶음 요청은 묶인 키워드 전체의 최댓값으로 정규화되므로, 이미 저장된 앞쪽 날짜를 함께 요청해 키워드별로 저장된 척도에 맞춘 뒤 저장
+def run_due(db: Session, **client_options) -> dict:
+    clock = get_clock()
+    now = clock.now()
+    due = db.execute(select(WatchlistKeyword).where(WatchlistKeyword.next_due_at <= now)).scalars().all()
+    if not due:
+        return {"due_keywords": 0}
+
+    run = SchedulerRun(
+        started_at=now, status="running", due_keywords=len(due),
+        refreshed_keywords=0, deferred_keywords=0, requests=0, rows_written=0,
+    )
+    db.add(run)
+    db.commit()
+
+    try:
+        end = _last_complete_day()
+        keywords = [entry.keyword for entry in due]
+        states = {state.keyword: state for state in db.execute(select(CrawlState).where(CrawlState.keyword.in_(keywords))).scalars()}
+        starts = {entry.keyword: _refresh_start(entry, states.get(entry.keyword), end) for entry in due}
+
+        up_to_date = [entry for entry in due if starts[entry.keyword] > end]
+        selected, deferred = plan_refresh(
+            [entry for entry in due if starts[entry.keyword] <= end],
+            _recent_views(db, keywords),
+            quota_status(db)["remaining"],
+            now,
+        )
+
+        selected.sort(key=lambda entry: (starts[entry.keyword], entry.keyword))
+        batches = []
+        for i in range(0, len(selected), MAX_GROUPS_PER_REQUEST):
+            batch = [entry.keyword for entry in selected[i:i + MAX_GROUPS_PER_REQUEST]]
+            batches.append((batch, anchored_range(min(starts[keyword] for keyword in batch), end)[0], end))
+        responses = asyncio.run(_fetch_batches(batches, **client_options)) if batches else []
+
+        rows, errors = [], {}
+        for (batch, start, batch_end), response in zip(batches, responses):
+            if isinstance(response, Exception):
+                errors.update((keyword, str(response)) for keyword in batch)
+                continue
+            rows.extend(rescale_to_stored(
+                db,
+                {result["title"]: result["data"] for result in response["results"]},
+                {keyword: (starts[keyword], batch_end) for keyword in batch},
+            ))
+            for keyword in batch:
+                _update_crawl_state(db, keyword, starts[keyword], batch_end)
+        written = upsert_search_volume(db, rows, "skip")
+
+        finished = clock.now()
+        refreshed = [entry for entry in selected if entry.keyword not in errors] + up_to_date
+        run.lag_seconds = max((max(0.0, (now - entry.next_due_at).total_seconds()) for entry in refreshed), default=None)
+        for entry in refreshed:
+            entry.last_refreshed_at = finished
+            entry.last_status = "succeeded"
+            entry.last_error = None
+            entry.next_due_at = _next_due(entry, now)
+        for entry in selected:
+            if entry.keyword in errors:
+                entry.last_status = "failed"
+                entry.last_error = errors[entry.keyword]
+                entry.next_due_at = now + timedelta(minutes=WATCHLIST_RETRY_MINUTES)
+
+        run.status = "failed" if errors else "succeeded"
+        run.error = f"{len(errors)}개 키워드 수집 실패" if errors else None
+        run.refreshed_keywords = len(refreshed)
+        run.deferred_keywords = len(deferred)
+        run.requests = len(batches)
+        run.rows_written = written
+        run.finished_at = finished
+        db.commit()
+        invalidate_marketing(rows)
+        refresh_keyword_index(db, rows)
+    except Exception as e:
+        db.rollback()
+        run.status = "failed"
+        run.error = str(e)
+        run.finished_at = clock.now()
+        db.commit()
+        raise
+
+    return _run_dict(run)
+
+# 스케줄러 실행 기록, 오늘 쿼터, 키워드별 최신 상태
+# (overdue_seconds: 예정 시각보다 늦어진 시간, data_lag_days: 마지막으로 수집한 날짜가 어제보다 늦은 일수)
+def watchlist_status(db: Session, runs: int = 20) -> dict:
+    now = get_clock().now()
+    end = _last_complete_day()
+    entries = db.execute(select(WatchlistKeyword).order_by(WatchlistKeyword.priority.desc(), WatchlistKeyword.keyword)).scalars().all()
+    keywords = [entry.keyword for entry in entries]
+    states = {state.keyword: state for state in db.execute(select(CrawlState).where(CrawlState.keyword.in_(keywords))).scalars()}
+    views = _recent_views(db, keywords)
+
+    return {
+        "now": now,
+        "quota": quota_status(db),
+        "runs": [
+            _run_dict(run)
+            for run in db.execute(select(SchedulerRun).order_by(SchedulerRun.started_at.desc(), SchedulerRun.id.desc()).limit(runs)).scalars()
+        ],
+        "keywords": [
+            {
+                "keyword": entry.keyword,
+                "priority": entry.priority,
+                "interval_hours": entry.interval_hours,
+                "next_due_at": entry.next_due_at,
+                "overdue_seconds": max(0.0, (now - entry.next_due_at).total_seconds()),
+                "last_refreshed_at": entry.last_refreshed_at,
+                "last_status": entry.last_status,
+                "last_error": entry.last_error,
+                "covered_through": states[entry.keyword].covered_through if entry.keyword in states else None,
+                "data_lag_days": (end - states[entry.keyword].covered_through).days if entry.keyword in states else None,
+                "recent_views": views.get(entry.keyword, 0),
+                "score": round(priority_score(entry, views.get(entry.keyword, 0), now), 4),
+            }
+            for entry in entries
+        ],
+    }
+
+# tick_seconds마다 run_due 실행 (max_runs를 지정하면 그 횟수만큼만 실행, 시계를 FakeClock으로 바꾸면 기다리지 않고 시간만 진행)
+def run_scheduler(tick_seconds: float = SCHEDULER_TICK_SECONDS, max_runs: int = None, **client_options):
+    clock = get_clock()
+    count = 0
+    while max_runs is None or count < max_runs:
+        db: Session = SessionLocal()
+        try:
+            summary = run_due(db, **client_options)
+            if summary["due_keywords"]:
+                print(json.dumps(summary, ensure_ascii=False, default=str))
+        except Exception as e:
+            print(f"❌ 스케줄러 실행 실패: {e}")
+        finally:
+            db.close()
+        count += 1
+        if max_runs is None or count < max_runs:
+            clock.sleep(tick_seconds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="관심 키워드 정기 수집 스케줄러")
+    parser.add_argument("--once", action="store_true", help="수집할 때가 된 키워드를 한 번만 수집하고 종료")
+    parser.add_argument("--tick", type=float, default=SCHEDULER_TICK_SECONDS, help="수집 대상 확인 간격 (초)")
+    args = parser.parse_args()
+
+    print("Starting watchlist scheduler...")
+    run_scheduler(args.tick, 1 if args.once else None)
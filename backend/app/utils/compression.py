@@ -0,0 +1,113 @@
+import gzip
+import os
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+# brotli는 선택 의존성 (설치되어 있지 않으면 gzip만 사용)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 이 크기(바이트) 이상인 응답 본문만 압축
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# 이 크기 이상인 본문은 이벤트 루프를 막지 않도록 스레드 풀에서 압축
+THREAD_COMPRESSION_SIZE = 256 * 1024
+
+# 압축할 응답 형식 (Parquet은 이미 압축된 형식이고, Arrow 스트림은 스트리밍 응답이라 제외됨)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# 서버 선호 순서 (같은 q 값이면 앞쪽 인코딩 사용)
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Accept-Encoding 헤더에서 q 값이 가장 높은 지원 인코딩 선택 (없으면 None)
+def negotiate_encoding(accept_encoding: str) -> str:
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name, params = name.strip().lower(), params.strip()
+        if not name:
+            continue
+        try:
+            weights[name] = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            weights[name] = 0.0
+
+    candidates = [
+        (weights.get(encoding, weights.get("*", 0.0)), -index, encoding)
+        for index, encoding in enumerate(SUPPORTED_ENCODINGS)
+    ]
+    weight, _, encoding = max(candidates)
+    return encoding if weight > 0 else None
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def _is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+# 클라이언트가 허용한 gzip/brotli로 응답 본문을 압축하는 ASGI 미들웨어
+# 본문을 한 번에 보내는 응답만 압축하고, 스트리밍 응답(NDJSON 커서 스트림, Arrow 스트림)은 그대로 전달
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            # 첫 본문 조각을 보고 압축 여부를 정할 수 있도록 응답 시작 메시지를 잠시 보관
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            if not _is_compressible(headers):
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= THREAD_COMPRESSION_SIZE:
+                compressed = await run_in_threadpool(compress_body, body, encoding)
+            else:
+                compressed = compress_body(body, encoding)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            # 인코딩마다 본문 바이트가 달라지므로 강한 ETag를 약한 ETag로 바꿔 전달 (If-None-Match 비교는 그대로 동작)
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
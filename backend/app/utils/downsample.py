@@ -0,0 +1,91 @@
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import Date
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+BUCKETS = ("day", "week", "month")
+
+# 날짜 칼럼을 집계 단위의 시작일로 내림 (주: 월요일, 월: 1일)
+# DB마다 다른 SQL로 컴파일되므로 조회 쿼리는 DB 종류와 무관하게 만들 수 있음
+class date_bucket(FunctionElement):
+    type = Date()
+    inherit_cache = True
+    name = "date_bucket"
+    # 집계 단위가 다르면 컴파일된 SQL도 다르므로 문장 캐시 키에 포함
+    _traverse_internals = FunctionElement._traverse_internals + [("bucket", InternalTraversal.dp_string)]
+
+    def __init__(self, bucket: str, column):
+        if bucket not in BUCKETS:
+            raise ValueError(f"지원하지 않는 집계 단위: {bucket}")
+        self.bucket = bucket
+        super().__init__(column)
+
+@compiles(date_bucket)
+def _compile_date_bucket(element, compiler, **kw):
+    raise CompileError(f"{compiler.dialect.name}에서는 date_bucket을 지원하지 않습니다.")
+
+# PostgreSQL: date_trunc 결과(timestamp)를 date로 변환
+@compiles(date_bucket, "postgresql")
+def _compile_date_bucket_postgresql(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    if element.bucket == "day":
+        return column
+    return f"CAST(date_trunc('{element.bucket}', {column}) AS DATE)"
+
+# SQLite: date() 수정자로 같은 시작일 계산 (weekday 0은 다음 일요일이므로 6일을 빼 월요일로 맞춤)
+@compiles(date_bucket, "sqlite")
+def _compile_date_bucket_sqlite(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    if element.bucket == "week":
+        return f"date({column}, 'weekday 0', '-6 days')"
+    if element.bucket == "month":
+        return f"date({column}, 'start of month')"
+    return column
+
+# Largest-Triangle-Three-Buckets: 시계열을 threshold개 점으로 줄일 때 남길 인덱스 계산
+# 첫 점과 마지막 점은 항상 남기고, 나머지 구간마다 이전 선택 점과 다음 구간 평균점이 이루는
+# 삼각형의 넓이가 가장 큰 점을 골라 봉우리와 골짜기 모양을 유지
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        average_x, average_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[i + 1] = previous
+
+    return selected
+
+# date 칼럼 기준으로 정렬된 조회 결과 행을 value_column 값 기준 LTTB로 max_points개 이하로 줄임
+def downsample_rows(rows: list, max_points: int, value_column: str) -> list:
+    if max_points is None or len(rows) <= max_points:
+        return rows
+    x = [row.date.toordinal() for row in rows]
+    y = [getattr(row, value_column) for row in rows]
+    return [rows[i] for i in lttb_indices(x, y, max_points)]
+
+# 집계/다운샘플링 옵션 조합 검증 (전체 구간을 한 번에 줄여야 하므로 페이지 조회, 스트리밍과는 함께 쓸 수 없음)
+def validate_reduction(bucket: str, max_points: int, limit: int, cursor: str, response_format: str):
+    if (bucket != "day" or max_points is not None) and (limit is not None or cursor):
+        raise HTTPException(status_code=400, detail="bucket, max_points는 limit, cursor 페이지 조회와 함께 사용할 수 없습니다.")
+    if max_points is not None and response_format == "ndjson":
+        raise HTTPException(status_code=400, detail="max_points는 ndjson 형식에서 사용할 수 없습니다.")
@@ -0,0 +1,15 @@
+import base64
+import json
+from fastapi import HTTPException
+
+# 마지막 행의 정렬 키를 불투명한 커서 문자열로 인코딩
+def encode_cursor(values: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+# 커서 문자열을 정렬 키로 디코딩 (parsers: 키별 변환 함수, 형식이 맞지 않으면 400)
+def decode_cursor(cursor: str, parsers: dict) -> dict:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {key: parse(values[key]) for key, parse in parsers.items()}
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail=f"커서 값 오류: {cursor}")
@@ -0,0 +1,104 @@
+import io
+from decimal import Decimal
+import orjson
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from backend.app.database import SessionLocal
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Arrow 스트림을 나눠 보낼 레코드 배치 크기
+ARROW_BATCH_SIZE = 65_536
+
+# NDJSON 스트리밍 시 서버 측 커서에서 한 번에 가져올 행 수
+STREAM_BATCH_SIZE = 5_000
+
+# orjson 옵션: dict 키가 date 등 문자열이 아니어도 허용하고 numpy 배열/스칼라도 직접 직렬화
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# orjson이 기본 지원하지 않는 타입 변환 (PostgreSQL SUM 결과의 Decimal 등)
+def _orjson_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if hasattr(value, "_asdict"):
+        return value._asdict()
+    raise TypeError(f"JSON으로 변환할 수 없는 타입: {type(value).__name__}")
+
+def dumps_json(content) -> bytes:
+    return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+# date, 숫자, dict/list로 이루어진 조회 결과를 orjson으로 바로 직렬화하는 JSON 응답
+# 라우트에서 이 응답 객체를 직접 반환하면 FastAPI의 jsonable_encoder 변환 단계를 거치지 않음
+class ORJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps_json(content)
+
+# 응답 ETag와 재검증 헤더 (no-cache: 클라이언트가 저장해 두되 매번 If-None-Match로 확인)
+def etag_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+# If-None-Match 헤더 값이 ETag와 일치하는지 확인 (약한 비교: 압축 미들웨어가 붙인 W/ 접두사는 무시)
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+# 데이터가 바뀌지 않았을 때 본문 없이 보내는 304 응답
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
+
+def json_response(content, etag: str = None) -> ORJSONResponse:
+    return ORJSONResponse(content, headers=etag_headers(etag) if etag else None)
+
+# 조회 결과 튜플 목록을 칼럼 단위로 모아 Arrow 테이블 생성 (행별 dict를 만들지 않음)
+def rows_to_table(rows: list, schema: pa.Schema) -> pa.Table:
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    return pa.Table.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+# Arrow IPC 스트림 형식으로 레코드 배치를 하나씩 전송
+def _iter_arrow_stream(table: pa.Table):
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=ARROW_BATCH_SIZE):
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+# 요청 형식(arrow / parquet / ndjson)에 맞는 응답을 메모리의 Arrow 테이블로 생성
+def columnar_response(table: pa.Table, response_format: str, etag: str = None) -> Response:
+    headers = etag_headers(etag) if etag else None
+    if response_format == "ndjson":
+        return Response(pl.from_arrow(table).write_ndjson(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    if response_format == "parquet":
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer)
+        return Response(buffer.getvalue(), media_type=PARQUET_MEDIA_TYPE, headers=headers)
+    return StreamingResponse(_iter_arrow_stream(table), media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+
+# 서버 측 커서로 조회 결과를 배치 단위로 읽어 NDJSON으로 전송 (ORM 객체 없이 튜플만 사용해 메모리 일정)
+# 응답 전송 중에도 커서를 유지해야 하므로 요청 세션과 별도의 세션을 사용
+def _iter_ndjson(query):
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        columns = list(result.keys())
+        for partition in result.partitions():
+            yield b"".join(
+                orjson.dumps(dict(zip(columns, row)), default=_orjson_default, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+                for row in partition
+            )
+    finally:
+        db.close()
+
+def ndjson_response(query) -> StreamingResponse:
+    return StreamingResponse(_iter_ndjson(query), media_type=NDJSON_MEDIA_TYPE)
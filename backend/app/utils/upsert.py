@@ -0,0 +1,37 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# 방언별 INSERT ... ON CONFLICT 로 행 목록을 저장하고 반영된 행 수를 반환
+# (update_columns가 없으면 기존 행 유지, 있으면 해당 칼럼을 새 값으로 덮어쓰기)
+def upsert_rows(db: Session, model, rows: list[dict], index_elements: list[str], update_columns: list[str] = None) -> int:
+    if not rows:
+        return 0
+
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(model.__table__)
+    if update_columns:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={column: stmt.excluded[column] for column in update_columns},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+    # 한 번 컴파일한 문장을 executemany로 실행 (드라이버가 배치 단위로 묶어서 전송)
+    return db.connection().execute(stmt, rows).rowcount
+
+# 행 목록의 counter_column 값을 기존 행에 더함 (없는 행은 새로 추가, 여러 프로세스가 동시에 호출해도 누락 없음)
+# max_value를 지정하면 더한 값이 max_value를 넘는 행은 그대로 두고 반영 행 수에서 제외
+def increment_rows(db: Session, model, rows: list[dict], index_elements: list[str], counter_column: str, max_value: int = None) -> int:
+    if not rows:
+        return 0
+
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(model.__table__)
+    incremented = model.__table__.c[counter_column] + stmt.excluded[counter_column]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={counter_column: incremented},
+        where=incremented <= max_value if max_value is not None else None,
+    )
+    return db.connection().execute(stmt, rows).rowcount
@@ -16,29 +16,160 @@ def validate_date(date_str: str) -> str:
 def validate_positive_number(value: int) -> int:
   if value <= 0:
     raise HTTPException(status_code=400, detail=f"숫자 입력 값 오류: {value}, 값이 0보다 커야 합니다.")
-  
-# CSV 파일 내용 검증
-def validate_csv_data(df: pl.DataFrame):
-  required_columns = {"date", "revenue"}
+  return value
 
-  # 필요한 칼럼 유무 검증
-  if not required_columns.issubset(set(df.columns)):
+# CSV 검증 보고서에 규칙별로 담을 최대 행 번호 수
+MAX_REPORTED_ROWS = 20
+
+CSV_REQUIRED_COLUMNS = {"date", "revenue"}
+
+# 규칙별 오류 메시지
+CSV_RULE_MESSAGES = {
+  "date_format": "'date' 칼럼 값이 YYYY-MM-DD 형식이 아닙니다.",
+  "date_invalid": "'date' 칼럼 값이 존재하지 않는 날짜입니다.",
+  "revenue_type": "'revenue' 칼럼 값이 정수가 아닙니다.",
+  "revenue_non_positive": "'revenue' 칼럼 값은 0보다 커야 합니다.",
+  "duplicate_date": "CSV 파일에 중복된 날짜 데이터가 포함되어 있습니다.",
+  "db_conflict": "DB에 이미 같은 날짜의 매출 데이터가 존재합니다.",
+}
+
+# 저장을 막지 않고 보고만 하는 규칙 (DB에 있는 날짜는 건너뛰고 새 날짜만 저장)
+CSV_WARNING_RULES = {"db_conflict"}
+
+# iter_csv_chunks가 행마다 붙이는 CSV 파일의 실제 줄 번호 칼럼 (빈 줄, 따옴표 안의 줄바꿈까지 반영)
+CSV_LINE_COLUMN = "_csv_line"
+
+# 문자열/정수/날짜 어떤 타입으로 읽힌 칼럼이든 같은 규칙으로 변환하는 식
+def parsed_date_expr() -> pl.Expr:
+  return pl.col("date").cast(pl.String).str.strip_chars().str.strptime(pl.Date, "%Y-%m-%d", strict=False)
+
+def parsed_revenue_expr() -> pl.Expr:
+  return pl.col("revenue").cast(pl.String).str.strip_chars().cast(pl.Int64, strict=False)
+
+# 원본 칼럼을 한 번만 변환해 raw_date(공백 제거 문자열), date(Date), revenue(Int64) 칼럼으로 만드는 식
+def csv_column_exprs() -> list[pl.Expr]:
+  return [
+    pl.col("date").cast(pl.String).str.strip_chars().alias("raw_date"),
+    parsed_date_expr().alias("date"),
+    parsed_revenue_expr().alias("revenue"),
+  ]
+
+def parse_csv_columns(frame: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
+  return frame.select(csv_column_exprs())
+
+# parse_csv_columns 결과에 대해 행마다 위반 여부를 나타내는 규칙별 Boolean 식
+# seen_dates: 이전 배치에서 이미 나온 날짜, existing_dates: DB에 저장된 날짜 (지정한 경우에만 db_conflict 검사)
+def csv_rule_exprs(seen_dates: pl.Series = None, existing_dates: pl.Series = None) -> dict[str, pl.Expr]:
+  raw_date, date, revenue = pl.col("raw_date"), pl.col("date"), pl.col("revenue")
+  well_formed = raw_date.str.contains(r"^\d{4}-\d{2}-\d{2}$")
+
+  duplicated = ~date.is_first_distinct()
+  if seen_dates is not None and len(seen_dates):
+    duplicated = duplicated | date.is_in(seen_dates)
+
+  rules = {
+    "date_format": raw_date.is_null() | ~well_formed,
+    "date_invalid": well_formed & date.is_null(),
+    "revenue_type": revenue.is_null(),
+    "revenue_non_positive": revenue <= 0,
+    "duplicate_date": date.is_not_null() & duplicated,
+  }
+  if existing_dates is not None:
+    rules["db_conflict"] = date.is_in(existing_dates)
+  return {name: expr.fill_null(False) for name, expr in rules.items()}
+
+# 저장 가능한 행만 남기는 조건 (경고 규칙은 제외)
+def csv_valid_row_expr(rules: dict[str, pl.Expr]) -> pl.Expr:
+  return ~pl.any_horizontal(expr for name, expr in rules.items() if name not in CSV_WARNING_RULES)
+
+def _check_csv_columns(frame: pl.DataFrame | pl.LazyFrame) -> list[str]:
+  columns = frame.collect_schema().names() if isinstance(frame, pl.LazyFrame) else frame.columns
+  if not CSV_REQUIRED_COLUMNS.issubset(set(columns)):
     raise HTTPException(status_code=400, detail="CSV 파일에 'date' 또는 'revenue'가 존재하지 않습니다.")
-  
-  # 입력된 날짜 형식 검증
-  if not all(df["date"].str.contains(r"^\d{4}-\d{2}-\d{2}$")):
-    raise HTTPException(status_code=400, detail="CSV 파일에 'date' 칼럼 값이 잘못된 날짜 형식으로 입력되었습니다.")
-  
-  # 매출 값 검증
-  if not all(df["revenue"] > 0):
-    raise HTTPException(status_code=400, detail="CSV 파일에 'revenue' 칼럼 값은 0보다 커야 합니다.")
-  
-  # 중복 날짜 검증
-  if df["date"].is_duplicated().any():
-    raise HTTPException(status_code=400, detail="CSV 파일에 중복된 날짜 데이터가 포함되어 있습니다.")
+  return columns
+
+# 모든 규칙을 한 번의 칼럼 연산으로 평가해 규칙별 위반 행 수와 행 번호(최대 MAX_REPORTED_ROWS개)를 집계
+# 행 번호는 헤더를 1행으로 센 CSV 파일의 줄 번호
+# (CSV_LINE_COLUMN 칼럼이 있으면 그 값, 없으면 row_offset(이전 배치까지의 데이터 행 수)으로 계산)
+def check_csv_frame(
+  frame: pl.DataFrame | pl.LazyFrame,
+  seen_dates: pl.Series = None,
+  existing_dates: pl.Series = None,
+  row_offset: int = 0,
+) -> dict:
+  columns = _check_csv_columns(frame)
+  rules = csv_rule_exprs(seen_dates, existing_dates)
+  if CSV_LINE_COLUMN in columns:
+    line = pl.col(CSV_LINE_COLUMN).cast(pl.Int64)
+  else:
+    line = pl.int_range(pl.len(), dtype=pl.Int64) + (row_offset + 2)
+
+  # 변환 -> 규칙별 플래그 -> 집계 순서로 한 번의 쿼리 계획에서 처리 (Python 객체로 행을 꺼내지 않음)
+  flags = frame.lazy().select(line.alias("line"), *csv_column_exprs()).select(
+    "line",
+    **rules,
+  )
+  summary = flags.select(
+    pl.len().alias("rows"),
+    *(pl.col(name).sum().alias(f"{name}:count") for name in rules),
+    *(pl.col("line").filter(pl.col(name)).head(MAX_REPORTED_ROWS).implode().alias(f"{name}:rows") for name in rules),
+  ).collect().row(0, named=True)
+
+  report = {"rows": summary["rows"], "errors": {}, "warnings": {}}
+  for name in rules:
+    count = summary[f"{name}:count"]
+    if count:
+      report["warnings" if name in CSV_WARNING_RULES else "errors"][name] = {
+        "message": CSV_RULE_MESSAGES[name],
+        "count": count,
+        "rows": summary[f"{name}:rows"],
+      }
+  report["valid"] = not report["errors"]
+  return report
+
+# 배치별 보고서를 하나로 합침 (행 번호는 규칙별 최대 MAX_REPORTED_ROWS개까지 유지)
+def merge_csv_reports(reports: list[dict]) -> dict:
+  merged = {"rows": 0, "errors": {}, "warnings": {}}
+  for report in reports:
+    merged["rows"] += report["rows"]
+    for section in ("errors", "warnings"):
+      for name, item in report[section].items():
+        target = merged[section].setdefault(name, {"message": item["message"], "count": 0, "rows": []})
+        target["count"] += item["count"]
+        target["rows"] = (target["rows"] + item["rows"])[:MAX_REPORTED_ROWS]
+  merged["valid"] = not merged["errors"]
+  return merged
+
+# 배치 단위로 읽은 입력 전체를 검증 (배치 간 중복 날짜도 검사)
+# lookup_existing_dates(start, end)를 넘기면 배치마다 그 배치의 날짜 범위에 있는 DB 날짜만 조회해 비교
+def check_csv_batches(batches, lookup_existing_dates=None) -> dict:
+  reports = []
+  seen_dates = pl.Series("date", [], dtype=pl.Date)
+  row_offset = 0
+
+  for batch in batches:
+    batch_dates = batch.lazy().select(parsed_date_expr().drop_nulls().unique()).collect().to_series()
+    existing_dates = None
+    if lookup_existing_dates is not None:
+      existing_dates = lookup_existing_dates(batch_dates.min(), batch_dates.max()) if len(batch_dates) else pl.Series("date", [], dtype=pl.Date)
+    report = check_csv_frame(batch, seen_dates, existing_dates, row_offset)
+    reports.append(report)
+    row_offset += report["rows"]
+    seen_dates = pl.concat([seen_dates, batch_dates]).unique()
+
+  return merge_csv_reports(reports)
+
+# CSV 파일 내용 검증 (DataFrame 또는 pl.scan_csv로 읽은 LazyFrame)
+# 오류 규칙이 하나라도 있으면 규칙별 위반 행 보고서와 함께 400, 없으면 보고서(경고 포함)를 반환
+def validate_csv_data(df: pl.DataFrame | pl.LazyFrame, existing_dates: pl.Series = None) -> dict:
+  report = check_csv_frame(df, existing_dates=existing_dates)
+  if not report["valid"]:
+    messages = " ".join(item["message"] for item in report["errors"].values())
+    raise HTTPException(status_code=400, detail={"message": messages, **report})
+  return report
 
 # DB에 중복된 날짜가 있는지 검증
 def validate_no_duplicate_date_in_db(db: Session, date: str):
   existing_data = db.query(SalesData).filter(SalesData.date == date).first()
   if existing_data:
-    raise HTTPException(status_code=400, detail="중복 날짜: {date}, DB에 이미 매출 데이터가 존재합니다.")
+    raise HTTPException(status_code=400, detail=f"중복 날짜: {date}, DB에 이미 매출 데이터가 존재합니다.")
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+import numpy as np
+
+# 저장소 루트를 import 경로에 추가 (python -m benchmarks.<모듈> 또는 스크립트 직접 실행 모두 지원)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# 생성 데이터의 키워드 이름 규칙 (datagen, microbench, loadtest 공통)
+def keyword_name(index: int) -> str:
+    return f"키워드{index:05d}"
+
+# 결과를 커밋 간 비교할 수 있도록 현재 커밋 해시를 함께 기록
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# 지연 시간 목록(초)을 밀리초 단위 분위수 요약으로 변환
+def summarize_latencies(latencies: list[float], elapsed: float = None) -> dict:
+    values = np.asarray(latencies) * 1000
+    summary = {
+        "count": len(values),
+        "mean_ms": round(float(values.mean()), 3) if len(values) else None,
+        "p50_ms": round(float(np.percentile(values, 50)), 3) if len(values) else None,
+        "p95_ms": round(float(np.percentile(values, 95)), 3) if len(values) else None,
+        "p99_ms": round(float(np.percentile(values, 99)), 3) if len(values) else None,
+        "max_ms": round(float(values.max()), 3) if len(values) else None,
+    }
+    if elapsed:
+        summary["requests_per_second"] = round(len(values) / elapsed, 2)
+    return summary
+
+# 실행 환경과 파라미터를 포함해 결과를 JSON 파일로 저장
+def write_results(path: str, kind: str, params: dict, results) -> dict:
+    payload = {
+        "kind": kind,
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "params": params,
+        "results": results,
+    }
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+    print(json.dumps(payload, ensure_ascii=False, indent=2, default=str))
+    return payload
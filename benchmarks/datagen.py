@@ -0,0 +1,106 @@
+import argparse
+import io
+import time
+from datetime import date, timedelta
+import numpy as np
+from benchmarks.common import keyword_name, write_results
+from backend.app.database import SessionLocal, engine
+from backend.app.models.model import Base, MarketingData, SalesData
+from backend.app.services.rollups import rebuild_rollups
+
+# 한 번에 생성/저장하는 검색량 행 수 (메모리 사용량 상한)
+BATCH_ROWS = 500_000
+
+# 요청 기간의 날짜 배열 (어제까지 years년)
+def date_axis(years: int, end: date = None) -> np.ndarray:
+    end = end or date.today() - timedelta(days=1)
+    start = end - timedelta(days=365 * years - 1)
+    return np.arange(np.datetime64(start), np.datetime64(end) + 1, dtype="datetime64[D]")
+
+# 키워드별 추세 + 주간/연간 계절성 + 잡음으로 0~100 사이 검색량 생성 (키워드 수 x 날짜 수 행렬, DataLab ratio처럼 소수점 5자리)
+def generate_search_volume(rng: np.random.Generator, count: int, days: np.ndarray) -> np.ndarray:
+    t = (days - days[0]).astype(np.int64)
+    base = rng.uniform(10, 60, size=(count, 1))
+    trend = rng.normal(0, 0.01, size=(count, 1)) * t
+    weekly = 5 * np.sin(2 * np.pi * t / 7 + rng.uniform(0, 2 * np.pi, size=(count, 1)))
+    yearly = 15 * np.sin(2 * np.pi * t / 365 + rng.uniform(0, 2 * np.pi, size=(count, 1)))
+    noise = rng.normal(0, 4, size=(count, len(t)))
+    return np.clip(np.round(base + trend + weekly + yearly + noise, 5), 0, 100)
+
+def generate_revenue(rng: np.random.Generator, days: np.ndarray) -> np.ndarray:
+    t = (days - days[0]).astype(np.int64)
+    revenue = 1_000_000 + 200 * t + 150_000 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 80_000, size=len(t))
+    return np.maximum(np.rint(revenue), 1).astype(np.int64)
+
+# PostgreSQL은 COPY, 그 외 DB는 드라이버 executemany로 저장 (ORM 객체 생성 없이)
+def _write_rows(db, table: str, columns: list[str], rows: list[tuple]):
+    if db.get_bind().dialect.name == "postgresql":
+        buffer = io.StringIO("".join(",".join(map(str, row)) + "\n" for row in rows))
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        placeholders = ", ".join("?" for _ in columns)
+        db.connection().exec_driver_sql(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+# 기존 벤치마크 데이터를 지우고 검색량/매출 데이터를 새로 생성
+def generate(keywords: int, years: int, seed: int, rollups: bool = False) -> dict:
+    Base.metadata.create_all(bind=engine)
+    rng = np.random.default_rng(seed)
+    days = date_axis(years)
+    day_strings = days.astype(str)
+    per_batch = max(1, BATCH_ROWS // len(days))
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        db.query(MarketingData).delete()
+        db.query(SalesData).delete()
+
+        for offset in range(0, keywords, per_batch):
+            count = min(per_batch, keywords - offset)
+            volumes = generate_search_volume(rng, count, days)
+            rows = [
+                (keyword_name(offset + i), day, float(volume))
+                for i in range(count)
+                for day, volume in zip(day_strings, volumes[i])
+            ]
+            _write_rows(db, "marketing_data", ["keyword", "date", "search_volume"], rows)
+            db.commit()
+            print(f"marketing_data: {offset + count}/{keywords} 키워드 저장")
+
+        revenue = generate_revenue(rng, days)
+        _write_rows(db, "sales_data", ["date", "revenue"], list(zip(day_strings, revenue.tolist())))
+        db.commit()
+        load_seconds = time.perf_counter() - started
+
+        rollup_seconds = None
+        if rollups:
+            started = time.perf_counter()
+            rebuild_rollups(db)
+            rollup_seconds = time.perf_counter() - started
+    finally:
+        db.close()
+
+    return {
+        "marketing_rows": keywords * len(days),
+        "sales_rows": len(days),
+        "start_date": str(days[0]),
+        "end_date": str(days[-1]),
+        "load_seconds": round(load_seconds, 3),
+        "rollup_seconds": round(rollup_seconds, 3) if rollup_seconds is not None else None,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 검색량/매출 데이터 생성 (DATABASE_URL 대상)")
+    parser.add_argument("--keywords", type=int, default=100)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rollups", action="store_true", help="생성 후 집계 테이블 재생성")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    results = generate(args.keywords, args.years, args.seed, args.rollups)
+    write_results(args.output, "datagen", vars(args), results)
@@ -0,0 +1,92 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+# 키워드와 날짜로 결정되는 원본 검색량 (같은 요청에는 항상 같은 응답)
+def _raw_volumes(keyword: str, start: date, count: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha1(keyword.encode()).digest()[:8], "little")
+    t = np.arange(start.toordinal(), start.toordinal() + count)
+    phase = (seed % 1000) / 1000 * 2 * np.pi
+    return 50 + (seed % 40) + 10 * np.sin(2 * np.pi * t / 7 + phase) + 20 * np.sin(2 * np.pi * t / 365 + phase)
+
+# DataLab과 같은 형식의 응답 생성 (요청 내 최댓값을 100으로 정규화한 ratio)
+def build_response(body: dict) -> dict:
+    start, end = date.fromisoformat(body["startDate"]), date.fromisoformat(body["endDate"])
+    count = (end - start).days + 1
+    groups = body["keywordGroups"]
+
+    series = {group["groupName"]: _raw_volumes(group["groupName"], start, count) for group in groups}
+    peak = max((values.max() for values in series.values()), default=1)
+
+    return {
+        "startDate": body["startDate"],
+        "endDate": body["endDate"],
+        "timeUnit": body.get("timeUnit", "date"),
+        "results": [
+            {
+                "title": group["groupName"],
+                "keywords": group["keywords"],
+                "data": [
+                    {"period": (start + timedelta(days=i)).isoformat(), "ratio": round(float(value / peak * 100), 5)}
+                    for i, value in enumerate(series[group["groupName"]])
+                ],
+            }
+            for group in groups
+        ],
+    }
+
+# 지연 시간과 오류 비율을 조절할 수 있는 가짜 DataLab 요청 처리기
+class FakeDataLabHandler(BaseHTTPRequestHandler):
+    latency: float = 0.0
+    error_rate: float = 0.0
+    requests_served: int = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        type(self).requests_served += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self._send(503, {"errorMessage": "fake datalab error", "errorCode": "503"})
+            return
+        self._send(200, build_response(body))
+
+    def _send(self, status: int, payload: dict):
+        encoded = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        pass
+
+# 백그라운드 스레드에서 서버를 띄우고 (서버, 요청 URL)을 반환 (port=0이면 빈 포트 사용)
+def serve(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, error_rate: float = 0.0):
+    handler = type("Handler", (FakeDataLabHandler,), {"latency": latency, "error_rate": error_rate})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1/datalab/search"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 가짜 DataLab 서버 (DATALAB_URL로 지정해서 사용)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    args = parser.parse_args()
+
+    server, url = serve(args.host, args.port, args.latency, args.error_rate)
+    print(f"Fake DataLab listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
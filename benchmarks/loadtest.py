@@ -0,0 +1,78 @@
+import argparse
+import threading
+import time
+from datetime import date, timedelta
+import requests
+from benchmarks.common import keyword_name, summarize_latencies, write_results
+
+# 가상 사용자가 순서대로 반복 호출하는 조회 시나리오 (대시보드 화면 기준)
+def scenario(keywords: list[str], days: int) -> list[tuple[str, dict]]:
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+    period = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+    steps = []
+    for keyword in keywords:
+        steps += [
+            ("/dashboard", {"keyword": keyword, **period}),
+            ("/marketing/search-volume", {"keyword": keyword, **period}),
+            ("/analytics/marketing-sales", {"keyword": keyword, **period}),
+            ("/marketing/search-volulme-trend", {"keyword": keyword}),
+        ]
+    steps.append(("/sales/", period))
+    return steps
+
+# 각 스레드가 자신의 세션(연결 재사용)으로 duration 동안 시나리오를 반복 호출
+def run(base_url: str, concurrency: int, duration: float, steps: list[tuple[str, dict]], timeout: float) -> dict:
+    latencies: dict[str, list[float]] = {path: [] for path, _ in steps}
+    errors: dict[str, int] = {path: 0 for path, _ in steps}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(offset: int):
+        session = requests.Session()
+        index = offset
+        while time.perf_counter() < deadline:
+            path, params = steps[index % len(steps)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                failed = session.get(base_url + path, params=params, timeout=timeout).status_code >= 400
+            except requests.RequestException:
+                failed = True
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies[path].append(elapsed)
+                errors[path] += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "total": {**summarize_latencies(all_latencies, elapsed), "errors": sum(errors.values())},
+        "endpoints": {
+            path: {**summarize_latencies(values, elapsed), "errors": errors[path]}
+            for path, values in latencies.items()
+            if values
+        },
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="실행 중인 API 서버 대상 동시 부하 테스트")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="측정 시간 (초)")
+    parser.add_argument("--keywords", type=int, default=10, help="datagen 키워드 중 사용할 개수")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    steps = scenario([keyword_name(i) for i in range(args.keywords)], args.days)
+    results = run(args.base_url.rstrip("/"), args.concurrency, args.duration, steps, args.timeout)
+    write_results(args.output, "loadtest", vars(args), results)
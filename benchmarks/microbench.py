@@ -0,0 +1,144 @@
+import argparse
+import os
+import time
+from datetime import date, timedelta
+from benchmarks.common import keyword_name, summarize_latencies, write_results
+from benchmarks.fake_datalab import serve
+
+# 업로드 벤치마크용 날짜 구간 (생성 데이터보다 훨씬 앞선 기간을 사용하고 매 실행 전에 비움)
+# 모든 업로드 구간은 UPLOAD_CUTOFF_DATE 전에 끝나야 하며, 그 이전 날짜만 정리 대상
+UPLOAD_BASE_DATE = date(1000, 1, 1)
+UPLOAD_CUTOFF_DATE = date(1900, 1, 1)
+CRAWL_KEYWORD = "벤치마크크롤링"
+
+def _timed(fn, repeat: int) -> tuple[list[float], list]:
+    latencies, results = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results.append(fn())
+        latencies.append(time.perf_counter() - started)
+    return latencies, results
+
+def _sales_csv(start: date, rows: int) -> bytes:
+    lines = ["date,revenue"] + [f"{start + timedelta(days=i)},{1_000 + i}" for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode()
+
+# 응답 상태 코드와 본문의 error 키로 실패 여부 판단
+def _failed(response) -> bool:
+    if response.status_code >= 400:
+        return True
+    if response.headers.get("content-type", "").startswith("application/json"):
+        body = response.json()
+        return isinstance(body, dict) and "error" in body
+    return False
+
+# 저장 API 벤치마크: CSV 업로드(일반/대량)와 가짜 DataLab 대상 검색량 크롤링
+def bench_ingest(client, repeat: int, upload_rows: int, crawl_days: int) -> dict:
+    from sqlalchemy import delete, select
+    from backend.app.database import SessionLocal
+    from backend.app.models.model import SalesData
+    from backend.app.services.rollups import refresh_sales_rollups
+    from backend.app.services.anomalies import track_sales_anomalies
+    from backend.app.services.crawler import save_search_volume
+
+    # 일반/대량 업로드가 요청마다 겹치지 않는 구간을 쓰므로, 마지막 구간까지 정리 범위 안에 들어가는지 확인
+    block = upload_rows + 1
+    upload_end = UPLOAD_BASE_DATE + timedelta(days=2 * repeat * block)
+    if upload_end > UPLOAD_CUTOFF_DATE:
+        raise ValueError(f"업로드 구간이 {UPLOAD_CUTOFF_DATE}를 넘습니다 ({upload_end}): --repeat 또는 --upload-rows를 줄이세요.")
+
+    # 이전 실행에서 올린 업로드 구간을 지워 매번 같은 조건에서 측정
+    db = SessionLocal()
+    try:
+        old_dates = db.execute(select(SalesData.date).where(SalesData.date < UPLOAD_CUTOFF_DATE)).scalars().all()
+        db.execute(delete(SalesData).where(SalesData.date < UPLOAD_CUTOFF_DATE))
+        refresh_sales_rollups(db, old_dates)
+        track_sales_anomalies(db, old_dates)
+        db.commit()
+    finally:
+        db.close()
+
+    results = {}
+    for index, bulk in enumerate([False, True]):
+        counter = iter(range(repeat))
+
+        def upload():
+            start = UPLOAD_BASE_DATE + timedelta(days=(index * repeat + next(counter)) * block)
+            return client.post(
+                "/sales/files",
+                params={"bulk": bulk},
+                files={"file": ("bench.csv", _sales_csv(start, upload_rows), "text/csv")},
+            )
+
+        latencies, responses = _timed(upload, repeat)
+        results[f"upload_sales_data[bulk={str(bulk).lower()}]"] = {
+            **summarize_latencies(latencies),
+            "rows_per_request": upload_rows,
+            "errors": sum(_failed(response) for response in responses),
+        }
+
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=crawl_days - 1)
+    latencies, written = _timed(
+        lambda: save_search_volume(CRAWL_KEYWORD, start.isoformat(), end.isoformat(), on_conflict="overwrite"),
+        repeat,
+    )
+    results["save_search_volume[overwrite]"] = {**summarize_latencies(latencies), "rows_per_request": written[-1]}
+    return results
+
+# 조회 API 벤치마크 (첫 요청은 캐시 미스, 이후는 캐시 설정에 따라 히트)
+def bench_reads(client, repeat: int, keyword: str, days: int) -> dict:
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+    period = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+    cases = {
+        "marketing/search-volume": ("/marketing/search-volume", {"keyword": keyword, **period}),
+        "marketing/search-volume[arrow]": ("/marketing/search-volume", {"keyword": keyword, "format": "arrow", **period}),
+        "marketing/search-volume[page]": ("/marketing/search-volume", {"keyword": keyword, "limit": 1000}),
+        "marketing/search-volulme-trend": ("/marketing/search-volulme-trend", {"keyword": keyword, "unit": "week", "periods": 4}),
+        "sales": ("/sales/", period),
+        "analytics/marketing-sales": ("/analytics/marketing-sales", {"keyword": keyword, **period}),
+        "analytics/marketing-sales[month]": ("/analytics/marketing-sales", {"keyword": keyword, "period": "month", **period}),
+        "dashboard": ("/dashboard", {"keyword": keyword, **period}),
+    }
+
+    results = {}
+    for name, (path, params) in cases.items():
+        latencies, responses = _timed(lambda: client.get(path, params=params), repeat)
+        results[name] = {
+            **summarize_latencies(latencies),
+            "first_ms": round(latencies[0] * 1000, 3),
+            "bytes": len(responses[-1].content),
+            "errors": sum(_failed(response) for response in responses),
+        }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장/조회 API 마이크로벤치마크 (DATABASE_URL 대상, 프로세스 내 TestClient)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keyword", default=keyword_name(0), help="조회 대상 키워드 (datagen 생성 키워드)")
+    parser.add_argument("--days", type=int, default=365, help="조회 기간 (어제부터 거슬러 올라간 일수)")
+    parser.add_argument("--upload-rows", type=int, default=1000)
+    parser.add_argument("--crawl-days", type=int, default=365)
+    parser.add_argument("--no-cache", action="store_true", help="조회 결과 캐시를 끄고 측정")
+    parser.add_argument("--skip-ingest", action="store_true")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    # 앱 설정은 import 시점에 환경 변수에서 읽으므로 서버 주소와 캐시 설정을 먼저 지정
+    server, url = serve()
+    os.environ["DATALAB_URL"] = url
+    if args.no_cache:
+        os.environ["CACHE_MAX_ENTRIES"] = "0"
+
+    from fastapi.testclient import TestClient
+    from backend.app.main import app
+
+    with TestClient(app) as client:
+        results = {}
+        if not args.skip_ingest:
+            results["ingest"] = bench_ingest(client, args.repeat, args.upload_rows, args.crawl_days)
+        results["reads"] = bench_reads(client, args.repeat, args.keyword, args.days)
+
+    server.shutdown()
+    write_results(args.output, "microbench", vars(args), results)
@@ -1,6 +1,13 @@
 import streamlit as st
 import requests
+import time
+import threading
 import pandas as pd
+import pyarrow as pa
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
@@ -12,84 +19,172 @@ st.title("검색량 & 매출 데이터 대시보드")
 API_BASE_URL = "http://127.0.0.1:8000"
 
 
-# 검색량 데이터 조회 메서드
-def fetch_marketing_data(keyword, start_date, end_date):
-    response = requests.get(
-        f"{API_BASE_URL}/marketing/search-volume", params={"keyword": keyword, "start_date": start_date, "end_date": end_date}
-    )
+# 조회 결과 캐시 유지 시간 (초)
+CACHE_TTL_SECONDS = 300
 
-    if response.status_code == 200:
-        data = response.json()
-        if data:
-            return pd.DataFrame(data)
-        else:
-            st.warning("검색량 데이터가 존재하지 않습니다.")
-            return pd.DataFrame()
-    else:
-        st.error(f"서버 오류: {response.status_code} | 데이터를 불러올 수 없습니다.")
-        return pd.DataFrame()
-    
-
-# 매출 데이터 조회 메서드
-def fetch_sales_data(start_date, end_date):
-    response = requests.get(
-        f"{API_BASE_URL}/sales", params={"start_date": start_date, "end_date": end_date}
+# 세션별로 보관할 키워드 시계열 수
+MAX_CACHED_KEYWORDS = 20
+
+# 시계열 데이터는 Arrow 스트림으로 받아 JSON 파싱과 날짜 변환 없이 DataFrame으로 읽음
+ARROW_HEADERS = {"Accept": "application/vnd.apache.arrow.stream"}
+
+
+# 연결을 재사용하는 HTTP 세션 (앱 전체에서 하나만 생성)
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
     )
-                            
-    if response.status_code == 200:
-        data = response.json()
-        if data:
-            return pd.DataFrame(data)
-        else:
-            st.warning("매출 데이터가 존재하지 않습니다.")
-            return pd.DataFrame()
-    else:
-        st.error(f"서버 오류: {response.status_code} | 데이터를 불러올 수 없습니다.")
-        return pd.DataFrame()
-    
-
-# 검색량 & 매출 비교 데이터 조회 메서드
-def fetch_comparison_data(keyword, start_date, end_date):
-    response = requests.get(
-        f"{API_BASE_URL}/analytics/marketing-sales",
-        params={"keyword": keyword, "start_date": start_date, "end_date": end_date}
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Arrow IPC 응답을 DataFrame으로 변환 (date32 칼럼은 바로 datetime64로 변환됨)
+def read_arrow(response):
+    return pa.ipc.open_stream(response.content).read_all().to_pandas(date_as_object=False)
+
+
+# 대시보드 데이터 조회 메서드 (키워드 + 기간 단위로 TTL 동안 캐시)
+# 오류 응답은 예외로 올려 캐시에 남지 않게 함 (st.cache_data는 예외가 난 호출을 저장하지 않음)
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_dashboard_range(keyword, start_date, end_date):
+    response = get_http_session().get(
+        f"{API_BASE_URL}/dashboard",
+        params={"keyword": keyword, "start_date": start_date, "end_date": end_date},
+        headers=ARROW_HEADERS
     )
-    comparison_data = response.json()
+    response.raise_for_status()
 
-    if response.status_code == 200:
-        if comparison_data["missing_data"]:  # 부족한 데이터가 있는 경우 경고 메시지 표시
-            st.warning("🚨 " + " / ".join(comparison_data["missing_data"]))
-            return pd.DataFrame()  # 차트가 생성되지 않도록 빈 데이터 반환
-        else:
-            return pd.DataFrame(comparison_data["data"])  # 차트 생성에 필요한 데이터만 반환
+    series_df = read_arrow(response)
+    return series_df[["date", "search_volume", "revenue"]]
+
+
+# 검색량이 있는 날짜끼리 직전 행 대비 변화율 계산 (서버와 같은 규칙: 직전 값이 0이거나 없으면 NaN)
+def add_change_rates(series_df):
+    series_df = series_df.copy()
+    observed = series_df[series_df["search_volume"].notna()]
+
+    for column in ("search_volume", "revenue"):
+        previous = observed[column].shift(1)
+        rate = ((observed[column] - previous) / previous * 100).round(2)
+        series_df[f"{column}_change_rate"] = rate.where(previous != 0)
+
+    return series_df
+
+
+# 세션에 보관한 키워드 시계열에서 조회 기간을 잘라 반환
+# 기간을 넓힌 경우 새로 필요한 앞/뒤 구간만 동시에 요청해서 기존 데이터에 병합
+def fetch_dashboard_data(keyword, start_date, end_date):
+    start_date, end_date = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    cache = st.session_state.setdefault("series_cache", {})
+    entry = cache.get(keyword)
+
+    # 보관된 데이터가 없거나, 오래됐거나, 조회 기간과 이어지지 않으면 전체 기간을 새로 요청
+    if (
+        entry is None
+        or time.time() - entry["fetched_at"] > CACHE_TTL_SECONDS
+        or start_date > entry["end"] + pd.Timedelta(days=1)
+        or end_date < entry["start"] - pd.Timedelta(days=1)
+    ):
+        entry = {"start": start_date, "end": end_date, "df": pd.DataFrame(), "fetched_at": time.time()}
+        missing_ranges = [(start_date, end_date)]
     else:
-        st.error(f"서버 오류: {response.status_code} | 데이터를 불러올 수 없습니다.")
-        return pd.DataFrame()
+        missing_ranges = []
+        if start_date < entry["start"]:
+            missing_ranges.append((start_date, entry["start"] - pd.Timedelta(days=1)))
+        if end_date > entry["end"]:
+            missing_ranges.append((entry["end"] + pd.Timedelta(days=1), end_date))
+
+    if missing_ranges:
+        # 작업 스레드에서도 st.cache_data를 사용할 수 있도록 현재 스크립트 컨텍스트를 연결
+        script_run_ctx = get_script_run_ctx()
+
+        def fetch_range(date_range):
+            add_script_run_ctx(threading.current_thread(), script_run_ctx)
+            return fetch_dashboard_range(keyword, date_range[0].date(), date_range[1].date())
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(missing_ranges)) as executor:
+                results = list(executor.map(fetch_range, missing_ranges))
+        except requests.RequestException as e:
+            # 오류 응답은 상태 코드, 재시도 후에도 실패한 요청이나 연결 오류는 예외 내용을 표시
+            detail = e.response.status_code if e.response is not None else e
+            st.error(f"서버 오류: {detail} | 데이터를 불러올 수 없습니다.")
+            return pd.DataFrame(), [], []
+
+        entry["df"] = (
+            pd.concat([entry["df"]] + results)
+            .drop_duplicates("date", keep="last")
+            .sort_values("date")
+            .reset_index(drop=True)
+        )
+        entry["start"], entry["end"] = min(entry["start"], start_date), max(entry["end"], end_date)
+
+    # 최근에 조회한 키워드 순서로 보관 개수 제한
+    cache.pop(keyword, None)
+    cache[keyword] = entry
+    while len(cache) > MAX_CACHED_KEYWORDS:
+        cache.pop(next(iter(cache)))
+
+    series_df = add_change_rates(entry["df"][entry["df"]["date"].between(start_date, end_date)])
+    missing_marketing_dates = series_df[series_df["search_volume"].isna()]["date"].dt.strftime("%Y-%m-%d").tolist()
+    missing_sales_dates = series_df[series_df["revenue"].isna()]["date"].dt.strftime("%Y-%m-%d").tolist()
+    return series_df, missing_marketing_dates, missing_sales_dates
+
+
+# 저장된 키워드 자동완성 조회 (초성/음절 접두어, 짧은 TTL로 캐시, 서버 오류 시 빈 목록)
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_keyword_suggestions(prefix, limit=20):
+    try:
+        response = get_http_session().get(f"{API_BASE_URL}/marketing/keywords", params={"prefix": prefix, "limit": limit})
+    except requests.RequestException:
+        return []
+    if response.status_code != 200:
+        return []
+    return response.json()["results"]
 
 
 # Streamlit 시각화 - UI 구성
 st.sidebar.header("📌 데이터 필터링")
-selected_keyword = st.sidebar.text_input("🔍 검색 키워드 입력", "(예: 스타벅스)")
+keyword_input = st.sidebar.text_input("🔍 검색 키워드 입력 (초성 검색 가능: ㅅㅌㅂ)", placeholder="(예: 스타벅스)")
+suggestions = fetch_keyword_suggestions(keyword_input.strip()) if keyword_input.strip() else []
+
+# 추천 목록의 첫 항목은 입력한 키워드 그대로 두고, 저장된 키워드를 고르면 수집 현황을 함께 표시
+if suggestions:
+    suggestion_stats = {item["keyword"]: item for item in suggestions}
+    options = [keyword_input.strip()] + [keyword for keyword in suggestion_stats if keyword != keyword_input.strip()]
+    selected_keyword = st.sidebar.selectbox("💡 추천 키워드", options)
+    stats = suggestion_stats.get(selected_keyword)
+    if stats:
+        st.sidebar.caption(
+            f"수집 기간: {stats['first_date']} ~ {stats['last_date']} ({stats['row_count']:,}일), "
+            f"마지막 검색량: {stats['latest_volume']}"
+        )
+else:
+    selected_keyword = keyword_input.strip()
 selected_start_date = st.sidebar.date_input("📅 조회 시작 날짜 입력")
 selected_end_date = st.sidebar.date_input("📅 조회 마지막 날짜 입력")
 
 if st.sidebar.button("📥 데이터 조회"):
 
-    # 조회 요청 기간 전체를 포함하는 데이터프레임 생성
-    full_date_range = pd.date_range(start=selected_start_date, end=selected_end_date)
-    full_date_df = pd.DataFrame({"date": full_date_range})
+    # 조회 요청 기간 전체 날짜로 채워진 시계열 (이미 받아온 구간은 세션 캐시에서 재사용)
+    series_df, missing_marketing_dates, missing_sales_dates = fetch_dashboard_data(
+        selected_keyword, selected_start_date, selected_end_date
+    )
+    has_marketing_data = not series_df.empty and series_df["search_volume"].notna().any()
+    has_sales_data = not series_df.empty and series_df["revenue"].notna().any()
 
     # 1. 검색량 데이터 차트 출력
     st.subheader(f"📈 {selected_keyword} 검색량 트렌드")
-    marketing_df = fetch_marketing_data(selected_keyword, selected_start_date, selected_end_date)
 
-    if not marketing_df.empty:
-        marketing_df["date"] = pd.to_datetime(marketing_df["date"]) # str -> datetime64 변환
-        marketing_df = marketing_df.sort_values("date") # 날짜 순 정렬
-        # 검색량을 정수로 변환
-        marketing_df["search_volume"] = marketing_df["search_volume"].astype(int)
-        # 조회 요청 기간 데이터를 유지하도록 병합
-        marketing_df = pd.merge(full_date_df, marketing_df, on="date", how="left")
+    if not has_marketing_data:
+        st.warning("검색량 데이터가 존재하지 않습니다.")
+    else:
+        marketing_df = series_df.assign(keyword=selected_keyword)
 
         # 그래프 생성
         fig = px.line(
@@ -122,15 +217,11 @@ if st.sidebar.button("📥 데이터 조회"):
 
     # 2. 매출 데이터 차트 출력
     st.subheader("💰 매출 데이터 트렌드")
-    sales_df = fetch_sales_data(selected_start_date, selected_end_date)
-    if not sales_df.empty:
-        sales_df["date"] = pd.to_datetime(sales_df["date"]) # str -> datetime64 변환
-        sales_df = sales_df.sort_values("date") # 날짜 순 정렬
-        # 조회 요청 기간 데이터를 유지하도록 병합
-        sales_df = pd.merge(full_date_df, sales_df, on="date", how="left")
-
+    if not has_sales_data:
+        st.warning("매출 데이터가 존재하지 않습니다.")
+    else:
         fig = px.bar(
-            sales_df, 
+            series_df, 
             x="date", 
             y="revenue", 
             title="일별 매출 데이터",
@@ -151,39 +242,12 @@ if st.sidebar.button("📥 데이터 조회"):
 
         # 3. 검색량 및 매출 변화율 비교 데이터 출력
         st.subheader("📊 검색량 & 매출 변화율 비교")
-        comparison_df = fetch_comparison_data(selected_keyword, selected_start_date, selected_end_date)
 
-        if comparison_df.empty: # 데이터프레임이 비어있는지 확인
+        if not has_marketing_data: # 검색량 데이터가 없으면 변화율을 계산할 수 없음
+            st.warning(f"🚨 {selected_start_date}부터 {selected_end_date}까지 {selected_keyword}의 데이터 없음")
             st.warning("🔎 데이터가 부족해서 시각화할 수 없습니다.")
         else:
-            comparison_df["date"] = pd.to_datetime(comparison_df["date"]) # str -> datetime64 변환
-            comparison_df = comparison_df.sort_values("date") # 날짜 순 정렬
-
-            # 조회 요청 기간과 비교 데이터 기간 병합
-            merged_df = pd.merge(
-                full_date_df,
-                comparison_df,
-                on="date",
-                how="outer"
-            ).sort_values("date")
-
-            # 검색량과 매출 데이터가 하나라도 존재하는 모든 날짜를 포함하게 수정
-            merged_df = pd.merge(
-                pd.merge(merged_df, marketing_df, on="date", how="outer"),
-                sales_df,
-                on="date",
-                how="outer"
-            ).sort_values("date")
-
-            # 데이터가 없는 경우 NaN -> pd.NA 처리
-            merged_df["revenue"] = merged_df["revenue"].fillna(pd.NA)
-            merged_df["search_volume"] = merged_df["search_volume"].fillna(pd.NA)
-
-            # 검색량 및 매출 데이터가 누락된 날짜 필터링 (datetime64 -> str list 변환)
-            missing_sales_dates = merged_df[merged_df["revenue"].isnull()]["date"].dt.strftime("%Y-%m-%d").tolist()
-            missing_marketing_dates = merged_df[merged_df["search_volume"].isnull()]["date"].dt.strftime("%Y-%m-%d").tolist()
-
-            # 누락된 날짜 메시지 표시
+            # 누락된 날짜 메시지 표시 (서버에서 계산한 목록 사용)
             if missing_sales_dates:
                 st.warning(f"⚠️ 매출 데이터 누락 날짜: {', '.join(missing_sales_dates)}")
             if missing_marketing_dates:
@@ -194,8 +258,8 @@ if st.sidebar.button("📥 데이터 조회"):
             # 매출 변동률 (Bar Chart)
             fig.add_trace(
                 go.Bar(
-                    x=merged_df["date"],
-                    y=merged_df["revenue_change_rate"],
+                    x=series_df["date"],
+                    y=series_df["revenue_change_rate"],
                     name="매출 변동률 (%)",
                     marker=dict(color="blue")  # 마커 색 지정
                 )
@@ -204,8 +268,8 @@ if st.sidebar.button("📥 데이터 조회"):
             # 검색량 변화율 (Line Chart)
             fig.add_trace(
                 go.Scatter(
-                    x=merged_df["date"],
-                    y=merged_df["search_volume_change_rate"],
+                    x=series_df["date"],
+                    y=series_df["search_volume_change_rate"],
                     name="검색량 변화율 (%)",
                     mode="lines+markers",
                     marker=dict(color="red")
@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# 모든 테스트가 같은 임시 SQLite DB를 사용 (backend.app.database를 처음 가져오기 전에 설정해야 하므로 패키지에서 한 번만 지정)
+# DB_ASYNC를 켜서 조회 API는 aiosqlite 세션으로, 크롤러/스케줄러는 같은 파일의 동기 세션으로 확인
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ["DB_ASYNC"] = "true"
+os.environ["DATALAB_STORE_ENABLED"] = "false"
+os.environ["METRICS_ENABLED"] = "false"
@@ -0,0 +1,105 @@
+import json
+import unittest
+from datetime import date, datetime, timedelta
+import polars as pl
+from backend.app.database import SessionLocal, engine
+from backend.app.models.model import Anomaly, AnomalyState, Base, MarketingData
+from backend.app.services.anomalies import ANOMALY_MIN_HISTORY, ANOMALY_WINDOW, observe_point, score_frame, track_marketing_anomalies
+from backend.app.services.clock import FakeClock, get_clock, set_clock
+
+START = date(2024, 1, 1)
+DETECTED_AT = datetime(2024, 3, 1, 6, 0)
+
+def frame(values: list[float], key: str = "키워드") -> pl.DataFrame:
+    return pl.DataFrame(
+        [(key, START + timedelta(days=i), float(value)) for i, value in enumerate(values)],
+        schema={"key": pl.String, "date": pl.Date, "value": pl.Float64},
+        orient="row",
+    )
+
+class ScoreFrameTest(unittest.TestCase):
+    def test_flags_a_spike_after_enough_history(self):
+        values = [100 + (i % 3) for i in range(40)]
+        values[30] = 160
+        values[5] = 160
+
+        anomalies, states = score_frame("marketing", frame(values), DETECTED_AT)
+
+        # 이력이 ANOMALY_MIN_HISTORY보다 짧은 5번째 점은 판정하지 않음
+        self.assertEqual([row["date"] for row in anomalies], [START + timedelta(days=30)])
+        self.assertGreater(anomalies[0]["zscore"], 3)
+        self.assertEqual(anomalies[0]["detected_at"], DETECTED_AT)
+        self.assertEqual(states[0]["point_count"], 40)
+        self.assertEqual(states[0]["last_date"], START + timedelta(days=39))
+        self.assertEqual(json.loads(states[0]["window"]), values[-ANOMALY_WINDOW:])
+
+    def test_flat_zeros_use_the_absolute_std_floor(self):
+        # 0이 이어진 구간은 분산과 MAD가 0이므로 표준편차 하한(ANOMALY_MIN_STD=0.5)으로 z-score 계산
+        anomalies, _ = score_frame("marketing", frame([0.0] * 20 + [5.0]), DETECTED_AT)
+
+        self.assertEqual(len(anomalies), 1)
+        self.assertAlmostEqual(anomalies[0]["zscore"], 10.0)
+        # MAD가 0이라 robust z-score는 무한대 (null로 저장)
+        self.assertIsNone(anomalies[0]["mad_score"])
+
+    def test_flat_series_use_the_relative_std_floor(self):
+        # 평균 1000의 평평한 구간: 하한은 평균의 1% (10), 급변 폭이 하한의 3배 미만이면 이상치가 아님
+        anomalies, _ = score_frame("marketing", frame([1000.0] * 20 + [1020.0, 1000.0, 1100.0]), DETECTED_AT)
+
+        self.assertEqual([row["date"] for row in anomalies], [START + timedelta(days=22)])
+        self.assertGreater(anomalies[0]["zscore"], 9)
+
+    def test_observe_point_matches_the_full_recompute(self):
+        values = [100 + (i % 3) for i in range(30)] + [160.0]
+        _, states = score_frame("marketing", frame(values[:-1]), DETECTED_AT)
+        anomalies, expected_states = score_frame("marketing", frame(values), DETECTED_AT)
+
+        state = AnomalyState(**states[0])
+        zscore, median, mad_score = observe_point(state, START + timedelta(days=30), values[-1])
+
+        self.assertAlmostEqual(zscore, anomalies[0]["zscore"])
+        self.assertAlmostEqual(median, anomalies[0]["median"])
+        self.assertAlmostEqual(mad_score, anomalies[0]["mad_score"])
+        self.assertAlmostEqual(state.ewma_mean, expected_states[0]["ewma_mean"])
+        self.assertAlmostEqual(state.ewma_var, expected_states[0]["ewma_var"])
+        self.assertEqual(json.loads(state.window), json.loads(expected_states[0]["window"]))
+        self.assertEqual(state.point_count, 31)
+
+    def test_observe_point_applies_the_std_floor(self):
+        _, states = score_frame("marketing", frame([0.0] * ANOMALY_MIN_HISTORY), DETECTED_AT)
+
+        zscore, _, _ = observe_point(AnomalyState(**states[0]), START + timedelta(days=ANOMALY_MIN_HISTORY), 5.0)
+
+        self.assertAlmostEqual(zscore, 10.0)
+
+# 저장 경로에서 호출하는 증분 탐지: 탐지 시각은 공용 시계 기준
+class TrackAnomaliesTest(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.previous_clock = get_clock()
+        set_clock(FakeClock(DETECTED_AT))
+        self.db = SessionLocal()
+
+    def tearDown(self):
+        self.db.close()
+        set_clock(self.previous_clock)
+
+    def save(self, rows: list[dict]):
+        self.db.add_all(MarketingData(**row) for row in rows)
+        self.db.flush()
+        track_marketing_anomalies(self.db, rows)
+        self.db.commit()
+
+    def test_incremental_points_are_stamped_with_the_shared_clock(self):
+        self.save([{"keyword": "증분", "date": START + timedelta(days=i), "search_volume": 0.0} for i in range(20)])
+        get_clock().advance(hours=1)
+        self.save([{"keyword": "증분", "date": START + timedelta(days=20), "search_volume": 5.0}])
+
+        anomaly = self.db.query(Anomaly).one()
+        self.assertEqual(anomaly.date, START + timedelta(days=20))
+        self.assertEqual(anomaly.detected_at, DETECTED_AT + timedelta(hours=1))
+        self.assertEqual(self.db.get(AnomalyState, ("marketing", "증분")).updated_at, DETECTED_AT + timedelta(hours=1))
+
+if __name__ == "__main__":
+    unittest.main()
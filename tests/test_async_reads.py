@@ -0,0 +1,92 @@
+import unittest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from backend.app.database import DB_ASYNC, SessionLocal, async_engine, engine
+from backend.app.main import app
+from backend.app.models.model import Base, MarketingData, SalesData
+from backend.app.services.cache import InMemoryCache, invalidate_marketing, set_cache
+
+START = date(2024, 1, 1)
+
+# DB_ASYNC=true에서 조회 API가 요청 세션(aiosqlite)으로만 DB를 읽는지 확인
+class AsyncReadTest(unittest.TestCase):
+    def setUp(self):
+        self.assertTrue(DB_ASYNC)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        set_cache(InMemoryCache())
+
+        db = SessionLocal()
+        db.add_all(
+            [MarketingData(keyword="비동기", date=START + timedelta(days=i), search_volume=10.0 + i) for i in range(10)]
+            + [SalesData(date=START + timedelta(days=i), revenue=1000 * (i + 1)) for i in range(0, 10, 2)]
+        )
+        db.commit()
+        db.close()
+
+        # 엔진별로 실행된 SQL 기록
+        self.statements = {"sync": [], "async": []}
+        self.listeners = [
+            (engine, self._recorder("sync")),
+            (async_engine.sync_engine, self._recorder("async")),
+        ]
+        for target, listener in self.listeners:
+            event.listen(target, "before_cursor_execute", listener)
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        for target, listener in self.listeners:
+            event.remove(target, "before_cursor_execute", listener)
+
+    def _recorder(self, name: str):
+        def record(conn, cursor, statement, parameters, context, executemany):
+            self.statements[name].append(statement)
+        return record
+
+    def sync_reads(self) -> list[str]:
+        return [statement for statement in self.statements["sync"] if statement.lstrip().upper().startswith("SELECT")]
+
+    def get_dashboard(self, **headers):
+        return self.client.get(
+            "/dashboard",
+            params={"keyword": "비동기", "start_date": "2024-01-01", "end_date": "2024-01-10"},
+            headers=headers,
+        )
+
+    def test_dashboard_reads_through_the_async_session(self):
+        response = self.get_dashboard()
+
+        self.assertEqual(response.status_code, 200)
+        series = response.json()["series"]
+        self.assertEqual(series["search_volume"][:3], [10.0, 11.0, 12.0])
+        self.assertEqual(series["revenue"][:3], [1000, None, 3000])
+        self.assertEqual(response.json()["missing_sales_dates"][0], "2024-01-02")
+
+        # 캐시 버전(요청당 한 번)과 시계열 조회 모두 비동기 엔진에서 실행되고 동기 엔진으로는 읽지 않음
+        # (응답 후 조회 수 기록은 쓰기이므로 동기 엔진 사용)
+        self.assertEqual(sum("cache_version" in statement for statement in self.statements["async"]), 1)
+        self.assertEqual(self.sync_reads(), [])
+
+    def test_etag_revalidates_until_the_data_changes(self):
+        etag = self.get_dashboard().headers["etag"]
+        self.assertEqual(self.get_dashboard(**{"If-None-Match": etag}).status_code, 304)
+
+        invalidate_marketing([{"keyword": "비동기", "date": START}])
+
+        response = self.get_dashboard(**{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["etag"], etag)
+
+    def test_search_volume_reads_through_the_async_session(self):
+        response = self.client.get(
+            "/marketing/search-volume",
+            params={"keyword": "비동기", "start_date": "2024-01-03", "end_date": "2024-01-05"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["search_volume"] for row in response.json()], [12.0, 13.0, 14.0])
+        self.assertEqual(self.sync_reads(), [])
+
+if __name__ == "__main__":
+    unittest.main()
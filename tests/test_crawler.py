@@ -0,0 +1,89 @@
+import unittest
+from datetime import date, datetime
+from backend.app.database import SessionLocal, engine
+from backend.app.models.model import Base, CacheVersion, CrawlState, MarketingData
+from backend.app.services import crawler
+from backend.app.services.clock import FakeClock, get_clock, set_clock
+from backend.app.services.crawler import save_search_volume, save_search_volume_history, save_search_volumes
+from benchmarks.fake_datalab import _raw_volumes, serve
+
+# 가짜 DataLab 서버를 상대로 크롤러 저장 경로를 실행
+class CrawlerTest(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.previous_clock = get_clock()
+        set_clock(FakeClock(datetime(2024, 3, 1, 6, 0)))
+        self.server, self.url = serve("127.0.0.1", 0, 0.0, 0.0)
+        # 단일 키워드 수집(get_search_volume)도 가짜 서버로 요청
+        self.previous_url = crawler.DATALAB_URL
+        crawler.DATALAB_URL = self.url
+        self.db = SessionLocal()
+
+    def tearDown(self):
+        self.db.close()
+        crawler.DATALAB_URL = self.previous_url
+        self.server.shutdown()
+        self.server.server_close()
+        set_clock(self.previous_clock)
+
+    def save_search_volumes(self, keywords: list[str], start_date: str, end_date: str, on_conflict: str = "skip") -> int:
+        return save_search_volumes(keywords, start_date, end_date, on_conflict, base_url=self.url, max_attempts=1)
+
+    def versions(self) -> dict[str, int]:
+        self.db.expire_all()
+        return dict(self.db.query(CacheVersion.scope, CacheVersion.version).all())
+
+    def stored(self, keyword: str) -> list[tuple[date, float]]:
+        self.db.expire_all()
+        return self.db.query(MarketingData.date, MarketingData.search_volume).filter(
+            MarketingData.keyword == keyword
+        ).order_by(MarketingData.date).all()
+
+    # 원본 검색량 대비 저장 값의 비율이 모든 날짜에서 같아야 함
+    def assert_single_scale(self, keyword: str, count: int):
+        rows = self.stored(keyword)
+        ratios = [volume / _raw_volumes(keyword, day, 1)[0] for day, volume in rows]
+        self.assertEqual(len(rows), count)
+        self.assertAlmostEqual(min(ratios), max(ratios), places=4)
+
+    def test_batch_save_writes_only_new_days(self):
+        self.assertEqual(self.save_search_volumes(["묶음가", "묶음나"], "2024-01-01", "2024-01-31"), 62)
+        before = self.versions()
+
+        # 이미 저장된 1월 15~31일은 다시 저장하지 않고, 2월 날짜만 저장/무효화
+        self.assertEqual(self.save_search_volumes(["묶음가", "묶음나"], "2024-01-15", "2024-02-10"), 20)
+        after = self.versions()
+        self.assertEqual(after["marketing:묶음가:2024-01"], before["marketing:묶음가:2024-01"])
+        self.assertEqual(after["marketing:묶음가:2024-02"], 1)
+
+        # 새로 받은 날짜도 저장된 값과 같은 척도
+        self.assert_single_scale("묶음가", 41)
+
+    def test_gap_fill_across_a_window_boundary_stays_on_the_stored_scale(self):
+        # 30일 구간(7일 겹침)으로 나눠 받은 과거 이력: 1월 24~30일이 첫 두 구간의 경계
+        save_search_volume_history(["경계"], "2024-01-01", "2024-02-29", window_days=30, overlap_days=7, base_url=self.url, max_attempts=1)
+        self.assert_single_scale("경계", 60)
+
+        # 경계를 가로지르는 날짜를 지우고 누락 구간만 다시 수집
+        self.db.query(MarketingData).filter(
+            MarketingData.keyword == "경계",
+            MarketingData.date.between(date(2024, 1, 20), date(2024, 2, 5)),
+        ).delete()
+        self.db.query(CrawlState).filter(CrawlState.keyword == "경계").delete()
+        self.db.commit()
+
+        self.assertEqual(save_search_volume("경계", "2024-01-01", "2024-02-29"), 17)
+        self.assert_single_scale("경계", 60)
+        self.assertEqual(self.db.get(CrawlState, "경계").updated_at, get_clock().now())
+
+    def test_overwrite_skips_unchanged_days(self):
+        self.save_search_volumes(["덮어쓰기"], "2024-01-01", "2024-02-10")
+        before = self.versions()
+
+        # 같은 원본 값을 다시 받아 저장된 척도에 맞추면 바뀐 날짜가 없으므로 저장/무효화하지 않음
+        self.assertEqual(self.save_search_volumes(["덮어쓰기"], "2024-01-10", "2024-01-20", "overwrite"), 0)
+        self.assertEqual(self.versions(), before)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import time
+import unittest
+from datetime import date, timedelta
+import httpx
+from backend.app.database import engine
+from backend.app.models.model import Base
+from backend.app.services.datalab_client import DataLabClient, TokenBucket, split_windows, stitch_windows
+from benchmarks.fake_datalab import _raw_volumes, build_response, serve
+
+class SplitWindowsTest(unittest.TestCase):
+    def test_windows_overlap_and_cover_the_range(self):
+        windows = split_windows(date(2024, 1, 1), date(2024, 1, 25), window_days=10, overlap_days=3)
+
+        self.assertEqual(windows, [
+            (date(2024, 1, 1), date(2024, 1, 10)),
+            (date(2024, 1, 8), date(2024, 1, 17)),
+            (date(2024, 1, 15), date(2024, 1, 24)),
+            (date(2024, 1, 22), date(2024, 1, 25)),
+        ])
+
+    def test_short_range_is_a_single_window(self):
+        self.assertEqual(split_windows(date(2024, 1, 1), date(2024, 1, 5), 10, 3), [(date(2024, 1, 1), date(2024, 1, 5))])
+
+    def test_rejects_overlap_outside_the_window(self):
+        for overlap_days in (0, 10):
+            with self.assertRaises(ValueError):
+                split_windows(date(2024, 1, 1), date(2024, 2, 1), 10, overlap_days)
+
+class StitchWindowsTest(unittest.TestCase):
+    # 구간마다 최댓값을 100으로 정규화한 가짜 DataLab 응답
+    def window(self, keyword: str, start: date, days: int) -> dict:
+        response = build_response({
+            "startDate": start.isoformat(),
+            "endDate": (start + timedelta(days=days - 1)).isoformat(),
+            "keywordGroups": [{"groupName": keyword, "keywords": [keyword]}],
+        })
+        return {keyword: {period["period"]: period["ratio"] for period in response["results"][0]["data"]}}
+
+    def test_stitched_windows_share_one_scale(self):
+        windows = [self.window("이음", date(2024, 1, 1) + timedelta(days=offset), 30) for offset in (0, 20, 40)]
+
+        stitched = stitch_windows(windows)["이음"]
+        ratios = [period["ratio"] / _raw_volumes("이음", date.fromisoformat(period["period"]), 1)[0] for period in stitched]
+
+        self.assertEqual(len(stitched), 70)
+        self.assertEqual(max(period["ratio"] for period in stitched), 100)
+        self.assertAlmostEqual(min(ratios), max(ratios), places=4)
+
+    def test_without_normalize_keeps_the_first_window_scale(self):
+        first = {"척도": {"2024-01-01": 10.0, "2024-01-02": 20.0}}
+        second = {"척도": {"2024-01-02": 50.0, "2024-01-03": 100.0}}
+
+        stitched = stitch_windows([first, second], normalize=False)["척도"]
+
+        self.assertEqual([period["ratio"] for period in stitched], [10.0, 20.0, 40.0])
+
+    def test_zero_overlap_keeps_the_previous_scale(self):
+        first = {"영": {"2024-01-01": 10.0, "2024-01-02": 0.0}}
+        second = {"영": {"2024-01-02": 0.0, "2024-01-03": 30.0}}
+
+        stitched = stitch_windows([first, second], normalize=False)["영"]
+
+        self.assertEqual([period["ratio"] for period in stitched], [10.0, 0.0, 30.0])
+
+class TokenBucketTest(unittest.TestCase):
+    def acquire(self, bucket: TokenBucket, count: int) -> float:
+        async def run():
+            started = time.monotonic()
+            for _ in range(count):
+                await bucket.acquire()
+            return time.monotonic() - started
+
+        return asyncio.run(run())
+
+    def test_bursts_up_to_capacity(self):
+        self.assertLess(self.acquire(TokenBucket(rate=1, capacity=5), 5), 0.5)
+
+    def test_limits_requests_per_second(self):
+        # 첫 토큰 이후 4개는 초당 20개씩 충전되므로 최소 0.2초
+        self.assertGreaterEqual(self.acquire(TokenBucket(rate=20, capacity=1), 5), 0.19)
+
+# 가짜 DataLab 서버(또는 같은 응답을 만드는 MockTransport)를 상대로 DataLabClient 실행
+class DataLabClientTest(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+
+    def fetch_keywords(self, keywords: list[str], **client_options) -> tuple[dict, dict]:
+        async def run():
+            async with DataLabClient(max_per_second=100, **client_options) as client:
+                return await client.fetch_keywords(keywords, "2024-01-01", "2024-01-10")
+
+        return asyncio.run(run())
+
+    # 요청마다 statuses 순서대로 응답하고, 끝나면 가짜 DataLab 응답을 반환하는 transport
+    def transport(self, statuses: list[int], requests: list[dict]) -> httpx.MockTransport:
+        def handle(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            requests.append(body)
+            status = statuses.pop(0) if statuses else 200
+            if status != 200:
+                return httpx.Response(status, json={"errorMessage": "fake error"})
+            return httpx.Response(200, json=build_response(body))
+
+        return httpx.MockTransport(handle)
+
+    def test_batches_keywords_against_the_fake_server(self):
+        server, url = serve("127.0.0.1", 0, 0.0, 0.0)
+        try:
+            keywords = [f"키워드{i}" for i in range(7)]
+            series, errors = self.fetch_keywords(keywords, base_url=url, max_attempts=1)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(errors, {})
+        self.assertEqual(sorted(series), keywords)
+        self.assertEqual(len(series["키워드6"]), 10)
+        self.assertEqual(server.RequestHandlerClass.requests_served, 2)
+
+    def test_reports_failed_keywords_after_the_last_attempt(self):
+        server, url = serve("127.0.0.1", 0, 0.0, 1.0)
+        try:
+            series, errors = self.fetch_keywords(["실패"], base_url=url, max_attempts=1)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(series, {})
+        self.assertIn("503", errors["실패"])
+
+    def test_retries_rate_limit_and_server_errors(self):
+        requests = []
+        series, errors = self.fetch_keywords(["재시도"], transport=self.transport([429, 503], requests), max_attempts=3)
+
+        self.assertEqual(errors, {})
+        self.assertEqual(len(series["재시도"]), 10)
+        self.assertEqual(len(requests), 3)
+
+    def test_does_not_retry_client_errors(self):
+        requests = []
+        series, errors = self.fetch_keywords(["잘못된요청"], transport=self.transport([400], requests), max_attempts=3)
+
+        self.assertEqual(series, {})
+        self.assertIn("400", errors["잘못된요청"])
+        self.assertEqual(len(requests), 1)
+
+    def test_keeps_successful_batches_when_one_batch_fails(self):
+        def handle(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            if any(group["groupName"] == "실패묶음" for group in body["keywordGroups"]):
+                return httpx.Response(503, json={"errorMessage": "fake error"})
+            return httpx.Response(200, json=build_response(body))
+
+        keywords = [f"성공{i}" for i in range(5)] + ["실패묶음", "같은묶음"]
+        series, errors = self.fetch_keywords(keywords, transport=httpx.MockTransport(handle), max_attempts=1)
+
+        self.assertEqual(sorted(series), sorted(keywords[:5]))
+        self.assertEqual(sorted(errors), ["같은묶음", "실패묶음"])
+
+if __name__ == "__main__":
+    unittest.main()
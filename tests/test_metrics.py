@@ -0,0 +1,34 @@
+import time
+import unittest
+from types import SimpleNamespace
+from backend.app.services import metrics
+from backend.app.services.metrics import _after_cursor_execute
+
+# 느린 쿼리 로그에는 SQL 문과 파라미터/행 수만 남고 파라미터 값은 남지 않음
+class SlowQueryLogTest(unittest.TestCase):
+    def log(self, statement: str, parameters, executemany: bool) -> str:
+        context = SimpleNamespace(_query_started_at=time.perf_counter() - metrics.SLOW_QUERY_MS / 1000 - 0.1)
+        with self.assertLogs("backend.app.slow_query", "WARNING") as captured:
+            _after_cursor_execute(None, None, statement, parameters, context, executemany)
+        return captured.output[0]
+
+    def test_executemany_logs_the_batch_size_without_values(self):
+        rows = [("비밀키워드", f"2024-01-{day:02d}", 1.5) for day in range(1, 31)]
+
+        message = self.log("INSERT INTO marketing_data (keyword, date, search_volume)\n VALUES (?, ?, ?)", rows, True)
+
+        self.assertIn("INSERT INTO marketing_data (keyword, date, search_volume) VALUES (?, ?, ?)", message)
+        self.assertIn("params=3 rows=30", message)
+        self.assertNotIn("비밀키워드", message)
+
+    def test_long_statements_are_truncated(self):
+        statement = "SELECT * FROM sales_data WHERE date IN (" + ", ".join("?" * 5000) + ")"
+
+        message = self.log(statement, ("2024-01-01",) * 5000, False)
+
+        self.assertIn(f"... ({len(statement)} chars)", message)
+        self.assertIn("params=5000 rows=1", message)
+        self.assertLess(len(message), metrics.SLOW_QUERY_LOG_CHARS + 200)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from sqlalchemy import Column, Date, Integer, MetaData, String, Table, create_engine, inspect, select
+from sqlalchemy.orm import Session
+from backend.app.migrations import upgrade_schema
+from backend.app.models.model import MarketingData, SalesData
+from backend.app.utils.upsert import upsert_rows
+
+# 유니크 인덱스가 없던 이전 스키마의 DB를 업그레이드한 뒤 upsert가 동작하는지 확인
+class UpgradeSchemaTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.engine = create_engine(f"sqlite:///{self.path}")
+
+        legacy = MetaData()
+        marketing = Table(
+            "marketing_data", legacy,
+            Column("id", Integer, primary_key=True),
+            Column("keyword", String),
+            Column("date", Date),
+            Column("search_volume", Integer),
+        )
+        sales = Table(
+            "sales_data", legacy,
+            Column("id", Integer, primary_key=True),
+            Column("date", Date),
+            Column("revenue", Integer),
+        )
+        legacy.create_all(self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(marketing.insert(), [
+                {"keyword": "중복", "date": date(2024, 1, 1), "search_volume": 10},
+                {"keyword": "중복", "date": date(2024, 1, 1), "search_volume": 20},
+                {"keyword": "중복", "date": date(2024, 1, 2), "search_volume": 30},
+            ])
+            conn.execute(sales.insert(), [
+                {"date": date(2024, 1, 1), "revenue": 100},
+                {"date": date(2024, 1, 1), "revenue": 200},
+            ])
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.path)
+
+    def test_dedupes_and_adds_the_unique_indexes_once(self):
+        report = upgrade_schema(self.engine)
+
+        self.assertEqual(report["deduplicated"], {"marketing_data": 1, "sales_data": 1})
+        self.assertEqual(report["created_indexes"], ["ux_marketing_data_keyword_date", "sales_data_date_key"])
+        with self.engine.connect() as conn:
+            # 같은 키 중 가장 나중에 저장된 행만 남음
+            self.assertEqual(conn.execute(select(MarketingData.search_volume).order_by(MarketingData.date)).scalars().all(), [20, 30])
+            self.assertEqual(conn.execute(select(SalesData.revenue)).scalars().all(), [200])
+
+        # 다시 실행하면 아무것도 바꾸지 않음
+        self.assertEqual(upgrade_schema(self.engine), {"deduplicated": {}, "created_indexes": [], "altered_columns": []})
+        unique = [index["name"] for index in inspect(self.engine).get_indexes("marketing_data") if index["unique"]]
+        self.assertEqual(unique, ["ux_marketing_data_keyword_date"])
+
+    def test_upserts_work_after_the_upgrade(self):
+        upgrade_schema(self.engine)
+
+        with Session(self.engine) as db:
+            inserted = upsert_rows(db, MarketingData, [
+                {"keyword": "중복", "date": date(2024, 1, 2), "search_volume": 99.5},
+                {"keyword": "중복", "date": date(2024, 1, 3), "search_volume": 40.5},
+            ], ["keyword", "date"])
+            upsert_rows(db, SalesData, [{"date": date(2024, 1, 1), "revenue": 300}], ["date"], ["revenue"])
+            db.commit()
+
+            self.assertEqual(inserted, 1)
+            self.assertEqual(db.scalars(select(MarketingData.search_volume).order_by(MarketingData.date)).all(), [20, 30, 40.5])
+            self.assertEqual(db.scalars(select(SalesData.revenue)).all(), [300])
+
+if __name__ == "__main__":
+    unittest.main()
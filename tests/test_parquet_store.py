@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+from datetime import date
+from fastapi import HTTPException
+from backend.app.database import SessionLocal, engine
+from backend.app.models.model import Base, MarketingData, SalesData
+from backend.app.services.parquet_store import export_parquet_store, scan_marketing, scan_sales, store_version
+
+# 집계 테이블을 만들지 않은 원본 데이터도 월 단위 Parquet 파티션으로 내보내는지 확인
+class ParquetStoreTest(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.store_dir = tempfile.TemporaryDirectory()
+        self.db = SessionLocal()
+
+    def tearDown(self):
+        self.db.close()
+        self.store_dir.cleanup()
+
+    def export(self) -> dict:
+        return export_parquet_store(self.db, self.store_dir.name)
+
+    def test_exports_base_tables_without_rollups(self):
+        self.db.add_all([
+            MarketingData(keyword="원본", date=date(2024, 1, 31), search_volume=10.5),
+            MarketingData(keyword="원본", date=date(2024, 2, 1), search_volume=20.25),
+            SalesData(date=date(2024, 2, 1), revenue=1000),
+        ])
+        self.db.commit()
+
+        report = self.export()
+
+        self.assertEqual(report["tables"]["marketing_data"]["written_months"], ["2024-01", "2024-02"])
+        self.assertEqual(report["tables"]["sales_data"]["written_months"], ["2024-02"])
+        marketing = scan_marketing(["원본"], date(2024, 1, 1), date(2024, 2, 29), self.store_dir.name).collect()
+        self.assertEqual(marketing["search_volume"].to_list(), [10.5, 20.25])
+        self.assertEqual(scan_sales(date(2024, 1, 1), date(2024, 2, 29), self.store_dir.name).collect()["revenue"].to_list(), [1000])
+        self.assertEqual(store_version(self.store_dir.name), 1)
+
+    def test_rewrites_only_changed_months(self):
+        self.db.add_all([
+            MarketingData(keyword="변경", date=date(2024, 1, 15), search_volume=10.0),
+            MarketingData(keyword="변경", date=date(2024, 2, 15), search_volume=10.0),
+        ])
+        self.db.commit()
+        self.export()
+
+        self.db.query(MarketingData).filter(MarketingData.date == date(2024, 2, 15)).update({"search_volume": 12.0})
+        self.db.commit()
+        report = self.export()
+
+        self.assertEqual(report["tables"]["marketing_data"]["written_months"], ["2024-02"])
+        self.assertEqual(self.export()["tables"]["marketing_data"]["written_months"], [])
+
+    def test_rejects_a_store_without_partitions(self):
+        self.export()
+
+        with self.assertRaises(HTTPException) as raised:
+            store_version(self.store_dir.name)
+        self.assertEqual(raised.exception.status_code, 503)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from datetime import date, datetime
+from backend.app.database import SessionLocal, engine
+from backend.app.models.model import Base, MarketingData
+from backend.app.services.clock import FakeClock, get_clock, set_clock
+from backend.app.services.crawler import save_search_volume_history, save_search_volumes
+from backend.app.services.replay import replay_responses
+from backend.app.services.response_store import ResponseStore, get_response_store, set_response_store
+from benchmarks.fake_datalab import _raw_volumes, serve
+
+# 가짜 DataLab 서버로 수집하며 임시 응답 저장소에 쌓은 응답만으로 marketing_data를 다시 만듦
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.previous_clock = get_clock()
+        self.clock = FakeClock(datetime(2024, 3, 1, 6, 0))
+        set_clock(self.clock)
+        self.store_dir = tempfile.TemporaryDirectory()
+        self.previous_store = get_response_store()
+        self.store = ResponseStore(self.store_dir.name)
+        set_response_store(self.store)
+        self.server, self.url = serve("127.0.0.1", 0, 0.0, 0.0)
+        self.db = SessionLocal()
+
+    def tearDown(self):
+        self.db.close()
+        self.server.shutdown()
+        self.server.server_close()
+        set_response_store(self.previous_store)
+        self.store_dir.cleanup()
+        set_clock(self.previous_clock)
+
+    def stored(self, keyword: str) -> dict[date, float]:
+        self.db.expire_all()
+        return dict(self.db.query(MarketingData.date, MarketingData.search_volume).filter(MarketingData.keyword == keyword).all())
+
+    def test_replay_rebuilds_the_live_scale_across_window_boundaries(self):
+        # 30일 구간(7일 겹침)으로 받은 과거 이력 뒤에, 다음 날 묶음 수집으로 이어서 받은 응답
+        save_search_volume_history(["재생"], "2024-01-01", "2024-01-20", window_days=30, overlap_days=7, base_url=self.url, max_attempts=1)
+        self.clock.advance(hours=1)
+        save_search_volumes(["재생"], "2024-01-21", "2024-02-29", base_url=self.url, max_attempts=1)
+        live = self.stored("재생")
+        self.assertEqual(len(live), 60)
+
+        self.db.query(MarketingData).delete()
+        self.db.commit()
+        summary = replay_responses(store=self.store)
+
+        # 앞뒤로 함께 받은 날짜까지 모두 같은 척도로 재구성되고, 수집 때 저장한 날짜는 같은 값
+        replayed = self.stored("재생")
+        ratios = [volume / _raw_volumes("재생", day, 1)[0] for day, volume in replayed.items()]
+        self.assertEqual(summary["events"], 2)
+        self.assertEqual(summary["skipped_runs"], 0)
+        self.assertAlmostEqual(min(ratios), max(ratios), places=4)
+        for day, volume in live.items():
+            self.assertAlmostEqual(replayed[day], volume, places=3)
+
+if __name__ == "__main__":
+    unittest.main()
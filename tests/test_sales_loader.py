@@ -0,0 +1,55 @@
+import io
+import unittest
+from datetime import date
+from backend.app.database import SessionLocal, engine
+from backend.app.models.model import Base, CacheVersion, SalesDailyRollup, SalesData
+from backend.app.services.sales_loader import bulk_load_sales_csv
+
+# 빈 줄(3행), 따옴표 안 줄바꿈(6~7행)이 있는 CSV: 보고서의 행 번호는 파일의 실제 줄 번호
+CSV = (
+    "date,revenue\n"
+    "2024-01-01,100\n"
+    "\n"
+    "2024-01-02,abc\n"
+    "\"2024-01-03\",200\n"
+    "2024-02-01,\"1\n0\"\n"
+    "2024-02-02,300\n"
+    "bad,1\n"
+    "2024-03-05,500\n"
+)
+
+class BulkLoadSalesCsvTest(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.db = SessionLocal()
+        self.db.add(SalesData(date=date(2024, 3, 5), revenue=999))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+
+    def load(self, chunk_size: int) -> dict:
+        return bulk_load_sales_csv(self.db, io.BytesIO(CSV.encode()), chunk_size)
+
+    def test_reports_physical_line_numbers(self):
+        for chunk_size in (3, 100):
+            with self.subTest(chunk_size=chunk_size):
+                report = self.load(chunk_size)
+                errors = report["validation"]["errors"]
+                self.assertEqual(errors["revenue_type"]["rows"], [4, 6])
+                self.assertEqual(errors["date_format"]["rows"], [9])
+
+    def test_invalidates_only_inserted_dates(self):
+        report = self.load(3)
+
+        self.assertEqual((report["inserted"], report["skipped"], report["rejected"]), (3, 1, 3))
+        self.assertEqual(self.db.get(SalesData, 1).revenue, 999)
+        versions = dict(self.db.query(CacheVersion.scope, CacheVersion.version).all())
+        self.assertIn("sales:2024-02", versions)
+        # DB에 이미 있어 건너뛴 3월 날짜는 캐시 버전과 집계를 바꾸지 않음
+        self.assertNotIn("sales:2024-03", versions)
+        self.assertIsNone(self.db.get(SalesDailyRollup, date(2024, 3, 5)))
+
+if __name__ == "__main__":
+    unittest.main()
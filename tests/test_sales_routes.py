@@ -0,0 +1,42 @@
+import unittest
+from datetime import date
+from fastapi.testclient import TestClient
+from backend.app.database import SessionLocal, engine
+from backend.app.main import app
+from backend.app.models.model import AnomalyState, Base, CacheVersion, SalesDailyRollup, SalesData
+from backend.app.services.cache import InMemoryCache, set_cache
+
+class AddSalesDataTest(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        set_cache(InMemoryCache())
+        self.client = TestClient(app)
+        self.db = SessionLocal()
+
+    def tearDown(self):
+        self.db.close()
+
+    def post(self, sales_date: str, revenue: int):
+        return self.client.post("/sales/", params={"date": sales_date, "revenue": revenue})
+
+    def test_saves_and_runs_the_write_hooks(self):
+        response = self.post("2024-01-01", 1000)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.db.query(SalesData.date, SalesData.revenue).all(), [(date(2024, 1, 1), 1000)])
+        # 집계 갱신, 이상치 상태, 캐시 버전 증가가 같은 요청에서 실행됨
+        self.assertEqual(self.db.get(SalesDailyRollup, date(2024, 1, 1)).total_revenue, 1000)
+        self.assertEqual(self.db.get(AnomalyState, ("sales", "")).last_date, date(2024, 1, 1))
+        self.assertEqual(self.db.get(CacheVersion, "sales:2024-01").version, 1)
+
+    def test_rejects_invalid_input(self):
+        self.post("2024-01-01", 1000)
+
+        self.assertEqual(self.post("2024-01-01", 2000).status_code, 400)
+        self.assertEqual(self.post("2024-02-30", 1000).status_code, 400)
+        self.assertEqual(self.post("2024-01-02", 0).status_code, 400)
+        self.assertEqual(self.db.query(SalesData).count(), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from datetime import datetime, timedelta
+from backend.app.database import SessionLocal, engine
+from backend.app.models.model import Base, CrawlState, DatalabQuota, MarketingData, WatchlistKeyword
+from backend.app.services.clock import FakeClock, get_clock, set_clock
+from backend.app.services.quota import DATALAB_DAILY_QUOTA
+from backend.app.services.scheduler import WATCHLIST_QUOTA_RESERVE, WATCHLIST_RETRY_MINUTES, add_watchlist_keyword, run_due
+from benchmarks.fake_datalab import _raw_volumes, serve
+
+# FakeClock으로 시간을 옮기며 가짜 DataLab 서버를 상대로 run_due를 실행
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.previous_clock = get_clock()
+        self.clock = FakeClock(datetime(2024, 3, 1, 6, 0))
+        set_clock(self.clock)
+        self.server, self.url = serve("127.0.0.1", 0, 0.0, 0.0)
+        self.db = SessionLocal()
+
+    def tearDown(self):
+        self.db.close()
+        self.server.shutdown()
+        self.server.server_close()
+        set_clock(self.previous_clock)
+
+    def requests_served(self, server=None) -> int:
+        return (server or self.server).RequestHandlerClass.requests_served
+
+    def run_due(self, url=None) -> dict:
+        return run_due(self.db, base_url=url or self.url, max_attempts=1)
+
+    def test_selects_only_due_keywords_and_batches_by_five(self):
+        for i in range(12):
+            add_watchlist_keyword(self.db, f"키워드{i:02d}")
+        later = add_watchlist_keyword(self.db, "나중")
+        later.next_due_at = self.clock.now() + timedelta(hours=1)
+        self.db.commit()
+
+        summary = self.run_due()
+
+        self.assertEqual(summary["due_keywords"], 12)
+        self.assertEqual(summary["refreshed_keywords"], 12)
+        self.assertEqual(summary["requests"], 3)
+        self.assertEqual(self.requests_served(), 3)
+        self.assertIsNone(self.db.get(CrawlState, "나중"))
+        self.assertEqual(self.db.get(WatchlistKeyword, "키워드00").next_due_at, self.clock.now() + timedelta(hours=24))
+
+        # 다음 예정 시각 전에는 수집하지 않음
+        self.clock.advance(hours=1)
+        self.assertEqual(self.run_due()["due_keywords"], 1)
+        self.assertEqual(self.run_due()["due_keywords"], 0)
+
+    def test_defers_low_priority_keywords_to_keep_the_reserve(self):
+        for i in range(7):
+            add_watchlist_keyword(self.db, f"중요{i}", priority=1)
+        for i in range(10):
+            add_watchlist_keyword(self.db, f"일반{i}", priority=0)
+
+        # 남은 쿼터 = 예약분 + 2요청: 중요 키워드 7개(2요청)는 예약분을 써도 되지만 일반 키워드는 2요청 안에서만 수집
+        self.db.add(DatalabQuota(date=self.clock.today(), used=DATALAB_DAILY_QUOTA - WATCHLIST_QUOTA_RESERVE - 2))
+        self.db.commit()
+
+        summary = self.run_due()
+
+        self.assertEqual(summary["requests"], 2)
+        self.assertEqual(summary["refreshed_keywords"], 10)
+        self.assertEqual(summary["deferred_keywords"], 7)
+        self.assertTrue(all(self.db.get(WatchlistKeyword, f"중요{i}").last_status == "succeeded" for i in range(7)))
+        self.assertEqual(self.db.get(DatalabQuota, self.clock.today()).used, DATALAB_DAILY_QUOTA - WATCHLIST_QUOTA_RESERVE)
+
+        # 미룬 키워드는 예정 시각이 그대로라 다음 실행에서 다시 대상이 됨
+        self.assertEqual(self.run_due()["due_keywords"], 7)
+
+    def test_retries_failed_keywords_after_the_retry_delay(self):
+        add_watchlist_keyword(self.db, "실패")
+        failing_server, failing_url = serve("127.0.0.1", 0, 0.0, 1.0)
+        try:
+            summary = self.run_due(failing_url)
+        finally:
+            failing_server.shutdown()
+            failing_server.server_close()
+
+        entry = self.db.get(WatchlistKeyword, "실패")
+        self.assertEqual(summary["status"], "failed")
+        self.assertEqual(entry.last_status, "failed")
+        self.assertEqual(entry.next_due_at, self.clock.now() + timedelta(minutes=WATCHLIST_RETRY_MINUTES))
+        self.assertIsNone(self.db.get(CrawlState, "실패"))
+
+        self.assertEqual(self.run_due()["due_keywords"], 0)
+        self.clock.advance(minutes=WATCHLIST_RETRY_MINUTES)
+        summary = self.run_due()
+
+        self.assertEqual(summary["status"], "succeeded")
+        self.assertEqual(summary["refreshed_keywords"], 1)
+        self.assertEqual(self.db.get(WatchlistKeyword, "실패").last_status, "succeeded")
+        self.assertEqual(self.db.get(CrawlState, "실패").covered_through, self.clock.today() - timedelta(days=1))
+
+    def test_daily_refresh_stays_on_the_stored_scale(self):
+        add_watchlist_keyword(self.db, "척도")
+        add_watchlist_keyword(self.db, "같은묶음")
+        self.run_due()
+        for _ in range(3):
+            self.clock.advance(hours=24)
+            self.run_due()
+
+        # 매일 하루치만 새로 받아도 원본 검색량 대비 저장 값의 비율이 모든 날짜에서 같아야 함
+        rows = self.db.query(MarketingData.date, MarketingData.search_volume).filter(MarketingData.keyword == "척도").all()
+        ratios = [volume / _raw_volumes("척도", day, 1)[0] for day, volume in rows]
+        self.assertEqual(len(rows), 33)
+        self.assertAlmostEqual(min(ratios), max(ratios), places=4)
+
+if __name__ == "__main__":
+    unittest.main()
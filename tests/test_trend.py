@@ -0,0 +1,45 @@
+import unittest
+from datetime import date, datetime, timedelta
+from fastapi.testclient import TestClient
+from backend.app.database import SessionLocal, engine
+from backend.app.main import app
+from backend.app.models.model import Base, MarketingData
+from backend.app.services.cache import InMemoryCache, set_cache
+from backend.app.services.clock import FakeClock, get_clock, set_clock
+from backend.app.services.rollups import refresh_marketing_rollups
+
+START = date(2024, 1, 1)
+
+# 증가율 분석의 기준 구간은 공용 시계의 오늘을 기준으로 계산
+class SearchTrendTest(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        set_cache(InMemoryCache())
+        self.previous_clock = get_clock()
+        set_clock(FakeClock(datetime(2024, 1, 10, 9, 0)))
+
+        rows = [{"keyword": "추세", "date": START + timedelta(days=i), "search_volume": float(i + 1)} for i in range(10)]
+        db = SessionLocal()
+        db.add_all(MarketingData(**row) for row in rows)
+        db.flush()
+        refresh_marketing_rollups(db, rows)
+        db.commit()
+        db.close()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        set_clock(self.previous_clock)
+
+    def test_periods_end_on_the_clock_today(self):
+        response = self.client.get("/marketing/search-volulme-trend", params={"keyword": "추세", "periods": 3})
+
+        self.assertEqual(response.status_code, 200)
+        trend = response.json()
+        self.assertEqual(trend["current_period"], ["2024-01-08", "2024-01-10"])
+        self.assertEqual(trend["previous_period"], ["2024-01-05", "2024-01-07"])
+        # (8 + 9 + 10) / (5 + 6 + 7) - 1
+        self.assertEqual(trend["change_rate"], "50.00%")
+
+if __name__ == "__main__":
+    unittest.main()